@@ -3,10 +3,18 @@
 #               save a clear record of what the system did for every adverse-event report.
 # ======================================================================================
 
+import atexit
+import itertools
+import logging
+import queue
 import sqlite3
+import threading
+import time
 from pathlib import Path
 from contextlib import contextmanager
-from typing import Generator, Dict
+from typing import Callable, Generator, Dict, Optional
+
+logger = logging.getLogger(__name__)
 
 #-----------------------------------------------------------
 # ---------- DATABASE PATH ----------
@@ -63,17 +71,121 @@ def init_database() -> None:
             "CREATE INDEX IF NOT EXISTS idx_audit_risk_level ON audit_log(risk_level)"
         )
 
+        # Partial index: only escalated rows, used by stats + escalated_only filters
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_audit_escalation
+            ON audit_log(escalation_decision)
+            WHERE escalation_decision = 'ESCALATE'
+            """
+        )
+        # Matches get_audit_logs: WHERE risk_level = ? ORDER BY timestamp DESC
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_audit_risk_ts ON audit_log(risk_level, timestamp DESC)"
+        )
+        # Unfiltered / date-range audit pages: ORDER BY timestamp DESC with the
+        # risk and escalation filters answered from the same index
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_audit_ts_risk_esc
+            ON audit_log(timestamp DESC, risk_level, escalation_decision)
+            """
+        )
+
+        # Running counters kept in sync by triggers, so stats never scan audit_log
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS stats_counter (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # Seed from existing rows (no-op once the counters exist)
+        cursor.execute(
+            """
+            INSERT OR IGNORE INTO stats_counter (key, value)
+            SELECT 'total', COUNT(*) FROM audit_log
+            UNION ALL
+            SELECT 'escalated', COUNT(*) FROM audit_log WHERE escalation_decision = 'ESCALATE'
+            UNION ALL
+            SELECT 'critical', COUNT(*) FROM audit_log WHERE risk_level = 'CRITICAL'
+            """
+        )
+        cursor.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_audit_stats_insert
+            AFTER INSERT ON audit_log
+            BEGIN
+                UPDATE stats_counter SET value = value + 1 WHERE key = 'total';
+                UPDATE stats_counter SET value = value + 1
+                    WHERE key = 'escalated' AND NEW.escalation_decision = 'ESCALATE';
+                UPDATE stats_counter SET value = value + 1
+                    WHERE key = 'critical' AND NEW.risk_level = 'CRITICAL';
+            END
+            """
+        )
+        cursor.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_audit_stats_delete
+            AFTER DELETE ON audit_log
+            BEGIN
+                UPDATE stats_counter SET value = value - 1 WHERE key = 'total';
+                UPDATE stats_counter SET value = value - 1
+                    WHERE key = 'escalated' AND OLD.escalation_decision = 'ESCALATE';
+                UPDATE stats_counter SET value = value - 1
+                    WHERE key = 'critical' AND OLD.risk_level = 'CRITICAL';
+            END
+            """
+        )
+        cursor.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_audit_stats_update
+            AFTER UPDATE OF escalation_decision, risk_level ON audit_log
+            BEGIN
+                UPDATE stats_counter
+                    SET value = value
+                        + (NEW.escalation_decision IS 'ESCALATE')
+                        - (OLD.escalation_decision IS 'ESCALATE')
+                    WHERE key = 'escalated';
+                UPDATE stats_counter
+                    SET value = value
+                        + (NEW.risk_level IS 'CRITICAL')
+                        - (OLD.risk_level IS 'CRITICAL')
+                    WHERE key = 'critical';
+            END
+            """
+        )
+
+        conn.commit()
+
+        # Planner statistics so the new indexes are actually chosen
+        cursor.execute("ANALYZE;")
         conn.commit()
 
 #-----------------------------------------------------------
 # ---------- CONNECTION ----------
 #-----------------------------------------------------------
 
-@contextmanager
-def get_connection() -> Generator[sqlite3.Connection, None, None]:
+POOL_SIZE = 8
+OPTIMIZE_INTERVAL_SECONDS = 15 * 60
+STATS_TTL_SECONDS = 2.0
+WRITE_BATCH_SIZE = 500
+# Queued writes beyond this block the caller (backpressure) instead of
+# growing memory without bound while the writer is stalled
+WRITE_QUEUE_MAXSIZE = 10000
+WRITE_RETRIES = 3
+WRITE_RETRY_DELAY_SECONDS = 0.5
+
+#-----------------------------------------------------------
+# Opens a connection and applies the SQLite pragmas once, so pooled
+# connections never pay the WAL / busy-timeout setup again
+#-----------------------------------------------------------
+
+def _create_connection() -> sqlite3.Connection:
     conn = sqlite3.connect(
         DB_PATH,
-        timeout=5.0,        
+        timeout=5.0,
         check_same_thread=False
     )
     conn.row_factory = sqlite3.Row
@@ -81,13 +193,231 @@ def get_connection() -> Generator[sqlite3.Connection, None, None]:
     # ---- SQLite concurrency + performance pragmas ----
     conn.execute("PRAGMA journal_mode=WAL;")
     conn.execute("PRAGMA synchronous=NORMAL;")
-    conn.execute("PRAGMA busy_timeout = 5000;")  
+    conn.execute("PRAGMA busy_timeout = 5000;")
     conn.execute("PRAGMA temp_store = MEMORY;")
+    conn.execute("PRAGMA mmap_size = 268435456;")   # 256 MB memory-mapped I/O
+    conn.execute("PRAGMA cache_size = -65536;")     # 64 MiB page cache
+    conn.execute("PRAGMA wal_autocheckpoint = 1000;")
+    conn.execute("PRAGMA trusted_schema = OFF;")
 
+    return conn
+
+
+# Reader pool + one dedicated writer connection (writes are serialized)
+_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=POOL_SIZE)
+for _ in range(POOL_SIZE):
+    _pool.put(_create_connection())
+
+_writer = _create_connection()
+_writer_lock = threading.Lock()
+_stop_event = threading.Event()
+
+
+def _release(conn: sqlite3.Connection) -> None:
+    # Never hand a half-finished transaction to the next caller
+    if conn.in_transaction:
+        conn.rollback()
+
+
+@contextmanager
+def get_connection() -> Generator[sqlite3.Connection, None, None]:
+    conn = _pool.get()
     try:
         yield conn
     finally:
-        conn.close()
+        _release(conn)
+        _pool.put(conn)
+
+
+@contextmanager
+def get_write_connection() -> Generator[sqlite3.Connection, None, None]:
+    with _writer_lock:
+        try:
+            yield _writer
+        finally:
+            _release(_writer)
+
+
+#-----------------------------------------------------------
+# Lets SQLite refresh its query-planner statistics; run periodically
+# and once more when the connections are closed
+#-----------------------------------------------------------
+
+def optimize_database() -> None:
+    try:
+        with get_write_connection() as conn:
+            conn.execute("PRAGMA optimize;")
+    except sqlite3.Error as e:
+        logger.warning("PRAGMA optimize failed: %s", e)
+
+
+def start_optimize_task() -> threading.Thread:
+    """Run PRAGMA optimize every OPTIMIZE_INTERVAL_SECONDS on a daemon thread."""
+    def _loop():
+        while not _stop_event.wait(OPTIMIZE_INTERVAL_SECONDS):
+            optimize_database()
+
+    thread = threading.Thread(target=_loop, name="sqlite-optimize", daemon=True)
+    thread.start()
+    return thread
+
+
+#-----------------------------------------------------------
+# ---------- WRITE-BEHIND QUEUE ----------
+#-----------------------------------------------------------
+
+# Holds (sql, params, on_commit) items; a single background thread drains up
+# to WRITE_BATCH_SIZE of them and commits them in one transaction
+_write_queue: "queue.Queue[tuple]" = queue.Queue(maxsize=WRITE_QUEUE_MAXSIZE)
+_write_thread = None
+_write_thread_lock = threading.Lock()
+
+# Rows the writer gave up on, reported by /api/health (get_write_stats)
+_write_failures = 0
+_write_failures_lock = threading.Lock()
+
+
+def _commit_batch(batch: list) -> None:
+    with get_write_connection() as conn:
+        # Take the write lock up-front instead of upgrading mid-transaction
+        conn.execute("BEGIN IMMEDIATE")
+        # Consecutive statements with the same SQL go through one executemany
+        for sql, group in itertools.groupby(batch, key=lambda item: item[0]):
+            conn.executemany(sql, [item[1] for item in group])
+        conn.commit()
+
+
+def _run_on_commit(batch: list) -> None:
+    for _, _, on_commit in batch:
+        if on_commit is None:
+            continue
+        try:
+            on_commit()
+        except Exception:
+            logger.exception("Post-commit callback failed")
+
+
+def _commit_with_retry(batch: list) -> None:
+    # Only busy/locked errors are worth waiting for; constraint and other
+    # errors are raised straight away
+    for attempt in range(1, WRITE_RETRIES + 1):
+        try:
+            _commit_batch(batch)
+            return
+        except sqlite3.OperationalError as e:
+            if attempt == WRITE_RETRIES:
+                raise
+            logger.warning(
+                "Batched write of %d statements failed (attempt %d/%d): %s",
+                len(batch), attempt, WRITE_RETRIES, e
+            )
+            time.sleep(WRITE_RETRY_DELAY_SECONDS * attempt)
+
+
+# Audit rows must not be lost: retry the whole batch on transient errors,
+# then commit row by row so one bad statement only costs itself. Every row
+# that still fails is logged in full and counted; on_commit callbacks run
+# only for rows that were actually committed.
+def _write_batch(batch: list) -> None:
+    global _write_failures
+    try:
+        _commit_with_retry(batch)
+        _run_on_commit(batch)
+        return
+    except sqlite3.Error as e:
+        logger.warning(
+            "Batched write of %d statements failed, committing row by row: %s",
+            len(batch), e
+        )
+
+    for item in batch:
+        sql, params, _ = item
+        try:
+            _commit_with_retry([item])
+        except sqlite3.Error as e:
+            with _write_failures_lock:
+                _write_failures += 1
+            logger.error(
+                "Audit write FAILED, row not stored: %s | sql=%s | params=%r",
+                e, " ".join(sql.split()), params
+            )
+            continue
+        _run_on_commit([item])
+
+
+def _write_loop() -> None:
+    while True:
+        # Blocks until work arrives, so a lone write is flushed immediately
+        batch = [_write_queue.get()]
+        while len(batch) < WRITE_BATCH_SIZE:
+            try:
+                batch.append(_write_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        _write_batch(batch)
+
+        for _ in batch:
+            _write_queue.task_done()
+
+
+def enqueue_write(
+    sql: str,
+    params: tuple,
+    on_commit: Optional[Callable[[], None]] = None
+) -> None:
+    """
+    Queue a single INSERT/UPDATE for the background writer. Blocks while
+    the queue is full (WRITE_QUEUE_MAXSIZE), so callers slow down to the
+    writer's pace rather than buffering without bound.
+
+    on_commit runs on the writer thread once the statement has been
+    committed, and never if the write fails.
+    """
+    global _write_thread
+    if _write_thread is None:
+        with _write_thread_lock:
+            if _write_thread is None:
+                _write_thread = threading.Thread(
+                    target=_write_loop, name="sqlite-writer", daemon=True
+                )
+                _write_thread.start()
+
+    _write_queue.put((sql, params, on_commit))
+
+
+def flush_writes() -> None:
+    """Block until every queued write has been committed."""
+    if _write_thread is not None:
+        _write_queue.join()
+
+
+def get_write_stats() -> Dict:
+    """Pending and permanently failed write-behind statements."""
+    with _write_failures_lock:
+        failed = _write_failures
+    return {
+        "pending_writes": _write_queue.qsize(),
+        "failed_writes": failed,
+    }
+
+
+def close_connections() -> None:
+    """Close every pooled connection (registered with atexit)."""
+    flush_writes()
+    _stop_event.set()
+    optimize_database()
+
+    while True:
+        try:
+            _pool.get_nowait().close()
+        except queue.Empty:
+            break
+    with _writer_lock:
+        _writer.close()
+
+
+atexit.register(close_connections)
 
 
 #=====================================================================================
@@ -95,23 +425,38 @@ def get_connection() -> Generator[sqlite3.Connection, None, None]:
 # such as total records, escalated cases, and critical risk levels.
 #=====================================================================================
 
+_stats_cache = {"value": None, "expires": 0.0}
+_stats_lock = threading.Lock()
+
+
 def get_db_stats() -> Dict:
+    # Absorb health-check bursts: reuse the last result for STATS_TTL_SECONDS
+    with _stats_lock:
+        if _stats_cache["value"] is not None and time.monotonic() < _stats_cache["expires"]:
+            return dict(_stats_cache["value"])
+
+    stats = _query_db_stats()
+
+    if stats["connected"]:
+        with _stats_lock:
+            _stats_cache["value"] = stats
+            _stats_cache["expires"] = time.monotonic() + STATS_TTL_SECONDS
+
+    return dict(stats)
+
+
+def _query_db_stats() -> Dict:
     try:
         with get_connection() as conn:
             cursor = conn.cursor()
 
-            cursor.execute("SELECT COUNT(*) FROM audit_log")
-            total = cursor.fetchone()[0]
+            # O(1): counters are maintained by triggers on audit_log
+            cursor.execute("SELECT key, value FROM stats_counter")
+            counters = {row["key"]: row["value"] for row in cursor.fetchall()}
 
-            cursor.execute(
-                "SELECT COUNT(*) FROM audit_log WHERE escalation_decision = 'ESCALATE'"
-            )
-            escalated = cursor.fetchone()[0]
-
-            cursor.execute(
-                "SELECT COUNT(*) FROM audit_log WHERE risk_level = 'CRITICAL'"
-            )
-            critical = cursor.fetchone()[0]
+            total = counters.get("total", 0)
+            escalated = counters.get("escalated", 0)
+            critical = counters.get("critical", 0)
 
             return {
                 "connected": True,
@@ -4,68 +4,136 @@ Pharmacovigilance Adverse Event Processing API
 ENHANCED: With similar serious event retrieval + FDA Drug Information + LLM Medical Reasoning
 """
 
+import asyncio
+import itertools
+import logging
 import os
+import shutil
+import sys
+import tempfile
+import orjson
 from dotenv import load_dotenv
+
+# Must run before the service imports below: some read env vars at import time
+load_dotenv()
+
 from app.services.retrieve_service import (
     extract_text_from_pdf,
     embed_and_store_pdf,
-    retrieve_context,
-    normalize_text
+    retrieve_context
 )
 
-
-load_dotenv()
-
-print("GROQ_API_KEY loaded in main:", bool(os.getenv("GROQ_API_KEY")))
-
 import time
+from contextlib import asynccontextmanager
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
 # Auth imports
 from app.models.user import UserCreate, UserLogin, AuthResponse
-from app.services.auth_service import create_user, authenticate_user, get_user_by_id, verify_token
+from app.services.auth_service import (
+    create_user, authenticate_user, get_user_by_id, verify_token, init_users_table
+)
 
 
 from app.models.schemas import (
     ProcessReportRequest, ProcessReportResponse,
     AuditLogResponse,
-    EntityExtractionResult, MLClassificationResult, EscalationDecision
+    EntityExtractionResult, MLClassificationResult, EscalationDecision,
+    SimilarEventResult, DrugInfo, Phi3ReasoningResult
 )
 from app.services.classifier import predict_from_features, load_model, is_model_loaded, get_model_info
-from app.services.rxnorm_service import lookup_drug_rxnorm, detect_drug_from_text, extract_drug_from_filename
+from app.services.rxnorm_service import (
+    lookup_drug_rxnorm,
+    detect_drug_from_text,
+    extract_drug_from_filename,
+    start_prevalidation
+)
 from app.services.entity_extractor import extract_entities
 from app.services.escalation_engine import evaluate_escalation
 from app.services.audit_logger import (
     log_processing, generate_report_id,
-    get_audit_logs, get_audit_by_report_id, get_audit_summary,
-    get_similar_serious_events  
+    iter_audit_logs, get_audit_by_report_id, get_audit_summary,
+    get_similar_serious_events_vector
 )
 from app.services.alert_service import trigger_alert
-from app.database.db import get_db_stats
-from app.services.explanation_api_service import generate_deterministic_explanation
+from app.database.db import get_db_stats, get_write_stats, init_database, start_optimize_task
+from app.services.explanation_api_service import generate_deterministic_explanation, generate_api_explanation
 from app.services.email_service import send_escalation_email
 from fastapi import FastAPI, HTTPException, Query, UploadFile, File
-from app.services.audit_logger import get_similar_serious_events_vector
 from fastapi.concurrency import run_in_threadpool
 from app.services.drug_suggestion import get_drug_suggestions
 from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
 
 
-# NEW: Import FDA drug information service
-from app.services.dailymed_service import get_drug_info
+# NOTE: dailymed_service (lxml + its SQLite cache) and llm_reasoning_analyzer
+# (Langfuse) are imported lazily where they are used, so workers that never
+# reach those code paths do not pay for them.
+
+
+# Pipeline logger: silent unless the host app configures logging
+logger = logging.getLogger("app.pipeline")
+logger.addHandler(logging.NullHandler())
+
+
+phi3_analyzer = None
+
+# Returned for every request while the LLM reasoning analyzer is down
+_PHI3_UNAVAILABLE = {
+    "reasoning_alignment": "UNAVAILABLE",
+    "reasoning": "LLM reasoning analyzer not initialized",
+    "key_factors": [],
+    "reasoning_certainty": "UNKNOWN"
+}
+
+
+def _load_ml_model() -> None:
+    print("Loading ML model...")
+    if load_model():
+        print("Model loaded successfully!")
+    else:
+        print("WARNING: Model not loaded. Train the model first.")
+
+
+def _init_phi3() -> None:
+    global phi3_analyzer
+
+    try:
+        from app.services.llm_reasoning_analyzer import llmReasoningAnalyzer
 
-# NEW: Import Phi-3 Reasoning Analyzer
-from app.services.llm_reasoning_analyzer import llmReasoningAnalyzer
+        phi3_analyzer = llmReasoningAnalyzer()
+        print("LLM reasoning analyzer initialized")
+    except Exception as e:
+        phi3_analyzer = None
+        print(f" LLM reasoning analyzer failed to initialize: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    print("GROQ_API_KEY loaded in main:", bool(os.getenv("GROQ_API_KEY")))
+
+    # Independent startup stages run concurrently: cold start = slowest stage
+    await asyncio.gather(
+        run_in_threadpool(_load_ml_model),
+        run_in_threadpool(init_database),
+        run_in_threadpool(init_users_table),
+        run_in_threadpool(_init_phi3)
+    )
+    start_optimize_task()
+    start_prevalidation()
+
+    yield
 
 
 # Initialize FastAPI
 app = FastAPI(
     title="Pharmacovigilance AE Processing System",
     description="End-to-end adverse event processing with ML classification, entity extraction, and rule-based escalation",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # C-level JSON encoding for large responses
 )
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -79,37 +147,122 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-phi3_analyzer = None
 
+# Second-resolution ISO timestamp, rebuilt at most once per second
+_ts_cache = (0, "")
+
+
+def _now_iso() -> str:
+    global _ts_cache
+    now = int(time.time())
+    cached = _ts_cache
+    if cached[0] != now:
+        cached = (now, datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None).isoformat())
+        _ts_cache = cached  # single tuple swap keeps second + string consistent
+    return cached[1]
+
+
+# Human review rules, checked in order: (reason, predicate(alignment, ml_result, phi3_result))
+# - LLM reasoning challenges the ML decision
+# - Reasoning alignment is unknown/unavailable
+# - ML confidence is low
+# - Phi-3 reasoning certainty is low
+_REVIEW_RULES = (
+    ("Phi-3 medical reasoning challenges the ML prediction",
+     lambda alignment, ml, phi3: alignment == "CHALLENGES"),
+    ("Unable to determine Phi-3 reasoning alignment",
+     lambda alignment, ml, phi3: alignment in ("UNKNOWN", "UNAVAILABLE")),
+    ("Low ML confidence",
+     lambda alignment, ml, phi3: ml.get("confidence", 0) < 0.7),
+    ("Low certainty in Phi-3 medical reasoning",
+     lambda alignment, ml, phi3: phi3.get("reasoning_certainty") == "LOW"),
+)
 
-@app.on_event("startup")
-async def startup_event():
-    global phi3_analyzer
-    
-    print("Loading ML model...")
-    if load_model():
-        print("Model loaded successfully!")
-    else:
-        print("WARNING: Model not loaded. Train the model first.")
+
+# ============ PDF UPLOAD HELPERS ============
+
+MAX_PDF_UPLOAD_BYTES = 50 * 1024 * 1024  # 50 MB
+
+
+def _copy_upload(source, destination) -> int:
+    shutil.copyfileobj(source, destination)
+    return destination.tell()
 
 
+async def save_upload_to_tempfile(file: UploadFile) -> str:
+    """
+    Stream an uploaded PDF to a temporary file instead of reading it into memory.
+    Caller is responsible for deleting the returned path.
+    """
+    if file.size is not None and file.size > MAX_PDF_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="PDF exceeds the 50 MB upload limit")
+
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
     try:
-        phi3_analyzer = llmReasoningAnalyzer()
-        print("LLM reasoning analyzer initialized")
-    except Exception as e:
-        phi3_analyzer = None
-        print(f" LLM reasoning analyzer failed to initialize: {e}")
+        written = await run_in_threadpool(_copy_upload, file.file, tmp)
+    finally:
+        tmp.close()
 
-    
+    if written > MAX_PDF_UPLOAD_BYTES:
+        os.unlink(tmp.name)
+        raise HTTPException(status_code=413, detail="PDF exceeds the 50 MB upload limit")
+
+    return tmp.name
 
 
 # ============ CORE PROCESSING FUNCTION ============
 
-def process_adverse_event_core(drugname: str, adverse_event: str):
+def _get_drug_info(drug_name: str) -> dict:
+    # Lazy import: FDA drug information service
+    from app.services.dailymed_service import get_drug_info
+
+    return get_drug_info(drug_name)
+
+
+def run_llm_reasoning(canonical_drug: str, adverse_event: str, ml_result: dict, report_id: str) -> dict:
+    """
+    LLM medical reasoning for an ML decision (interpretability only).
+    Never raises: failures are reported in the returned dict.
+    """
+    if not phi3_analyzer:
+        # Phi-3 not available (shared constant, never mutated)
+        return _PHI3_UNAVAILABLE
+
+    try:
+        phi3_result = phi3_analyzer.analyze_prediction(
+            drugname=canonical_drug,
+            adverse_event=adverse_event,
+            ml_prediction=ml_result.get("prediction"),
+            ml_confidence=ml_result.get("confidence"),
+            ml_reason=ml_result.get("reason"),
+            serious_probability=ml_result.get("serious_probability"),
+            report_id=report_id  # NEW: For Langfuse tracing
+        )
+
+        logger.debug("LLM Reasoning: %s", phi3_result.get("reasoning_alignment", "UNAVAILABLE"))
+        logger.debug("Medical factors: %s", phi3_result.get("key_factors", []))
+
+        return phi3_result
+
+    except Exception as e:
+        logger.warning("LLM analysis failed: %s", e)
+        return {
+            "reasoning_alignment": "UNAVAILABLE",
+            "reasoning": f"LLM reasoning unavailable: {str(e)}",
+            "key_factors": [],
+            "reasoning_certainty": "UNKNOWN",
+            "error": str(e)
+        }
+
+
+async def process_adverse_event_core(drugname: str, adverse_event: str):
     """
     Core processing pipeline used by both manual text and PDF uploads.
     Returns standardized dictionary with all processing results.
     ENHANCED: Includes similar serious event retrieval for escalated cases + FDA drug info + LLM medical reasoning.
+
+    Blocking stages run in the threadpool; once the canonical drug is known,
+    drug info, LLM reasoning and entity extraction run concurrently.
     """
 
     start_time = time.time()
@@ -118,63 +271,31 @@ def process_adverse_event_core(drugname: str, adverse_event: str):
     report_id = generate_report_id()
 
     # 1. RxNorm Drug Validation
-    rxnorm_result = lookup_drug_rxnorm(drugname)
+    rxnorm_result = await run_in_threadpool(lookup_drug_rxnorm, drugname)
     if not rxnorm_result:
         raise HTTPException(status_code=400, detail=f"Invalid drug name '{drugname}'")
 
     # CRITICAL: Ensure canonical_drug is never None
-    canonical_drug = rxnorm_result.get("canonical_name") or drugname
+    canonical_drug = (rxnorm_result.get("canonical_name") or drugname).strip()
     
     if not canonical_drug:
         raise HTTPException(status_code=400, detail=f"Could not determine canonical drug name for '{drugname}'")
 
-    # NEW: Fetch FDA Drug Information (cached)
-    drug_info = get_drug_info(canonical_drug)
+    # Contract for every stage below: canonical_drug is stripped and interned,
+    # so repeated cache/dict lookups on it hit the identity fast path
+    canonical_drug: str = sys.intern(canonical_drug)
 
-    # 2. ML Classification (AUTHORITATIVE DECISION)
+    # 2. ML Classification (AUTHORITATIVE DECISION) - fast, in-process
     ml_result = predict_from_features(canonical_drug, adverse_event)
 
-    # NEW: 2b. LLM Medical Reasoning Analysis
-    phi3_result = None
-    reasoning_alignment = "UNAVAILABLE"
-    
-    if phi3_analyzer:
-        try:
-            phi3_result = phi3_analyzer.analyze_prediction(
-                drugname=canonical_drug,
-                adverse_event=adverse_event,
-                ml_prediction=ml_result.get("prediction"),
-                ml_confidence=ml_result.get("confidence"),
-                ml_reason=ml_result.get("reason"),
-                serious_probability=ml_result.get("serious_probability"),
-                report_id=report_id  # NEW: For Langfuse tracing
-            )
-            reasoning_alignment = phi3_result.get("reasoning_alignment", "UNAVAILABLE")
-            
-            print(f" LLM Reasoning: {reasoning_alignment}")
-            print(f"   Medical factors: {phi3_result.get('key_factors', [])}")
-            
-        except Exception as e:
-            print(f" LLM analysis failed: {str(e)}")
-            phi3_result = {
-                "reasoning_alignment": "UNAVAILABLE",
-                "reasoning": f"LLM reasoning unavailable: {str(e)}",
-                "key_factors": [],
-                "reasoning_certainty": "UNKNOWN",
-                "error": str(e)
-            }
-            reasoning_alignment = "UNAVAILABLE"
-    else:
-        # Phi-3 not available
-        phi3_result = {
-            "reasoning_alignment": "UNAVAILABLE",
-            "reasoning": "LLM reasoning analyzer not initialized",
-            "key_factors": [],
-            "reasoning_certainty": "UNKNOWN"
-        }
-
-    # 3. Entity Extraction
-    entities = extract_entities(canonical_drug, adverse_event)
+    # FDA Drug Information (cached), 2b. LLM Medical Reasoning and
+    # 3. Entity Extraction are independent of each other
+    drug_info, phi3_result, entities = await asyncio.gather(
+        run_in_threadpool(_get_drug_info, canonical_drug),
+        run_in_threadpool(run_llm_reasoning, canonical_drug, adverse_event, ml_result, report_id),
+        run_in_threadpool(extract_entities, canonical_drug, adverse_event)
+    )
+    reasoning_alignment = phi3_result.get("reasoning_alignment", "UNAVAILABLE")
 
     # 4. Escalation Evaluation
     escalation = evaluate_escalation(
@@ -186,7 +307,8 @@ def process_adverse_event_core(drugname: str, adverse_event: str):
     )
 
     # 5. Deterministic Explanation
-    explanation_text = generate_deterministic_explanation(
+    explanation_text = await run_in_threadpool(
+        generate_deterministic_explanation,
         drug=canonical_drug,
         adverse_event=adverse_event,
         ml_result=ml_result,
@@ -196,7 +318,8 @@ def process_adverse_event_core(drugname: str, adverse_event: str):
     processing_time_ms = (time.time() - start_time) * 1000
 
     # 6. Audit Logging (with None-safety)
-    log_processing(
+    await run_in_threadpool(
+        log_processing,
         report_id=report_id,
         drugname=canonical_drug or "UNKNOWN",  # DEFENSIVE: Never log None
         adverse_event=adverse_event,
@@ -224,7 +347,8 @@ def process_adverse_event_core(drugname: str, adverse_event: str):
 
     if escalation.risk_level in ["CRITICAL", "HIGH"]:
         try:
-            send_escalation_email(
+            await run_in_threadpool(
+                send_escalation_email,
                 drug=canonical_drug,
                 adverse_event=adverse_event,
                 risk_level=escalation.risk_level,
@@ -236,7 +360,7 @@ def process_adverse_event_core(drugname: str, adverse_event: str):
                 "attempted": True,
                 "sent": True,
                 "recipient": "safety@company.com",
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": _now_iso()
             }
 
         except Exception as e:
@@ -255,7 +379,8 @@ def process_adverse_event_core(drugname: str, adverse_event: str):
     # 9. Retrieve Similar Serious Events (VECTOR-BASED)
     similar_events = []
     if (ml_result.get("prediction") == "Serious" and escalation.should_escalate):
-        similar_events = get_similar_serious_events_vector(
+        similar_events = await run_in_threadpool(
+            get_similar_serious_events_vector,
             drugname=canonical_drug,
             adverse_event=adverse_event,
             current_symptoms=entities.get("symptoms", []),
@@ -265,32 +390,19 @@ def process_adverse_event_core(drugname: str, adverse_event: str):
         )
 
     # NEW: 10. Determine if human review is needed based on LLM reasoning
-    needs_human_review = False
     review_reason = None
     
     if phi3_result:
-        # Flag for review if:
-        # - LLM reasoning challenges the ML decision
-        # - Reasoning alignment is unknown/unavailable
-        # - ML confidence is low
-        # - Phi-3 reasoning certainty is low
-        needs_human_review = (
-            reasoning_alignment == "CHALLENGES" or
-            reasoning_alignment == "UNKNOWN" or
-            reasoning_alignment == "UNAVAILABLE" or
-            ml_result.get("confidence", 0) < 0.7 or
-            phi3_result.get("reasoning_certainty") == "LOW"
+        # First matching rule gives the reason; any match flags for review
+        review_reason = next(
+            (
+                reason for reason, applies in _REVIEW_RULES
+                if applies(reasoning_alignment, ml_result, phi3_result)
+            ),
+            None
         )
-        
-        if needs_human_review:
-            if reasoning_alignment == "CHALLENGES":
-                review_reason = "Phi-3 medical reasoning challenges the ML prediction"
-            elif reasoning_alignment in ["UNKNOWN", "UNAVAILABLE"]:
-                review_reason = "Unable to determine Phi-3 reasoning alignment"
-            elif ml_result.get("confidence", 0) < 0.7:
-                review_reason = "Low ML confidence"
-            elif phi3_result.get("reasoning_certainty") == "LOW":
-                review_reason = "Low certainty in Phi-3 medical reasoning"
+
+    needs_human_review = review_reason is not None
 
     return {
         "report_id": report_id,
@@ -309,28 +421,23 @@ def process_adverse_event_core(drugname: str, adverse_event: str):
     }
 
 
-# ============ Processing Endpoints ============
-
-@app.post("/api/process", response_model=ProcessReportResponse, tags=["Processing"])
-async def process_report(request: ProcessReportRequest):
+def _build_process_response(core: dict, adverse_event: str) -> ORJSONResponse:
     """
-    Process adverse event report from manual text input.
-    Uses core processing pipeline.
-    ENHANCED: Returns similar serious events if escalated + FDA drug info + Phi-3 medical reasoning.
+    Build the API response from the core pipeline output.
+    Shared by /api/process and /api/process-pdf.
+
+    All inputs come from our own pipeline, so the payload is encoded
+    straight to JSON by orjson (which handles the result dataclasses
+    natively). Returning a Response skips FastAPI's response_model
+    validation and jsonable_encoder pass; ProcessReportResponse is still
+    declared on the routes for the OpenAPI schema.
     """
-    if not is_model_loaded():
-        raise HTTPException(status_code=503, detail="ML model not loaded.")
-
-    core = process_adverse_event_core(
-        drugname=request.drugname,
-        adverse_event=request.adverse_event
-    )
-
+    drug_info = core["drug_info"]
     # Build response with LLM reasoning
     response_data = {
         "report_id": core["report_id"],
         "drugname": core["canonical_drug"],
-        "adverse_event": request.adverse_event,
+        "adverse_event": adverse_event,
         "entities": EntityExtractionResult(
             drug=core["entities"]["drug"],
             symptoms=core["entities"]["symptoms"],
@@ -354,22 +461,50 @@ async def process_report(request: ProcessReportRequest):
         "processing_time_ms": core["processing_time_ms"],
         "explanation": core["explanation_text"],
         "email_notification": core["email_notification"],
-        "similar_events": core["similar_events"],
-        "drug_info": core["drug_info"]
+        "similar_events": [SimilarEventResult(**event) for event in core["similar_events"]],
+        "drug_info": DrugInfo(
+            source=drug_info["source"],
+            indications=drug_info["indications"],
+            warnings=drug_info["warnings"],
+            adverse_reactions=drug_info["adverse_reactions"]
+        ) if drug_info else None,
+        "phi3_reasoning": None,
+        "needs_human_review": None,
+        "review_reason": None
     }
     
     # NEW: Add LLM reasoning fields
     if core.get("phi3_result"):
-        response_data["phi3_reasoning"] = {
-            "reasoning_alignment": core["phi3_result"].get("reasoning_alignment"),
-            "reasoning": core["phi3_result"].get("reasoning"),
-            "key_factors": core["phi3_result"].get("key_factors", []),
-            "reasoning_certainty": core["phi3_result"].get("reasoning_certainty")
-        }
+        response_data["phi3_reasoning"] = Phi3ReasoningResult(
+            reasoning_alignment=core["phi3_result"].get("reasoning_alignment"),
+            reasoning=core["phi3_result"].get("reasoning"),
+            key_factors=core["phi3_result"].get("key_factors", []),
+            reasoning_certainty=core["phi3_result"].get("reasoning_certainty")
+        )
         response_data["needs_human_review"] = core.get("needs_human_review", False)
         response_data["review_reason"] = core.get("review_reason")
 
-    return ProcessReportResponse(**response_data)
+    return ORJSONResponse(response_data)
+
+
+# ============ Processing Endpoints ============
+
+@app.post("/api/process", response_model=ProcessReportResponse, tags=["Processing"])
+async def process_report(request: ProcessReportRequest):
+    """
+    Process adverse event report from manual text input.
+    Uses core processing pipeline.
+    ENHANCED: Returns similar serious events if escalated + FDA drug info + Phi-3 medical reasoning.
+    """
+    if not is_model_loaded():
+        raise HTTPException(status_code=503, detail="ML model not loaded.")
+
+    core = await process_adverse_event_core(
+        drugname=request.drugname,
+        adverse_event=request.adverse_event
+    )
+
+    return _build_process_response(core, request.adverse_event)
 
 
 @app.post("/api/process-pdf", response_model=ProcessReportResponse, tags=["Processing"])
@@ -391,32 +526,36 @@ async def process_pdf_report(
         raise HTTPException(status_code=503, detail="ML model not loaded.")
 
     # Extract text from PDF (with OCR fallback)
-    contents = await file.read()
-    extracted_text = extract_text_from_pdf(contents)
+    pdf_path = await save_upload_to_tempfile(file)
+    try:
+        extracted_text = await run_in_threadpool(extract_text_from_pdf, pdf_path)
+    finally:
+        os.unlink(pdf_path)
 
     if not extracted_text.strip():
         raise HTTPException(status_code=400, detail="No text extracted from PDF")
 
-    # Normalize text
-    normalized_text = normalize_text(extracted_text)
+    # extract_text_from_pdf already returns normalize_text output
+    normalized_text = extracted_text
 
     # ============================
     # DRUG AUTO-DETECTION WITH VALIDATION
     # ============================
     
-    # Try 1: Detect from PDF content
-    detected_drug = detect_drug_from_text(normalized_text)
+    # Try 1: Detect from PDF content (batched RxNorm validation runs its own
+    # event loop, so it has to run in a worker thread)
+    detected_drug = await run_in_threadpool(detect_drug_from_text, normalized_text)
     
     # CRITICAL: Validate auto-detected drug with RxNorm (HARD GATE)
     if detected_drug:
-        rx_check = lookup_drug_rxnorm(detected_drug)
+        rx_check = await run_in_threadpool(lookup_drug_rxnorm, detected_drug)
         
         # HARD GATE: must be real drug
         if rx_check and rx_check.get("canonical_name"):
-            print(f"Auto-detected VALID drug: '{detected_drug}'")
+            logger.debug("Auto-detected VALID drug: '%s'", detected_drug)
             # Keep detected_drug
         else:
-            print(f" Auto-detected INVALID drug word: '{detected_drug}' - rejecting")
+            logger.debug("Auto-detected INVALID drug word: '%s' - rejecting", detected_drug)
             detected_drug = None  # Reset to trigger fallback
     
     # Try 2: Extract from filename (if auto-detection failed)
@@ -424,24 +563,24 @@ async def process_pdf_report(
         filename_drug = extract_drug_from_filename(file.filename)
         if filename_drug:
             # Also validate filename extraction
-            rx_check = lookup_drug_rxnorm(filename_drug)
+            rx_check = await run_in_threadpool(lookup_drug_rxnorm, filename_drug)
             if rx_check and rx_check.get("canonical_name"):
-                print(f" Filename-detected VALID drug: '{filename_drug}'")
+                logger.debug("Filename-detected VALID drug: '%s'", filename_drug)
                 detected_drug = filename_drug
             else:
-                print(f" Filename-detected INVALID drug word: '{filename_drug}' - rejecting")
+                logger.debug("Filename-detected INVALID drug word: '%s' - rejecting", filename_drug)
     
     # Determine final drug name with priority order and DEFENSIVE VALIDATION
     final_drug = None
     
     if detected_drug:
-        print(f" Using auto-detected drug: '{detected_drug}'")
+        logger.debug("Using auto-detected drug: '%s'", detected_drug)
         final_drug = detected_drug
     elif drugname:
         # DEFENSIVE: Validate manual drugname too
-        rx_check = lookup_drug_rxnorm(drugname)
+        rx_check = await run_in_threadpool(lookup_drug_rxnorm, drugname)
         if rx_check and rx_check.get("canonical_name"):
-            print(f" Using manually provided + validated drug: '{drugname}'")
+            logger.debug("Using manually provided + validated drug: '%s'", drugname)
             final_drug = drugname
         else:
             raise HTTPException(
@@ -459,62 +598,39 @@ async def process_pdf_report(
     adverse_event = extracted_text
 
     # Run through SAME CORE PIPELINE
-    core = process_adverse_event_core(
+    core = await process_adverse_event_core(
         drugname=final_drug,
         adverse_event=adverse_event
     )
 
     # ALSO store PDF for RAG linked to SAME case
-    embed_and_store_pdf(extracted_text, core["report_id"])
+    await run_in_threadpool(embed_and_store_pdf, extracted_text, core["report_id"], normalized=True)
 
-    # Build response with LLM reasoning
-    response_data = {
-        "report_id": core["report_id"],
-        "drugname": core["canonical_drug"],
-        "adverse_event": adverse_event[:1000],  # Truncate for response
-        "entities": EntityExtractionResult(
-            drug=core["entities"]["drug"],
-            symptoms=core["entities"]["symptoms"],
-            extraction_method=core["entities"]["extraction_method"]
-        ),
-        "classification": MLClassificationResult(
-            prediction=core["ml_result"]["prediction"],
-            serious_probability=core["ml_result"]["serious_probability"],
-            non_serious_probability=core["ml_result"]["non_serious_probability"],
-            confidence=core["ml_result"]["confidence"]
-        ),
-        "escalation": EscalationDecision(
-            should_escalate=core["escalation"].should_escalate,
-            risk_level=core["escalation"].risk_level,
-            final_score=core["escalation"].final_score,
-            ml_probability=core["escalation"].ml_probability,
-            keyword_score=core["escalation"].keyword_score,
-            triggered_keywords=core["escalation"].triggered_keywords,
-            explanation=core["escalation"].explanation
-        ),
-        "processing_time_ms": core["processing_time_ms"],
-        "explanation": core["explanation_text"],
-        "email_notification": core["email_notification"],
-        "similar_events": core["similar_events"],
-        "drug_info": core["drug_info"]
-    }
-    
-    # NEW: Add LLM reasoning fields
-    if core.get("phi3_result"):
-        response_data["phi3_reasoning"] = {
-            "reasoning_alignment": core["phi3_result"].get("reasoning_alignment"),
-            "reasoning": core["phi3_result"].get("reasoning"),
-            "key_factors": core["phi3_result"].get("key_factors", []),
-            "reasoning_certainty": core["phi3_result"].get("reasoning_certainty")
-        }
-        response_data["needs_human_review"] = core.get("needs_human_review", False)
-        response_data["review_reason"] = core.get("review_reason")
-
-    return ProcessReportResponse(**response_data)
+    return _build_process_response(core, adverse_event[:1000])  # Truncate for response
 
 
 # ============ Audit Endpoints ============
 
+def _stream_audit_logs(first_chunk, chunks):
+    """
+    Encode audit rows into the {"records": [...], "total": n} body
+    chunk by chunk, so the response starts before the cursor drains.
+    first_chunk was fetched before streaming (None when there are no rows).
+    """
+    total = 0
+    yield b'{"records":['
+    if first_chunk is None:
+        yield b'],"total":0}'
+        return
+    for chunk in itertools.chain((first_chunk,), chunks):
+        body = b",".join(orjson.dumps(dict(row)) for row in chunk)
+        yield body if total == 0 else b"," + body
+        total += len(chunk)
+    yield b'],"total":' + str(total).encode() + b"}"
+
+
+# response_model documents the body shape; the StreamingResponse itself
+# bypasses FastAPI's serialization
 @app.get("/api/audit", response_model=AuditLogResponse, tags=["Audit"])
 async def get_audit(
     limit: int = Query(default=100, le=1000),
@@ -524,8 +640,8 @@ async def get_audit(
     start_date: Optional[str] = Query(default=None),
     end_date: Optional[str] = Query(default=None)
 ):
-    logs = await run_in_threadpool(
-        get_audit_logs,
+    # Sync generator: Starlette iterates it in the threadpool
+    chunks = iter_audit_logs(
         limit,
         offset,
         risk_level,
@@ -534,15 +650,25 @@ async def get_audit(
         end_date
     )
 
-    return AuditLogResponse(
-        total=len(logs),
-        records=logs
+    # Run the query and fetch the first chunk before the 200 goes out, so a
+    # database error still becomes a proper HTTP error instead of a
+    # truncated JSON body
+    first_chunk = await run_in_threadpool(next, chunks, None)
+
+    return StreamingResponse(
+        _stream_audit_logs(first_chunk, chunks),
+        media_type="application/json"
     )
 
 
+@app.get("/api/audit/summary", tags=["Audit"])
+async def get_summary():
+    return await run_in_threadpool(get_audit_summary)
+
+
 @app.get("/api/audit/{report_id}", tags=["Audit"])
 async def get_audit_record(report_id: str):
-    record = get_audit_by_report_id(report_id)
+    record = await run_in_threadpool(get_audit_by_report_id, report_id)
     if not record:
         raise HTTPException(status_code=404, detail="Report not found")
     return record
@@ -560,6 +686,19 @@ async def drug_suggest(q: str, limit: int = 10):
 
 # ============ System Endpoints ============
 
+@app.get("/api/health", tags=["System"])
+async def health_check():
+    db_stats = await run_in_threadpool(get_db_stats)
+
+    return {
+        "status": "healthy" if db_stats["connected"] and is_model_loaded() else "degraded",
+        "database": db_stats,
+        # Write-behind audit queue: rows still pending and rows that failed to store
+        "audit_writes": get_write_stats(),
+        "ml_model_loaded": is_model_loaded(),
+        "phi3_reasoning_available": phi3_analyzer is not None,
+        "timestamp": _now_iso()
+    }
 
 
 # ============ Root ============
@@ -590,7 +729,9 @@ async def signup(request: UserCreate):
     Create a new user account.
     Password is hashed using Argon2.
     """
-    result = create_user(
+    # Argon2 hashing + SQLite are blocking: keep them off the event loop
+    result = await run_in_threadpool(
+        create_user,
         username=request.username,
         email=request.email,
         password=request.password
@@ -608,7 +749,9 @@ async def signup(request: UserCreate):
 
 @app.post("/api/auth/login", tags=["Authentication"])
 async def login(request: UserLogin):
-    result = authenticate_user(
+    # Argon2 verify releases the GIL, so concurrent logins use all cores
+    result = await run_in_threadpool(
+        authenticate_user,
         username=request.username,
         password=request.password
     )
@@ -633,7 +776,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-    user = get_user_by_id(payload["user_id"])
+    user = await run_in_threadpool(get_user_by_id, payload["user_id"])
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -656,16 +799,18 @@ async def upload_pdf(file: UploadFile = File(...)):
     Use /api/process-pdf if you need full processing with ML + audit + RAG.
     This endpoint is for cases where you only want to index documents for later retrieval.
     """
-    contents = await file.read()
-
-    text = extract_text_from_pdf(contents)
+    pdf_path = await save_upload_to_tempfile(file)
+    try:
+        text = await run_in_threadpool(extract_text_from_pdf, pdf_path)
+    finally:
+        os.unlink(pdf_path)
 
     if not text.strip():
         raise HTTPException(status_code=400, detail="No text extracted from PDF")
 
     report_id = generate_report_id()
 
-    chunks_indexed = embed_and_store_pdf(text, report_id)
+    chunks_indexed = await run_in_threadpool(embed_and_store_pdf, text, report_id, normalized=True)
 
     return {
         "report_id": report_id,
@@ -673,6 +818,21 @@ async def upload_pdf(file: UploadFile = File(...)):
     }
 
 
+_RAG_PROMPT_PREFIX = """
+You are a pharmacovigilance safety assistant.
+
+Use the following PDF report context to generate a clinical summary
+and assess seriousness.
+
+CONTEXT:
+"""
+
+_RAG_PROMPT_SUFFIX = """
+
+Provide a concise pharmacovigilance-style summary and risk assessment.
+"""
+
+
 @app.post("/api/rag-summary", tags=["RAG"])
 async def rag_summary(query: str, report_id: str):
     """
@@ -689,23 +849,9 @@ async def rag_summary(query: str, report_id: str):
     if not chunks:
         return {"summary": "No relevant PDF context found for this report."}
 
-    context = "\n\n".join(chunks)
-
-    prompt = f"""
-You are a pharmacovigilance safety assistant.
-
-Use the following PDF report context to generate a clinical summary
-and assess seriousness.
-
-CONTEXT:
-{context}
-
-Provide a concise pharmacovigilance-style summary and risk assessment.
-"""
+    prompt = _RAG_PROMPT_PREFIX + "\n\n".join(chunks) + _RAG_PROMPT_SUFFIX
 
     # Reuse Groq LLaMA
-    from app.services.explanation_api_service import generate_api_explanation
-
     summary = generate_api_explanation(
         drug="Unknown",
         adverse_event=prompt,
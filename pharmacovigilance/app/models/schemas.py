@@ -1,9 +1,12 @@
 #================================================================================================
 # DESCRIPTION : defines Pydantic request and response schemas for the pharmacovigilance API, 
 # ensuring strict validation,consistent data exchange, explainable ML outputs, auditability.
+# Internal result types built from trusted pipeline data are plain dataclasses;
+# Pydantic is kept at the API boundary (requests and the top-level responses).
 #================================================================================================
 
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass, field
+from typing import Annotated, List, Optional, Dict, Any
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -46,19 +49,21 @@ class AuditQueryRequest(BaseModel):
 # Holds structured drug and symptom entities extracted from raw clinical text
 #============================================================================
 
-class EntityExtractionResult(BaseModel):
+@dataclass(slots=True)
+class EntityExtractionResult:
     """Extracted entities from the report."""
     drug: str
     symptoms: List[str]
-    extraction_method: str = Field(description="regex or rule-based")
+    extraction_method: Annotated[str, Field(description="regex or rule-based")]
 
 
 #=========================================================================
 # Contains the ML model's classification output, including probabilities 
 #=========================================================================
-class MLClassificationResult(BaseModel):
+@dataclass(slots=True)
+class MLClassificationResult:
     """ML classification result."""
-    prediction: str = Field(description="Serious or Non-Serious")
+    prediction: Annotated[str, Field(description="Serious or Non-Serious")]
     serious_probability: float
     non_serious_probability: float
     confidence: float
@@ -67,10 +72,11 @@ class MLClassificationResult(BaseModel):
 # Contains the escalation decision details, including risk level, final score
 #============================================================================
 
-class EscalationDecision(BaseModel):
+@dataclass(slots=True)
+class EscalationDecision:
    
     should_escalate: bool
-    risk_level: str = Field(description="LOW, MEDIUM, HIGH, or CRITICAL")
+    risk_level: Annotated[str, Field(description="LOW, MEDIUM, HIGH, or CRITICAL")]
     final_score: float
     ml_probability: float
     keyword_score: float
@@ -81,7 +87,8 @@ class EscalationDecision(BaseModel):
 # Represents similar historical serious events retrieved based on vector similarity
 #==================================================================================
 
-class SimilarEventResult(BaseModel):
+@dataclass(slots=True)
+class SimilarEventResult:
    
     report_id: str
     drugname: str
@@ -96,7 +103,8 @@ class SimilarEventResult(BaseModel):
 # Contains FDA drug information retrieved from DailyMed for contextual enrichment
 #==================================================================================
 
-class DrugInfo(BaseModel):
+@dataclass(slots=True)
+class DrugInfo:
     """FDA Drug Information from DailyMed"""
     source: str
     indications: str
@@ -107,24 +115,21 @@ class DrugInfo(BaseModel):
 # Represents the medical reasoning analysis from Phi-3, including alignment with ML decision
 #===========================================================================================
 
-class Phi3ReasoningResult(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class Phi3ReasoningResult:
     """Phi-3 medical reasoning analysis result."""
-    reasoning_alignment: str = Field(
-        ..., 
+    reasoning_alignment: Annotated[str, Field(
         description="How Phi-3's reasoning relates to ML decision: SUPPORTS, CHALLENGES, or UNAVAILABLE"
-    )
-    reasoning: str = Field(
-        ..., 
+    )]
+    reasoning: Annotated[str, Field(
         description="Medical reasoning explanation from Phi-3"
-    )
-    key_factors: List[str] = Field(
-        default_factory=list, 
+    )]
+    key_factors: Annotated[List[str], Field(
         description="Medical factors considered by Phi-3"
-    )
-    reasoning_certainty: str = Field(
-        ..., 
+    )] = field(default_factory=list)
+    reasoning_certainty: Annotated[str, Field(
         description="Self-reported certainty level: HIGH, MEDIUM, LOW, or UNKNOWN"
-    )
+    )]
 
 #===============================================================================================
 # Response model for the main report processing endpoint, combining all results and explanations
@@ -169,7 +174,7 @@ class ProcessReportResponse(BaseModel):
     class Config:
         json_schema_extra = {
             "example": {
-                "report_id": "RPT-20240121120000-ABC12345",
+                "report_id": "RPT-1705838400000000000-00000000-ABC12345",
                 "drugname": "Aspirin",
                 "adverse_event": "Patient experienced severe bleeding",
                 "entities": {
@@ -237,7 +242,8 @@ class ProcessReportResponse(BaseModel):
 # Represents a single audit log record for traceability and analysis
 #============================================================================
 
-class AuditLogRecord(BaseModel):
+@dataclass(slots=True)
+class AuditLogRecord:
     
     id: int
     report_id: str
@@ -4,7 +4,7 @@
 
 
 from typing import Optional
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field
 
 #======================================================
 # defines the exact structure of a user signup request
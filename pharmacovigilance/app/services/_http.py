@@ -0,0 +1,33 @@
+#=====================================================================================
+# DESCRIPTION : Shared keep-alive HTTP sessions for the external services the pipeline
+#               calls (Groq, local Ollama, RxNav/openFDA, DailyMed), built once at import
+#=====================================================================================
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+#=====================================================================================
+# Builds a pooled session. Retries cover transient gateway/rate-limit errors on
+# idempotent requests only (urllib3 does not retry POST by default), so an LLM
+# generation is never sent twice.
+#=====================================================================================
+
+def _make_session(pool_maxsize: int) -> requests.Session:
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(429, 500, 502, 503, 504))
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip"})
+    return session
+
+
+GROQ_SESSION = _make_session(pool_maxsize=64)
+OLLAMA_SESSION = _make_session(pool_maxsize=16)
+RXNAV_SESSION = _make_session(pool_maxsize=64)
+DAILYMED_SESSION = _make_session(pool_maxsize=8)
@@ -0,0 +1,10 @@
+#=====================================================================================
+# DESCRIPTION : Timestamp helper shared by the audit and vector services
+#=====================================================================================
+
+from datetime import datetime, timezone
+
+
+def iso_utc_now() -> str:
+    """Naive UTC ISO timestamp, matching the format already stored."""
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
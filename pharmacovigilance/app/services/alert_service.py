@@ -2,8 +2,38 @@
 # DESCRIPTION : This file safely triggers and logs alerts for high-risk adverse event reports
 #============================================================================================
 
+import os
+import sys
 from typing import Optional
 
+# Where alerts go; set ALERT_STDOUT=0 to disable the console sink
+ALERT_STDOUT = os.getenv("ALERT_STDOUT", "1") != "0"
+
+# Alert template, bound once at import (summary line + full message)
+_ALERT_TEMPLATE = """[ALERT] {risk_level} - {drug} - {report_id}
+
+    🚨 PHARMACOVIGILANCE ALERT 🚨
+
+    Report ID: {report_id}
+    Drug: {drug}
+    Risk Level: {risk_level}
+
+    Adverse Event:
+    {event}
+
+    Explanation:
+    {explanation}
+
+    ACTION REQUIRED: Review this case immediately.
+
+""".format
+
+
+def _short(value, limit: Optional[int], default: str) -> str:
+    """None-safe str() with truncation, in one branch and one slice."""
+    text = value if value else default
+    return (text if isinstance(text, str) else str(text))[:limit]
+
 
 def trigger_alert(
     report_id: str,
@@ -12,46 +42,34 @@ def trigger_alert(
     risk_level: str,
     explanation: str
 ):
-    
+
     # CRITICAL: Defensive None-safety
     safe_drug = str(drugname) if drugname else "UNKNOWN"
-    safe_event = str(adverse_event) if adverse_event else "No description"
-    safe_explanation = str(explanation) if explanation else "No explanation"
-    
-    # Example: Truncate with None-safety
-    drug_short = safe_drug[:60] if safe_drug else "UNKNOWN"
-    event_short = safe_event[:200] if safe_event else "No description"
-    
-    # Build alert message
-    alert_message = f"""
-    🚨 PHARMACOVIGILANCE ALERT 🚨
-    
-    Report ID: {report_id}
-    Drug: {drug_short}
-    Risk Level: {risk_level}
-    
-    Adverse Event:
-    {event_short}
-    
-    Explanation:
-    {safe_explanation}
-    
-    ACTION REQUIRED: Review this case immediately.
-    """
-    
-    # Log alert (replace with your actual alerting mechanism)
-    print(f"[ALERT] {risk_level} - {drug_short} - {report_id}")
-    print(alert_message)
-    
-    # Send to actual alerting system (Slack, email, PagerDuty, etc.)
-    # Example:
-    # send_to_slack(alert_message)
-    # send_to_pagerduty(report_id, risk_level)
-    
-    return {
+
+    result = {
         "alert_sent": True,
         "report_id": report_id,
         "drug": safe_drug,
         "risk_level": risk_level
     }
 
+    # No sink configured: skip building the message entirely
+    if not ALERT_STDOUT:
+        return result
+
+    # Log alert (replace with your actual alerting mechanism)
+    # One write for the summary line and the message instead of two prints
+    sys.stdout.write(_ALERT_TEMPLATE(
+        report_id=report_id,
+        drug=safe_drug[:60],
+        risk_level=risk_level,
+        event=_short(adverse_event, 200, "No description"),
+        explanation=_short(explanation, None, "No explanation")
+    ))
+
+    # Send to actual alerting system (Slack, email, PagerDuty, etc.)
+    # Example:
+    # send_to_slack(alert_message)
+    # send_to_pagerduty(report_id, risk_level)
+
+    return result
@@ -3,22 +3,34 @@
 #               supports audit retrieval and reporting
 #==========================================================================
 
-import json
-import uuid
-from datetime import datetime
-from typing import Dict, List, Optional
+import atexit
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional
 
-from app.database.db import get_connection
+import orjson
+
+from app.database.db import get_connection, get_write_connection, enqueue_write, flush_writes
+from app.services._time import iso_utc_now
 
 # ============================
 # VECTOR SERVICE 
 # ============================
 
 from app.services.vector_service import (
-    index_audit_event,
+    _text_key,
+    enqueue_index_events,
     search_similar_events
 )
 
+# Registered after db and vector_service, so at exit it runs first: pending
+# audit rows commit (queuing their index events) before the indexer drains
+atexit.register(flush_writes)
+
 # ============================
 # CORE LOGGING
 # ============================
@@ -27,9 +39,67 @@ from app.services.vector_service import (
 # Generate unique report IDs for traceability
 #=============================================
 
+# Process-local sequence plus random bytes drawn from a 4 KB block, so
+# the kernel RNG is read once per 1024 IDs instead of once per ID
+_report_counter = itertools.count()
+_random_block = b""
+_random_pos = 0
+_random_lock = threading.Lock()
+
+
+def _random_hex4() -> str:
+    global _random_block, _random_pos
+    with _random_lock:
+        if _random_pos >= len(_random_block):
+            _random_block = os.urandom(4096)
+            _random_pos = 0
+        chunk = _random_block[_random_pos:_random_pos + 4]
+        _random_pos += 4
+    return chunk.hex().upper()
+
+
 def generate_report_id() -> str:
     """Generate a unique report ID."""
-    return f"RPT-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8].upper()}"
+    return f"RPT-{time.time_ns()}-{next(_report_counter):08x}-{_random_hex4()}"
+
+
+AUDIT_INSERT_SQL = """
+    INSERT INTO audit_log (
+        report_id, timestamp, drugname, adverse_event,
+        ml_prediction, ml_probability,
+        extracted_drug, extracted_symptoms,
+        escalation_decision, risk_level, final_score,
+        triggered_keywords, explanation, processing_time_ms
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def _audit_row(
+    report_id: str,
+    drugname: str,
+    adverse_event: str,
+    ml_prediction: Dict,
+    entities: Dict,
+    escalation_result,
+    processing_time_ms: float,
+    timestamp: str
+) -> tuple:
+    """Build the AUDIT_INSERT_SQL parameter tuple for one report."""
+    return (
+        report_id,
+        timestamp,
+        drugname,
+        adverse_event,
+        ml_prediction.get("prediction", ""),
+        ml_prediction.get("serious_probability", 0),
+        entities.get("drug", ""),
+        orjson.dumps(entities.get("symptoms", [])).decode(),
+        "ESCALATE" if escalation_result.should_escalate else "NO_ESCALATE",
+        escalation_result.risk_level,
+        escalation_result.final_score,
+        orjson.dumps(escalation_result.triggered_keywords).decode(),
+        escalation_result.explanation,
+        processing_time_ms
+    )
 
 #===========================================================================
 # creates a unique identifier for each adverse event report and then records
@@ -48,54 +118,41 @@ def log_processing(
     """
     Log a processing decision to the audit database
     AND index it into the vector database.
+
+    The row is written behind: True means it was queued. Rows the writer
+    fails to store are logged and counted in /api/health (failed_writes).
     """
     try:
-        with get_connection() as conn:
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                INSERT INTO audit_log (
-                    report_id, drugname, adverse_event,
-                    ml_prediction, ml_probability,
-                    extracted_drug, extracted_symptoms,
-                    escalation_decision, risk_level, final_score,
-                    triggered_keywords, explanation, processing_time_ms
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                report_id,
-                drugname,
-                adverse_event,
-                ml_prediction.get("prediction", ""),
-                ml_prediction.get("serious_probability", 0),
-                entities.get("drug", ""),
-                json.dumps(entities.get("symptoms", [])),
-                "ESCALATE" if escalation_result.should_escalate else "NO_ESCALATE",
-                escalation_result.risk_level,
-                escalation_result.final_score,
-                json.dumps(escalation_result.triggered_keywords),
-                escalation_result.explanation,
-                processing_time_ms
-            ))
-
-            conn.commit()
+        timestamp = iso_utc_now()
 
         # ============================
         # VECTOR INDEXING 
         # ============================
-        try:
-            index_audit_event(
-                report_id=report_id,
-                drugname=drugname,
-                adverse_event=adverse_event,
-                risk_level=escalation_result.risk_level,
-                escalation_decision="ESCALATE" if escalation_result.should_escalate else "NO_ESCALATE",
-                symptoms=entities.get("symptoms", []),
-                ml_probability=ml_prediction.get("serious_probability", 0),
-                timestamp=datetime.utcnow().isoformat()
-            )
-        except Exception as ve:
-            # Do NOT break audit flow if vector fails
-            print(f"[WARN] Vector indexing failed for {report_id}: {ve}")
+        # Runs on the writer thread only after the audit row has committed,
+        # so the vector index never points at a report_id missing from SQL
+        def _index_after_commit() -> None:
+            try:
+                enqueue_index_events([{
+                    "report_id": report_id,
+                    "drugname": drugname,
+                    "adverse_event": adverse_event,
+                    "risk_level": escalation_result.risk_level,
+                    "escalation_decision": "ESCALATE" if escalation_result.should_escalate else "NO_ESCALATE",
+                    "symptoms": entities.get("symptoms", []),
+                    "ml_probability": ml_prediction.get("serious_probability", 0),
+                    "timestamp": timestamp
+                }])
+            except Exception as ve:
+                # Do NOT break audit flow if vector fails
+                print(f"[WARN] Vector indexing failed for {report_id}: {ve}")
+
+        # Write-behind: the row is committed by the background writer,
+        # batched with any other pending audit rows
+        enqueue_write(AUDIT_INSERT_SQL, _audit_row(
+            report_id, drugname, adverse_event,
+            ml_prediction, entities, escalation_result, processing_time_ms,
+            timestamp
+        ), on_commit=_index_after_commit)
 
         return True
 
@@ -104,11 +161,88 @@ def log_processing(
         return False
 
 
+#===========================================================================
+# Logs many processed reports at once: all rows go in with one executemany
+# inside a single transaction (one commit), then the batch is indexed
+# into the vector database with one embedding call.
+# Each record is a dict with the same keys as log_processing's arguments.
+#===========================================================================
+
+def log_processing_batch(records: List[Dict]) -> bool:
+    """
+    Log a batch of processing decisions to the audit database
+    AND index them into the vector database.
+    """
+    if not records:
+        return True
+
+    timestamp = iso_utc_now()
+    try:
+        rows = [
+            _audit_row(
+                r["report_id"], r["drugname"], r["adverse_event"],
+                r["ml_prediction"], r["entities"], r["escalation_result"],
+                r["processing_time_ms"], timestamp
+            )
+            for r in records
+        ]
+
+        with get_write_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(AUDIT_INSERT_SQL, rows)
+            conn.commit()
+
+    except Exception as e:
+        print(f"Error logging batch to audit: {e}")
+        return False
+
+    # Do NOT fail the batch if vector indexing fails
+    enqueue_index_events([
+        {
+            "report_id": r["report_id"],
+            "drugname": r["drugname"],
+            "adverse_event": r["adverse_event"],
+            "risk_level": r["escalation_result"].risk_level,
+            "escalation_decision": "ESCALATE" if r["escalation_result"].should_escalate else "NO_ESCALATE",
+            "symptoms": r["entities"].get("symptoms", []),
+            "ml_probability": r["ml_prediction"].get("serious_probability", 0),
+            "timestamp": timestamp
+        }
+        for r in records
+    ])
+
+    return True
+
+
 # ============================
 # STANDARD AUDIT RETRIEVAL
 # ============================
 
 
+# Filter bits for get_audit_logs; every combination is built once at import
+# so the exact same SQL text is reused and hits sqlite3's statement cache
+_FILTER_RISK, _FILTER_ESCALATED, _FILTER_START, _FILTER_END = 1, 2, 4, 8
+
+
+def _build_audit_logs_query(key: int) -> str:
+    query = "SELECT * FROM audit_log WHERE 1=1"
+    if key & _FILTER_RISK:
+        query += " AND risk_level = ?"
+    if key & _FILTER_ESCALATED:
+        query += " AND escalation_decision = 'ESCALATE'"
+    if key & _FILTER_START:
+        query += " AND timestamp >= ?"
+    if key & _FILTER_END:
+        query += " AND timestamp <= ?"
+    return query + " ORDER BY timestamp DESC LIMIT ? OFFSET ?"
+
+
+_AUDIT_LOGS_QUERIES = {key: _build_audit_logs_query(key) for key in range(16)}
+
+
+AUDIT_FETCH_SIZE = 200
+
+
 #=======================================================================================
 # retrieves audit records from the audit database with flexible filtering and pagination
 #=======================================================================================
@@ -122,34 +256,56 @@ def get_audit_logs(
     end_date: Optional[str] = None
 ) -> List[Dict]:
     """Retrieve audit logs with optional filtering."""
-    with get_connection() as conn:
-        cursor = conn.cursor()
+    return [
+        dict(row)
+        for chunk in iter_audit_logs(
+            limit, offset, risk_level, escalated_only, start_date, end_date
+        )
+        for row in chunk
+    ]
 
-        query = "SELECT * FROM audit_log WHERE 1=1"
-        params = []
+#=======================================================================================
+# Same query as get_audit_logs, but yields the rows lazily in chunks of
+# AUDIT_FETCH_SIZE so a large page never sits fully in memory. The pooled
+# connection is held until the generator is exhausted or closed.
+#=======================================================================================
 
-        if risk_level:
-            query += " AND risk_level = ?"
-            params.append(risk_level)
+def iter_audit_logs(
+    limit: int = 100,
+    offset: int = 0,
+    risk_level: Optional[str] = None,
+    escalated_only: bool = False,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> Iterator[List[sqlite3.Row]]:
+    """Yield audit log rows in chunks, with optional filtering."""
+    key = 0
+    params = []
 
-        if escalated_only:
-            query += " AND escalation_decision = 'ESCALATE'"
+    if risk_level:
+        key |= _FILTER_RISK
+        params.append(risk_level)
 
-        if start_date:
-            query += " AND timestamp >= ?"
-            params.append(start_date)
+    if escalated_only:
+        key |= _FILTER_ESCALATED
 
-        if end_date:
-            query += " AND timestamp <= ?"
-            params.append(end_date + " 23:59:59")
+    if start_date:
+        key |= _FILTER_START
+        params.append(start_date)
 
-        query += " ORDER BY timestamp DESC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
+    if end_date:
+        key |= _FILTER_END
+        params.append(end_date + " 23:59:59")
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+    params.extend([limit, offset])
 
-        return [dict(row) for row in rows]
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.arraysize = AUDIT_FETCH_SIZE
+        cursor.execute(_AUDIT_LOGS_QUERIES[key], params)
+
+        while chunk := cursor.fetchmany():
+            yield chunk
 
 #=====================================================================
 # fetches a single audit record from the database using a report ID
@@ -211,6 +367,14 @@ def get_audit_summary() -> Dict:
 # finds and returns semantically similar serious adverse event cases from the vector database
 #=============================================================================================
 
+SIMILAR_EVENTS_CACHE_SIZE = 1024
+SIMILAR_EVENTS_TTL_SECONDS = 300
+
+# (drugname, adverse_event digest, symptoms, limit) -> (expires_at, events)
+_similar_events_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_similar_events_lock = threading.Lock()
+
+
 def get_similar_serious_events_vector(
     drugname: str,
     adverse_event: str,
@@ -219,8 +383,27 @@ def get_similar_serious_events_vector(
     current_report_id: str,
     limit: int = 5
 ) -> List[Dict]:
+    """
+    Escalated reports often repeat the same drug + event, so results are
+    cached per query for SIMILAR_EVENTS_TTL_SECONDS (similar events are
+    reference context, not part of the decision).
+    """
+    # risk_level is not part of the query embedding, so it is not part of the
+    # key; the event text (a whole PDF on /api/process-pdf) is keyed by digest
+    key = (drugname, _text_key(adverse_event or ""), tuple(current_symptoms or ()), limit)
+    now = time.monotonic()
+
+    with _similar_events_lock:
+        cached = _similar_events_cache.get(key)
+        if cached and cached[0] > now:
+            _similar_events_cache.move_to_end(key)
+            return [
+                dict(event) for event in cached[1]
+                if event["report_id"] != current_report_id
+            ]
+
     try:
-        raw_results = search_similar_events(
+        similar_events = search_similar_events(
             query_drugname=drugname,
             query_event=adverse_event,
             query_symptoms=current_symptoms,
@@ -230,62 +413,15 @@ def get_similar_serious_events_vector(
             escalated_only=True
         )
 
-        similar_events = []
-
-        for row in raw_results:
-            similar_events.append({
-                "report_id": row.get("report_id"),
-                "drugname": row.get("drugname"),
-
-              
-                "adverse_event": row.get("canonical_text", ""),
-
-                "timestamp": row.get("timestamp"),
-                "risk_level": row.get("risk_level"),
-                "ml_probability": row.get("ml_probability"),
-                "final_score": None,  # not returned by vector
-                "matched_symptoms": row.get("matched_symptoms", [])
-            })
+        with _similar_events_lock:
+            _similar_events_cache[key] = (now + SIMILAR_EVENTS_TTL_SECONDS, similar_events)
+            _similar_events_cache.move_to_end(key)
+            while len(_similar_events_cache) > SIMILAR_EVENTS_CACHE_SIZE:
+                _similar_events_cache.popitem(last=False)
 
         print(f"[Vector] Returning {len(similar_events)} similar events for {drugname}")
-        return similar_events
+        return [dict(event) for event in similar_events]
 
     except Exception as e:
         print(f"[ERROR] Vector similarity failed: {e}")
         return []
-
-
-# ============================================================
-# LEGACY SQL SIMILARITY 
-# ============================================================
-
-#====================================================================================
-# drug-based SQL similarity search (kept for debugging/fallback, not primary anymore)
-#====================================================================================
-
-def get_similar_serious_events_drug_based(
-    drugname: str,
-    current_symptoms: List[str],
-    current_report_id: str,
-    limit: int = 5
-) -> List[Dict]:
-    """
-    LEGACY: Drug-based SQL similarity.
-    Kept only for debugging / fallback.
-    """
-    return []
-
-#=================================================================================
-# SQL keyword overlap similarity (kept for debugging/fallback, not primary anymore)
-#=================================================================================
-
-def get_similar_serious_events(
-    current_symptoms: List[str],
-    current_report_id: str,
-    limit: int = 5
-) -> List[Dict]:
-    """
-    LEGACY: SQL keyword overlap similarity.
-    DO NOT USE as primary anymore.
-    """
-    return []
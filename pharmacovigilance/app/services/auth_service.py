@@ -2,28 +2,54 @@
 # DESCRIPTION : It implements a basic authentication and identity management layer for the application
 #==================================================================================================
 
+import base64
+import hashlib
+import hmac
+import os
+import secrets
 import sqlite3
-from datetime import datetime, timedelta
+import time
+from functools import cache
 from typing import Optional, Dict, Any
-from pathlib import Path
 
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError
 import jwt
+import orjson
+
+from app.database.db import get_connection, get_write_connection
+from app.services._time import iso_utc_now
 
 # ============ Configuration ============
 
-SECRET_KEY = "pharmacovigilance-secret-key-change-in-production"
+# Signing key, read once as bytes from the environment (JWT_SECRET).
+# Without it a random per-process key is used: tokens then stop working
+# on restart and are not shared between workers.
+SECRET_KEY: bytes = os.getenv("JWT_SECRET", "").encode() or secrets.token_bytes(32)
+if not os.getenv("JWT_SECRET"):
+    print("[Auth] JWT_SECRET not set - using a random per-process signing key")
 ALGORITHM = "HS256"
 TOKEN_EXPIRE_HOURS = 24
 
-# Database path
-BASE_DIR = Path(__file__).resolve().parents[2]
-DATA_DIR = BASE_DIR / "data"
-DB_PATH = DATA_DIR / "audit.db"
+# Token minting is done by hand for HS256: the header segment
+# never changes, so it is built once here
+_JWT_HEADER_B64 = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=")
 
 # Initialize Argon2 password hasher
-ph = PasswordHasher()
+# Argon2id with the OWASP minimum parameters (19 MiB, t=2, p=1):
+# a fraction of the library defaults' CPU time and memory per login.
+# Hashes made with older parameters are upgraded on the next login.
+ph = PasswordHasher(
+    time_cost=2,
+    memory_cost=19456,
+    parallelism=1,
+    hash_len=32,
+    salt_len=16
+)
+
+# Verified against when the username does not exist, so unknown users
+# take as long to reject as wrong passwords (built on first use)
+_dummy_hash = None
 
 
 # ============ Database Initialization ============
@@ -32,9 +58,13 @@ ph = PasswordHasher()
 # creates the authentication storage layer using SQLite
 #=========================================================
 
+@cache
 def init_users_table():
-    """Initialize the users table in the database."""
-    with sqlite3.connect(DB_PATH) as conn:
+    """
+    Initialize the users table in the database.
+    Called once from the app lifespan; @cache makes repeat calls no-ops.
+    """
+    with get_write_connection() as conn:
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -98,6 +128,32 @@ def verify_password(password: str, password_hash: str) -> bool:
         return False
 
 
+#=========================================================================
+# Burns the same Argon2 work as a real verify, for logins with an unknown
+# username, so response timing does not reveal which usernames exist
+#=========================================================================
+
+def _verify_dummy_password(password: str) -> None:
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = ph.hash("dummy-password")
+    verify_password(password, _dummy_hash)
+
+
+#=============================================================
+# Stores a new password hash for a user (used for rehashing)
+#=============================================================
+
+def update_password_hash(user_id: int, password_hash: str) -> None:
+    """Replace a user's stored password hash."""
+    with get_write_connection() as conn:
+        conn.execute(
+            "UPDATE users SET password_hash = ? WHERE id = ?",
+            (password_hash, user_id)
+        )
+        conn.commit()
+
+
 # ============ JWT Token Management ============
 
 #=====================================================================
@@ -115,13 +171,16 @@ def create_token(user_id: int, username: str) -> str:
     Returns:
         JWT token string
     """
-    expire = datetime.utcnow() + timedelta(hours=TOKEN_EXPIRE_HOURS)
     payload = {
         "user_id": user_id,
         "username": username,
-        "exp": expire
+        "exp": int(time.time()) + TOKEN_EXPIRE_HOURS * 3600
     }
-    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+    signing_input = (
+        _JWT_HEADER_B64 + b"." + base64.urlsafe_b64encode(orjson.dumps(payload)).rstrip(b"=")
+    )
+    signature = hmac.new(SECRET_KEY, signing_input, hashlib.sha256).digest()
+    return (signing_input + b"." + base64.urlsafe_b64encode(signature).rstrip(b"=")).decode()
 
 #================================================================
 # checks whether a JWT token is valid and not expired,
@@ -163,8 +222,7 @@ def get_user_by_username(username: str) -> Optional[Dict[str, Any]]:
     Returns:
         User dict if found, None otherwise
     """
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
+    with get_connection() as conn:
         cursor = conn.cursor()
         
         cursor.execute(
@@ -191,8 +249,7 @@ def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
     Returns:
         User dict if found, None otherwise
     """
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
+    with get_connection() as conn:
         cursor = conn.cursor()
         
         cursor.execute(
@@ -219,8 +276,7 @@ def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
     Returns:
         User dict if found, None otherwise
     """
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
+    with get_connection() as conn:
         cursor = conn.cursor()
         
         cursor.execute(
@@ -249,43 +305,48 @@ def create_user(username: str, email: str, password: str) -> Dict[str, Any]:
     Returns:
         Dict with success status and user data or error message
     """
-    # Check if username already exists
-    if get_user_by_username(username):
-        return {
-            "success": False,
-            "error": "Username already exists"
-        }
-    
-    # Check if email already exists
-    if get_user_by_email(email):
-        return {
-            "success": False,
-            "error": "Email already registered"
-        }
-    
-    # Hash password with Argon2
+    # Hash password with Argon2 before taking the write connection,
+    # so the hashing work never holds the writer lock
     password_hash = hash_password(password)
-    created_at = datetime.utcnow().isoformat()
+    # Naive UTC, the format existing rows (and the other tables) store
+    created_at = iso_utc_now()
     
     try:
-        with sqlite3.connect(DB_PATH) as conn:
+        with get_write_connection() as conn:
             cursor = conn.cursor()
             
+            # One atomic statement: no gap between the uniqueness checks
+            # and the insert. Conflicts return no row instead of raising.
             cursor.execute(
                 """
                 INSERT INTO users (username, email, password_hash, created_at)
                 VALUES (?, ?, ?, ?)
+                ON CONFLICT DO NOTHING
+                RETURNING id
                 """,
                 (username, email, password_hash, created_at)
             )
+            row = cursor.fetchone()
+            
+            if row is None:
+                # Work out which unique column collided
+                cursor.execute(
+                    "SELECT 1 FROM users WHERE username = ?",
+                    (username,)
+                )
+                taken = cursor.fetchone()
+                conn.rollback()
+                return {
+                    "success": False,
+                    "error": "Username already exists" if taken else "Email already registered"
+                }
             
-            user_id = cursor.lastrowid
             conn.commit()
             
             return {
                 "success": True,
                 "user": {
-                    "id": user_id,
+                    "id": row[0],
                     "username": username,
                     "email": email,
                     "created_at": created_at
@@ -316,6 +377,7 @@ def authenticate_user(username: str, password: str) -> Dict[str, Any]:
     user = get_user_by_username(username)
     
     if not user:
+        _verify_dummy_password(password)
         return {
             "success": False,
             "error": "Invalid username or password"
@@ -327,6 +389,10 @@ def authenticate_user(username: str, password: str) -> Dict[str, Any]:
             "error": "Invalid username or password"
         }
     
+    # Migrate hashes made with older Argon2 parameters
+    if ph.check_needs_rehash(user["password_hash"]):
+        update_password_hash(user["id"], hash_password(password))
+    
     # Create JWT token
     token = create_token(user["id"], user["username"])
     
@@ -341,6 +407,3 @@ def authenticate_user(username: str, password: str) -> Dict[str, Any]:
         "token": token
     }
 
-
-# Initialize users table on module import
-init_users_table()
@@ -4,7 +4,10 @@
 #====================================================================================
 
 from app.database.db import get_connection
-from app.services.vector_service import index_audit_event
+from app.services.vector_service import index_audit_events
+
+# Rows embedded per encode() call / upserted per Chroma write
+BACKFILL_BATCH_SIZE = 128
 
 
 #===================================================================================================
@@ -23,6 +26,9 @@ def backfill():
         print(f"[Backfill][DEBUG] Total rows in audit_log: {total}")
 
         # REAL query using REAL DB column names
+        # Streamed in BACKFILL_BATCH_SIZE chunks: memory stays flat however
+        # many historical rows there are
+        cursor.arraysize = BACKFILL_BATCH_SIZE
         cursor.execute("""
             SELECT 
                 report_id,
@@ -35,27 +41,30 @@ def backfill():
             WHERE escalation_decision = 'ESCALATE'
         """)
 
-        rows = cursor.fetchall()
-        print(f"[Backfill] Found {len(rows)} historical escalated records")
-
-        for row in rows:
-            record = dict(row)
+        processed = 0
+        while batch := cursor.fetchmany():
+            processed += len(batch)
+            events = [
+                {
+                    "report_id": row["report_id"],
+                    "drugname": row["drugname"],
+                    "adverse_event": row["adverse_event"],
+                    "risk_level": row["risk_level"],
+                    "escalation_decision": row["escalation_decision"],
+                    "symptoms": [],              # not stored in DB
+                    "ml_probability": 0.0,       # not required for backfill
+                    "timestamp": row["timestamp"]
+                }
+                for row in batch
+            ]
 
-            success = index_audit_event(
-                report_id=record["report_id"],
-                drugname=record["drugname"],
-                adverse_event=record["adverse_event"],
-                risk_level=record["risk_level"],
-                escalation_decision=record["escalation_decision"],
-                symptoms=[],                 # not stored in DB
-                ml_probability=0.0,          # not required for backfill
-                timestamp=record.get("timestamp")
-            )
-
-            if success:
-                print(f"[Backfill] ✓ Indexed {record['report_id']}")
+            # One batched embedding call + one upsert per batch
+            if index_audit_events(events):
+                print(f"[Backfill] ✓ Indexed {len(events)} records")
             else:
-                print(f"[Backfill] ✗ Failed {record['report_id']}")
+                print(f"[Backfill] ✗ Failed batch of {len(events)} records")
+
+        print(f"[Backfill] Processed {processed} historical escalated records")
 
     print("[Backfill] Completed backfill process.")
 
@@ -4,10 +4,15 @@
 # =================================================================================================
 import os
 import joblib
+import numpy as np
+from scipy.special import expit
+from sklearn.linear_model import LogisticRegression
 from typing import Dict, List, Tuple, Optional
 from pathlib import Path
-from app.services.preprocessor import combine_features, preprocess_text
-
+from app.services.preprocessor import DRUG_TOKEN_PREFIX, combine_features, preprocess_text
+from app.services.keyword_scanner import (
+    OVERRIDE_KEYWORDS, build_keyword_screen, is_negated, scan
+)
 
 # Get the project root directory
 PROJECT_ROOT = Path(__file__).parent.parent.parent
@@ -18,86 +23,27 @@ VECTORIZER_PATH = PROJECT_ROOT / "ml" / "vectorizer.pkl"
 _model = None
 _vectorizer = None
 
+# Derived from the model's classes_ at load time
+_serious_idx = 1
 
-# =========================
-# RULE-BASED SAFETY LAYER
-# =========================
-
-SERIOUS_KEYWORDS = [
-    # Regulatory criteria
-    "hospital", "hospitalized", "hospitalised", "admitted", "admission",
-    "icu", "intensive care", "critical care", "ccu",
-    "death", "died", "fatal", "expired", "mortality",
-
-    # Life-threatening / emergency
-    "life threatening", "life-threatening",
-    "cardiac arrest", "respiratory arrest",
-    "shock", "septic shock", "anaphylaxis",
-
-    # Major bleeding
-    "gastrointestinal bleeding", "gi bleeding", "gi bleed",
-    "melena", "black tarry stools",
-    "hematemesis", "vomiting blood",
-    "hemorrhage", "haemorrhage", "bleeding requiring transfusion",
-    "blood transfusion", "transfusion",
-    "hematuria", "blood in urine",
-    "hemoptysis", "coughing up blood",
-    "rectal bleeding",
-
-    # Neurologic / brain
-    "intracranial hemorrhage", "intracranial haemorrhage",
-    "brain bleed", "cerebral hemorrhage",
-    "stroke", "cva", "subarachnoid hemorrhage",
-
-    # Cardiac
-    "myocardial infarction", "heart attack",
-    "ventricular fibrillation", "ventricular tachycardia",
-    "cardiac arrhythmia", "asystole",
-
-    # Organ failure
-    "acute renal failure", "kidney failure",
-    "acute liver failure", "hepatic failure",
-    "respiratory failure", "ventilator", "intubated",
-
-    # Severe allergic / dermatologic
-    "anaphylactic shock", "stevens-johnson syndrome", "sjs",
-    "toxic epidermal necrolysis", "ten",
+# Newer models are trained on int8 labels (1 = Serious); older ones on strings
+_CLASS_LABELS = {0: "Non-Serious", 1: "Serious"}
+_sigmoid_scoring = False
 
-    # Pregnancy / congenital
-    "congenital anomaly", "birth defect", "teratogenic",
+# Whether the vectorizer was trained on drug_-marked tokens; artifacts from
+# before the marking expect the legacy repeated-drug-name layout
+_drug_tokens_marked = True
 
-    # Disability / permanent damage
-    "permanent disability", "paralysis", "blindness", "coma",
 
-    # Surgical / emergency intervention
-    "emergency surgery", "urgent surgery",
-    "intubation", "mechanical ventilation",
+# =========================
+# RULE-BASED SAFETY LAYER
+# =========================
 
-    # High-risk labs / conditions
-    "severe anemia", "hemoglobin drop",
-    "coagulopathy", "overdose", "toxicity"
-]
+# Override keywords live in keyword_scanner (shared with escalation)
+SERIOUS_KEYWORDS = OVERRIDE_KEYWORDS
 
 SERIOUS_THRESHOLD = 0.30  # Lower threshold to favor recall
 
-NEGATION_TRIGGERS = [
-    "no", "not", "denies", "denied", "without",
-    "never", "absence of", "free of", "ruled out"
-]
-
-def is_negated(text: str, keyword: str, window: int = 5) -> bool:
-    text = text.lower()
-    words = text.split()
-    keyword_tokens = keyword.split()
-
-    for i in range(len(words)):
-        if words[i:i+len(keyword_tokens)] == keyword_tokens:
-            start = max(0, i - window)
-            context = " ".join(words[start:i])
-            if any(neg in context for neg in NEGATION_TRIGGERS):
-                return True
-    return False
-
 NEGATED_SERIOUS_TERMS = [
     "bleeding", "bleed", "hemorrhage", "haemorrhage",
     "hospital", "hospitalized", "hospitalised", "hospitalization",
@@ -109,20 +55,66 @@ NEGATED_SERIOUS_TERMS = [
     "coma"
 ]
 
+_negated_terms_screen = build_keyword_screen(NEGATED_SERIOUS_TERMS)
+_serious_screen = build_keyword_screen(OVERRIDE_KEYWORDS)
 
 
+#=================================================================================
+# True when the text mentions serious terms and every one of them is negated
+# (drives the negation-aware Non-Serious override)
+#=================================================================================
+
+def _serious_terms_all_negated(text: str) -> bool:
+    if _negated_terms_screen.search(text) is None:
+        return False
+
+    text_lower = text.lower()
+    found_serious = False
+
+    for term in NEGATED_SERIOUS_TERMS:
+        if term in text_lower:
+            found_serious = True
+            if not is_negated(text, term):
+                return False
+
+    return found_serious
+
 
 def rule_based_serious_override(text: str) -> bool:
-    text = text.lower()
-    for keyword in SERIOUS_KEYWORDS:
-        if keyword in text and not is_negated(text, keyword):
-            return True
-    return False
+    return scan(text)["override"]
 
 class ClassifierNotLoadedError(Exception):
     """Raised when classifier is used before loading."""
     pass
 
+#============================================================================
+# Makes sure the loaded model and vectorizer predict in float32
+#============================================================================
+
+def _as_float32(array: np.ndarray) -> np.ndarray:
+    # Already float32 (current artifacts): keep the memory-mapped array
+    return array if array.dtype == np.float32 else array.astype(np.float32)
+
+
+def _downcast_to_float32(model, vectorizer) -> None:
+    """
+    Use float32 IDF weights and linear coefficients.
+
+    The predict path is a sparse dot product bound by memory bandwidth;
+    float32 halves the bytes moved. train_classifier.py saves these arrays
+    as float32, so they stay memory-mapped; only older float64 artifacts
+    are copied here. Scores shift by well under 1e-4 (see
+    tests/test_classifier.py).
+    """
+    if hasattr(vectorizer, "idf_"):
+        # Count matrix in float32 too, so the IDF product is not upcast
+        vectorizer.dtype = np.float32
+        vectorizer.idf_ = _as_float32(vectorizer.idf_)
+    if hasattr(model, "coef_"):
+        model.coef_ = _as_float32(model.coef_)
+        model.intercept_ = _as_float32(model.intercept_)
+
+
 #============================================================================
 # function loads a trained ML model and its vectorizer from disk into memory
 #============================================================================
@@ -134,15 +126,32 @@ def load_model() -> bool:
     Returns:
         True if loaded successfully, False otherwise
     """
-    global _model, _vectorizer
+    global _model, _vectorizer, _serious_idx, _sigmoid_scoring, _drug_tokens_marked
     
     try:
         if not MODEL_PATH.exists() or not VECTORIZER_PATH.exists():
             print(f"Model files not found at {MODEL_PATH}")
             return False
         
-        _model = joblib.load(MODEL_PATH)
-        _vectorizer = joblib.load(VECTORIZER_PATH)
+        # Both artifacts' arrays are only read at predict time: map them
+        # from disk (shared page cache across workers) instead of copying
+        # them onto each process heap
+        _model = joblib.load(MODEL_PATH, mmap_mode="r")
+        _vectorizer = joblib.load(VECTORIZER_PATH, mmap_mode="r")
+        _downcast_to_float32(_model, _vectorizer)
+
+        # Fixed for the lifetime of the model: resolve once, not per predict
+        classes = [_CLASS_LABELS.get(c, c) for c in _model.classes_.tolist()]
+        _serious_idx = classes.index("Serious") if "Serious" in classes else 1
+        _sigmoid_scoring = isinstance(_model, LogisticRegression) and len(classes) == 2
+
+        # Match the text layout the vectorizer was trained on
+        vocabulary = getattr(_vectorizer, "vocabulary_", None)
+        _drug_tokens_marked = vocabulary is None or any(
+            term.startswith(DRUG_TOKEN_PREFIX) for term in vocabulary
+        )
+        if not _drug_tokens_marked:
+            print("Vectorizer has no drug-marked terms: using the legacy feature layout")
         print("Model and vectorizer loaded successfully")
         return True
     except Exception as e:
@@ -158,6 +167,27 @@ def is_model_loaded() -> bool:
     return _model is not None and _vectorizer is not None
 
 
+#============================================================================
+# Serious-class probability (and confidence) for a list of texts. For the
+# binary LogisticRegression we train, predict_proba is exactly the sigmoid of
+# decision_function, so the normalisation pass is skipped; other models fall
+# back to predict_proba.
+#============================================================================
+
+def _predict_serious_proba(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    X = _vectorizer.transform(texts)
+
+    if _sigmoid_scoring:
+        # decision_function scores the positive class, classes_[1]
+        positive_prob = expit(_model.decision_function(X))
+        serious_prob = positive_prob if _serious_idx == 1 else 1 - positive_prob
+        confidence = np.maximum(serious_prob, 1 - serious_prob)
+        return serious_prob, confidence
+
+    probabilities = _model.predict_proba(X)
+    return probabilities[:, _serious_idx], probabilities.max(axis=1)
+
+
 def predict_single(text: str) -> Dict:
     """
     Predict seriousness for a single text input.
@@ -175,18 +205,7 @@ def predict_single(text: str) -> Dict:
     # -------------------------
     # NEGATION-AWARE OVERRIDE (FIRST)
     # -------------------------
-    text_lower = text.lower()
-    found_serious = False
-    all_negated = True
-
-    for term in NEGATED_SERIOUS_TERMS:
-        if term in text_lower:
-            found_serious = True
-            if not is_negated(text, term):
-                all_negated = False
-                break
-
-    if found_serious and all_negated:
+    if _serious_terms_all_negated(text):
         return {
             "prediction": "Non-Serious",
             "serious_probability": 0.0,
@@ -210,11 +229,8 @@ def predict_single(text: str) -> Dict:
     # -------------------------
     # ML PREDICTION
     # -------------------------
-    X = _vectorizer.transform([text])
-    probabilities = _model.predict_proba(X)[0]
-    classes = _model.classes_
-    serious_idx = list(classes).index("Serious")
-    serious_prob = probabilities[serious_idx]
+    serious_probs, confidences = _predict_serious_proba([text])
+    serious_prob = serious_probs[0]
 
     prediction = "Serious" if serious_prob >= SERIOUS_THRESHOLD else "Non-Serious"
 
@@ -222,7 +238,7 @@ def predict_single(text: str) -> Dict:
         "prediction": prediction,
         "serious_probability": float(serious_prob),
         "non_serious_probability": float(1 - serious_prob),
-        "confidence": float(max(probabilities)),
+        "confidence": float(confidences[0]),
         "reason": "ML classifier"
     }
 
@@ -238,7 +254,12 @@ def predict_from_features(drugname: str, adverse_event: str) -> Dict:
     Returns:
         Dict with prediction details
     """
-    combined_text = combine_features(drugname, adverse_event)
+    # load_model() first so the feature layout matches the loaded vectorizer
+    if not is_model_loaded():
+        if not load_model():
+            raise ClassifierNotLoadedError("Classifier model not loaded. Run train_classifier.py first.")
+
+    combined_text = combine_features(drugname, adverse_event, mark_drug=_drug_tokens_marked)
     return predict_single(combined_text)
 
 
@@ -261,64 +282,56 @@ def predict_batch(texts: List[str]) -> List[Dict]:
         if not load_model():
             raise ClassifierNotLoadedError("Classifier model not loaded.")
     
-    results = []
+    results = [None] * len(texts)  # None = placeholder for ML prediction
     
+    # Screen every text once; only texts mentioning a serious or
+    # negatable term can hit an override, the rest go straight to ML
+    candidates = np.fromiter(
+        (
+            _serious_screen.search(text) is not None
+            or _negated_terms_screen.search(text) is not None
+            for text in texts
+        ),
+        dtype=bool,
+        count=len(texts)
+    )
+
     # Handle rule-based overrides individually
-    for text in texts:
-        text_lower = text.lower()
-        found_serious = False
-        all_negated = True
-
-        for term in NEGATED_SERIOUS_TERMS:
-            if term in text_lower:
-                found_serious = True
-                if not is_negated(text, term):
-                    all_negated = False
-                    break
-
-        if found_serious and all_negated:
-            results.append({
+    for i in np.flatnonzero(candidates):
+        text = texts[i]
+
+        if _serious_terms_all_negated(text):
+            results[i] = {
                 "prediction": "Non-Serious",
                 "serious_probability": 0.0,
                 "non_serious_probability": 1.0,
                 "confidence": 1.0,
                 "reason": "Negation-aware override (batch)"
-            })
-            continue
-
-        if rule_based_serious_override(text):
-            results.append({
+            }
+        elif rule_based_serious_override(text):
+            results[i] = {
                 "prediction": "Serious",
                 "serious_probability": 1.0,
                 "non_serious_probability": 0.0,
                 "confidence": 1.0,
                 "reason": "Rule-based override: high-risk keyword detected"
-            })
-        else:
-            results.append(None)  # placeholder
+            }
     
     # Vectorize only non-overridden
     idx_map = [i for i, r in enumerate(results) if r is None]
     if idx_map:
         filtered_texts = [texts[i] for i in idx_map]
-        X = _vectorizer.transform(filtered_texts)
-        probabilities = _model.predict_proba(X)
-        
-        classes = _model.classes_
-        serious_idx = list(classes).index('Serious') if 'Serious' in classes else 1
+        serious_probs, confidences = _predict_serious_proba(filtered_texts)
+        predictions = np.where(serious_probs >= SERIOUS_THRESHOLD, "Serious", "Non-Serious")
         
-        for j, probs in enumerate(probabilities):
-            serious_prob = probs[serious_idx]
-            if serious_prob >= SERIOUS_THRESHOLD:
-                prediction = "Serious"
-            else:
-                prediction = "Non-Serious"
-            
+        for j, (prediction, serious_prob, confidence) in enumerate(
+            zip(predictions.tolist(), serious_probs.tolist(), confidences.tolist())
+        ):
             results[idx_map[j]] = {
                 "prediction": prediction,
-                "serious_probability": float(serious_prob),
-                "non_serious_probability": float(1 - serious_prob),
-                "confidence": float(max(probs)),
+                "serious_probability": serious_prob,
+                "non_serious_probability": 1 - serious_prob,
+                "confidence": confidence,
                 "reason": "ML classifier"
             }
     
@@ -336,7 +349,7 @@ def get_model_info() -> Dict:
     return {
         "loaded": True,
         "model_type": type(_model).__name__,
-        "classes": list(_model.classes_),
+        "classes": [_CLASS_LABELS.get(c, c) for c in _model.classes_.tolist()],
         "n_features": _vectorizer.max_features if hasattr(_vectorizer, 'max_features') else "unknown",
         "serious_threshold": SERIOUS_THRESHOLD,
         "rule_based_keywords": SERIOUS_KEYWORDS
@@ -3,17 +3,46 @@
 #               to enrich adverse event analysis with authoritative medical context
 #=====================================================================================
 
-import requests
 import sqlite3
-from datetime import datetime
-from typing import Optional, Dict
+import threading
+from collections import OrderedDict
+from functools import cache
+from datetime import datetime, timezone
+from typing import Optional, Dict, Union
 import re
-from bs4 import BeautifulSoup
+
+from app.services._http import DAILYMED_SESSION
 
 
 # Database setup
 DB_PATH = "app/database/drug_info_cache.db"
 
+# One long-lived connection for the cache (WAL, lock-serialized access)
+# instead of opening and closing the file on every lookup
+_CONN = sqlite3.connect(DB_PATH, check_same_thread=False)
+_CONN.execute("PRAGMA journal_mode=WAL")
+_CONN.execute("PRAGMA synchronous=NORMAL")
+_CONN_LOCK = threading.Lock()
+
+# In-process LRU in front of the SQLite cache for frequently queried drugs.
+# Only real label data is kept; "not available" fallbacks are not cached,
+# so a transient DailyMed outage is retried on the next request.
+DRUG_INFO_CACHE_SIZE = 2048
+_drug_info_cache: "OrderedDict[str, Dict]" = OrderedDict()
+_drug_info_lock = threading.Lock()
+
+#====================================================================================
+# Builds the SPL XML parser on first use, so lxml is only imported by workers that
+# actually miss the cache. Returns (etree, parser). SPL labels are untrusted input:
+# no entity expansion or network access, and libxml2's default depth/size limits
+# stay on.
+#====================================================================================
+
+@cache
+def _spl_parser():
+    from lxml import etree
+    return etree, etree.XMLParser(resolve_entities=False, no_network=True)
+
 
 #====================================================================================
 # It initializes a local SQLite cache database for storing FDA drug label information
@@ -21,22 +50,18 @@ DB_PATH = "app/database/drug_info_cache.db"
 
 def init_drug_info_db():
     """Initialize the drug info cache database."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS drug_info_cache (
-            drug_name TEXT PRIMARY KEY,
-            indications TEXT,
-            warnings TEXT,
-            adverse_reactions TEXT,
-            source TEXT,
-            fetched_at DATETIME
-        )
-    """)
-    
-    conn.commit()
-    conn.close()
+    with _CONN_LOCK:
+        _CONN.execute("""
+            CREATE TABLE IF NOT EXISTS drug_info_cache (
+                drug_name TEXT PRIMARY KEY,
+                indications TEXT,
+                warnings TEXT,
+                adverse_reactions TEXT,
+                source TEXT,
+                fetched_at DATETIME
+            )
+        """)
+        _CONN.commit()
 
 #======================================================================================
 # It checks whether FDA drug information for a given drug is already cached in the local 
@@ -46,17 +71,12 @@ def init_drug_info_db():
 def fetch_from_sqlite(drug_name: str) -> Optional[Dict]:
     """Check if drug info is cached in SQLite."""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT indications, warnings, adverse_reactions, source, fetched_at
-            FROM drug_info_cache
-            WHERE drug_name = ?
-        """, (drug_name.upper(),))
-        
-        row = cursor.fetchone()
-        conn.close()
+        with _CONN_LOCK:
+            row = _CONN.execute("""
+                SELECT indications, warnings, adverse_reactions, source, fetched_at
+                FROM drug_info_cache
+                WHERE drug_name = ?
+            """, (drug_name.upper(),)).fetchone()
         
         if row:
             return {
@@ -80,30 +100,29 @@ def fetch_from_sqlite(drug_name: str) -> Optional[Dict]:
 def save_to_sqlite(drug_name: str, parsed_data: Dict):
     """Save parsed drug info to SQLite cache."""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT OR REPLACE INTO drug_info_cache 
-            (drug_name, indications, warnings, adverse_reactions, source, fetched_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            drug_name.upper(),
-            parsed_data["indications"],
-            parsed_data["warnings"],
-            parsed_data["adverse_reactions"],
-            parsed_data["source"],
-            datetime.utcnow().isoformat()
-        ))
-        
-        conn.commit()
-        conn.close()
+        with _CONN_LOCK:
+            _CONN.execute("""
+                INSERT OR REPLACE INTO drug_info_cache 
+                (drug_name, indications, warnings, adverse_reactions, source, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (
+                drug_name.upper(),
+                parsed_data["indications"],
+                parsed_data["warnings"],
+                parsed_data["adverse_reactions"],
+                parsed_data["source"],
+                datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+            ))
+            _CONN.commit()
         
         print(f" Cached drug info for: {drug_name}")
     
     except Exception as e:
         print(f"SQLite save error: {e}")
 
+_WS_RE = re.compile(r'\s+')
+_TAG_RE = re.compile(r'<[^>]+>')
+
 #================================================================================================
 # It cleans and normalizes text extracted from FDA labels, removing artifacts and limiting length
 #================================================================================================
@@ -114,10 +133,10 @@ def clean_text(text: str) -> str:
         return "Information not available"
     
     # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = _WS_RE.sub(' ', text)
     
     # Remove common XML/HTML artifacts
-    text = re.sub(r'<[^>]+>', '', text)
+    text = _TAG_RE.sub('', text)
     
     # Limit length for UI display
     if len(text) > 1500:
@@ -130,31 +149,34 @@ def clean_text(text: str) -> str:
 # Indications, Warnings, and Adverse Reactions
 #======================================================================
 
-def parse_spl_sections(spl_xml: str) -> Dict:
+def parse_spl_sections(spl_xml: Union[bytes, str]) -> Dict:
     """Parse SPL XML to extract key sections."""
     try:
-        soup = BeautifulSoup(spl_xml, 'xml')
+        if isinstance(spl_xml, str):
+            spl_xml = spl_xml.encode("utf-8")
+        etree, parser = _spl_parser()
+        root = etree.fromstring(spl_xml, parser=parser)
         
         # Default values
         indications = "Information not available"
         warnings = "Information not available"
         adverse_reactions = "Information not available"
         
-        # Find sections by code
-        sections = soup.find_all('section')
-        
-        for section in sections:
-            code = section.find('code')
-            if not code:
+        # Find sections by code (any namespace; SPL uses urn:hl7-org:v3)
+        for section in root.iter('{*}section'):
+            code = section.find('.//{*}code')
+            if code is None:
                 continue
             
             code_value = code.get('code', '')
-            text_elem = section.find('text')
+            text_elem = section.find('.//{*}text')
             
-            if not text_elem:
+            if text_elem is None:
                 continue
             
-            section_text = text_elem.get_text(separator=' ', strip=True)
+            section_text = ' '.join(
+                chunk.strip() for chunk in text_elem.itertext() if chunk.strip()
+            )
             
             # Map section codes to our fields
             if code_value in ['34067-9', '43678-2']:  # Indications
@@ -196,7 +218,7 @@ def fetch_from_dailymed(drug_name: str) -> Optional[Dict]:
             "drug_name": drug_name
         }
         
-        search_response = requests.get(search_url, params=search_params, timeout=10)
+        search_response = DAILYMED_SESSION.get(search_url, params=search_params, timeout=10)
         
         if search_response.status_code != 200:
             print(f"DailyMed search failed for {drug_name}")
@@ -216,19 +238,27 @@ def fetch_from_dailymed(drug_name: str) -> Optional[Dict]:
         
         # Step 2: Fetch SPL XML using setid
         spl_url = f"https://dailymed.nlm.nih.gov/dailymed/services/v2/spls/{setid}.xml"
-        spl_response = requests.get(spl_url, timeout=10)
+        spl_response = DAILYMED_SESSION.get(spl_url, timeout=10)
         
         if spl_response.status_code != 200:
             return None
         
-        # Step 3: Parse the SPL XML
-        parsed = parse_spl_sections(spl_response.text)
+        # Step 3: Parse the SPL XML (raw bytes: lxml honours the XML encoding declaration)
+        parsed = parse_spl_sections(spl_response.content)
         return parsed
     
     except Exception as e:
         print(f"DailyMed API error for {drug_name}: {e}")
         return None
 
+def _remember_drug_info(normalized_name: str, info: Dict) -> None:
+    with _drug_info_lock:
+        _drug_info_cache[normalized_name] = dict(info)
+        _drug_info_cache.move_to_end(normalized_name)
+        while len(_drug_info_cache) > DRUG_INFO_CACHE_SIZE:
+            _drug_info_cache.popitem(last=False)
+
+
 #======================================================================================
 # Main function: Get FDA drug information (cached or fresh).
 #=======================================================================================
@@ -247,10 +277,18 @@ def get_drug_info(drug_name: str) -> Dict:
     # Normalize drug name
     normalized_name = drug_name.upper().strip()
     
+    # In-process cache: no SQLite round trip for warm drugs
+    with _drug_info_lock:
+        info = _drug_info_cache.get(normalized_name)
+        if info is not None:
+            _drug_info_cache.move_to_end(normalized_name)
+            return dict(info)
+    
     # Check cache first
     cached = fetch_from_sqlite(normalized_name)
     if cached:
         print(f" Using cached drug info for: {drug_name}")
+        _remember_drug_info(normalized_name, cached)
         return cached
     
     # Fetch from DailyMed
@@ -260,6 +298,7 @@ def get_drug_info(drug_name: str) -> Dict:
     if fresh_data:
         # Save to cache
         save_to_sqlite(normalized_name, fresh_data)
+        _remember_drug_info(normalized_name, fresh_data)
         return fresh_data
     
     # Fallback if API fails
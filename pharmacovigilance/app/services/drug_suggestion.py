@@ -2,22 +2,29 @@
 # Drug Suggestion Service: Provides autocomplete suggestions for drug names based on a preprocessed dataset
 #===========================================================================================================
 
-import pandas as pd
+import bisect
+import csv
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 DATA_PATH = PROJECT_ROOT / "data" / "processed" / "faers_q3_ps_drug_adverse_events_serious_labeled_v2.csv"
 
-# Load once when server starts
-_df = pd.read_csv(DATA_PATH, usecols=["drugname"])
+# Placeholder strings pandas.read_csv treats as missing (upper-cased). The csv
+# module returns them verbatim, so they are dropped here like dropna() did.
+_MISSING_NAMES = frozenset({
+    "", "NA", "N/A", "NAN", "-NAN", "NULL", "NONE", "#N/A", "#N/A N/A",
+    "#NA", "<NA>", "-1.#IND", "1.#IND", "-1.#QNAN", "1.#QNAN", "N/A N/A",
+})
 
-DRUG_LIST = (
-    _df["drugname"]
-    .dropna()
-    .str.upper()
-    .unique()
-    .tolist()
-)
+# Load once when server starts; sorted so every prefix maps to one contiguous
+# range (found by bisect). Only the drugname column is needed, so the csv
+# module is enough (no pandas import on worker boot).
+with open(DATA_PATH, newline="", encoding="utf-8") as _f:
+    DRUG_LIST = sorted({
+        name
+        for row in csv.DictReader(_f)
+        if (name := (row.get("drugname") or "").strip().upper()) not in _MISSING_NAMES
+    })
 
 #======================================================================================
 # It returns autocomplete suggestions for drug names based on a typed prefix.
@@ -28,4 +35,6 @@ def get_drug_suggestions(prefix: str, limit: int = 10):
     if len(prefix) < 2:
         return []
 
-    return [d for d in DRUG_LIST if d.startswith(prefix)][:limit]
+    lo = bisect.bisect_left(DRUG_LIST, prefix)
+    hi = bisect.bisect_left(DRUG_LIST, prefix + "\uffff", lo)
+    return DRUG_LIST[lo:min(hi, lo + limit)]
@@ -9,20 +9,28 @@ LLM-based Entity Extractor
 Uses Ollama with Qwen 2.5 to extract drug names and symptoms from text.
 Falls back to regex extraction if LLM is unavailable.
 """
-import re       # used to extract JSON from messy LLM output
 import json     # for JSON parsing
 from typing import Dict, List, Optional #
 import httpx    # for HTTP requests to Ollama
 
+from app.services.keyword_scanner import build_keyword_finder, build_keyword_screen
+
 
 #====================================
 # Ollama configuration
 #=====================================
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
+OLLAMA_BASE_URL = "http://localhost:11434"
+OLLAMA_URL = f"{OLLAMA_BASE_URL}/api/generate"
 MODEL_NAME = "qwen2.5:latest"
 TIMEOUT = 30  
 
+# Shared keep-alive client for all Ollama calls (thread-safe)
+_OLLAMA = httpx.Client(base_url=OLLAMA_BASE_URL, timeout=TIMEOUT)
+
+# Incremental decoder for the first JSON object in the LLM output
+_JSON_DECODER = json.JSONDecoder()
+
 # Common drug name patterns for fallback
 DRUG_PATTERNS = [
     r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:mg|ml|mcg|tablet|capsule|injection)',
@@ -38,6 +46,11 @@ SYMPTOM_KEYWORDS = [
     'edema', 'infection', 'sepsis', 'stroke', 'infarction', 'thrombosis'
 ]
 
+# One case-insensitive screen + one-pass finder instead of a substring
+# scan per keyword (same substring semantics as before)
+_symptom_screen = build_keyword_screen(SYMPTOM_KEYWORDS)
+_find_symptoms = build_keyword_finder(SYMPTOM_KEYWORDS)
+
 
 def extract_with_llm(text: str) -> Optional[Dict]:
     """
@@ -55,8 +68,8 @@ Medical Report:
 JSON:"""
 
     try:
-        response = httpx.post(
-            OLLAMA_URL,
+        response = _OLLAMA.post(
+            "/api/generate",
             json={
                 "model": MODEL_NAME,
                 "prompt": prompt,
@@ -65,8 +78,7 @@ JSON:"""
                     "temperature": 0.1,
                     "num_predict": 200
                 }
-            },
-            timeout=TIMEOUT
+            }
         )
         
         if response.status_code == 200:
@@ -75,10 +87,11 @@ JSON:"""
             
             # Parse JSON from response
             try:
-                # Find JSON in response
-                json_match = re.search(r'\{[^}]+\}', generated_text)
-                if json_match:
-                    return json.loads(json_match.group())
+                # Find JSON in response (nested braces and newlines allowed)
+                start = generated_text.find('{')
+                if start != -1:
+                    parsed, _ = _JSON_DECODER.raw_decode(generated_text, start)
+                    return parsed
             except json.JSONDecodeError:
                 pass
                 
@@ -97,11 +110,10 @@ def extract_with_regex(drugname: str, adverse_event: str) -> Dict:
     
     # For symptoms, match known keywords
     symptoms = []
-    if adverse_event:
-        text_lower = adverse_event.lower()
-        for keyword in SYMPTOM_KEYWORDS:
-            if keyword in text_lower:
-                symptoms.append(keyword.title())
+    if adverse_event and _symptom_screen.search(adverse_event):
+        found = _find_symptoms(adverse_event.lower())
+        # Keep the keyword-list order
+        symptoms = [keyword.title() for keyword in SYMPTOM_KEYWORDS if keyword in found]
     
     # If no matches, use the adverse event as is
     if not symptoms and adverse_event:
@@ -145,7 +157,7 @@ def extract_entities(drugname: str, adverse_event: str) -> Dict:
 def check_llm_availability() -> bool:
     """Check if Ollama is running and model is available."""
     try:
-        response = httpx.get("http://localhost:11434/api/tags", timeout=5)
+        response = _OLLAMA.get("/api/tags", timeout=5)
         if response.status_code == 200:
             models = response.json().get("models", [])
             model_names = [m.get("name", "") for m in models]
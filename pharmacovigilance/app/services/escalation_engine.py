@@ -5,7 +5,7 @@
 
 from typing import Dict, List, Optional
 from dataclasses import dataclass
-from app.services.classifier import is_negated
+from app.services.keyword_scanner import KEYWORD_SCORES, scan
 import time
 
 from langfuse import Langfuse
@@ -25,49 +25,8 @@ except Exception as e:
     print(f"  Langfuse initialization failed: {e}")
 
 
-# Regulatory seriousness keywords 
-SERIOUS_KEYWORDS = {
-    "death": 10,
-    "died": 10,
-    "fatal": 10,
-    "life-threatening": 9,
-    "life threatening": 9,
-    "hospitalization": 8,
-    "hospitalisation": 8,
-    "hospitalized": 8,
-    "hospitalised": 8,
-    "inpatient": 7,
-    "disability": 8,
-    "incapacity": 8,
-    "congenital anomaly": 8,
-    "birth defect": 8,
-    "cancer": 7,
-    "overdose": 7,
-    "suicide": 9,
-    "suicidal": 8,
-    "cardiac arrest": 9,
-    "respiratory failure": 9,
-    "coma": 9,
-    "seizure": 7,
-    "anaphylaxis": 8,
-    "anaphylactic": 8,
-    "stroke": 8,
-    "myocardial infarction": 8,
-    "heart attack": 8,
-    "renal failure": 8,
-    "liver failure": 8,
-    "hepatic failure": 8,
-    "sepsis": 8,
-    "shock": 7,
-    "transplant": 7,
-    "surgery required": 7,
-    "surgical intervention": 7,
-    "icu": 8,
-    "intensive care": 8,
-    "ventilator": 8,
-    "intubation": 8,
-    "resuscitation": 9,
-}
+# Regulatory seriousness keywords (scored table lives in keyword_scanner)
+SERIOUS_KEYWORDS = KEYWORD_SCORES
 
 # Threshold for escalation
 ESCALATION_THRESHOLD = 0.6  # ML probability threshold
@@ -97,24 +56,13 @@ def calculate_keyword_score(text: str) -> tuple:
     
     Returns (score, triggered_keywords)
     """
-    text_lower = text.lower()
-    triggered = []
-    max_score = 0
-    
-    for keyword, score in SERIOUS_KEYWORDS.items():
-        if keyword in text_lower:
-          
-            if is_negated(text_lower, keyword):
-                continue  # ignore negated keyword
-            
-            triggered.append(keyword)
-            max_score = max(max_score, score)
-    
+    result = scan(text)
+    max_score = result["max_score"]
+
     # Normalize to 0–1 range
     normalized_score = max_score / 10.0 if max_score > 0 else 0
-    
-    return normalized_score, triggered
 
+    return normalized_score, result["triggered"]
 
 #======================================================================
 # It maps a numeric seriousness score to a categorical risk level
@@ -4,11 +4,42 @@
 #=========================================================================================
 
 import os
-import requests
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from app.services._http import GROQ_SESSION
 
 GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
 MODEL_NAME = "llama-3.1-8b-instant"
 
+# Upper bound on Groq requests in flight for one batch
+GROQ_MAX_CONCURRENCY = 8
+
+# Explanations keyed by the exact prompt: repeated (drug, event, classification,
+# keywords, risk, probability) tuples skip the Groq round-trip. Only successful
+# completions are kept, so failures are retried next time.
+EXPLANATION_CACHE_SIZE = 4096
+_explanation_cache: "OrderedDict[str, str]" = OrderedDict()
+_explanation_lock = threading.Lock()
+
+# Explanation prompt, filled per call with format_map
+_GROQ_PROMPT_TMPL = """
+You are a pharmacovigilance safety assistant.
+
+Explain why this adverse event was classified as {classification}.
+Do NOT change the classification. Only explain.
+
+Drug: {drug}
+Adverse Event: {adverse_event}
+Triggered Keywords: {keywords}
+Risk Level: {risk_level}
+ML Serious Probability: {serious_prob:.2f}
+
+Provide a short, clinical explanation (2-3 sentences).
+"""
+
 
 #========================================================================================
 # calls a Groq LLM to generate a short, human-readable explanation for an adverse-event
@@ -30,20 +61,20 @@ def generate_api_explanation(
         print("GROQ_API_KEY not set")
         return "LLM explanation not available (API key not set)."
 
-    prompt = f"""
-You are a pharmacovigilance safety assistant.
-
-Explain why this adverse event was classified as {classification}.
-Do NOT change the classification. Only explain.
-
-Drug: {drug}
-Adverse Event: {adverse_event}
-Triggered Keywords: {', '.join(triggered_keywords) if triggered_keywords else 'None'}
-Risk Level: {risk_level}
-ML Serious Probability: {serious_prob:.2f}
-
-Provide a short, clinical explanation (2-3 sentences).
-"""
+    prompt = _GROQ_PROMPT_TMPL.format_map({
+        "classification": classification,
+        "drug": drug,
+        "adverse_event": adverse_event,
+        "keywords": ', '.join(triggered_keywords) if triggered_keywords else 'None',
+        "risk_level": risk_level,
+        "serious_prob": serious_prob
+    })
+
+    with _explanation_lock:
+        cached = _explanation_cache.get(prompt)
+        if cached is not None:
+            _explanation_cache.move_to_end(prompt)
+            return cached
 
     payload = {
         "model": MODEL_NAME,
@@ -61,10 +92,27 @@ Provide a short, clinical explanation (2-3 sentences).
     }
 
     try:
-        resp = requests.post(GROQ_URL, json=payload, headers=headers, timeout=10)
+        # Streamed (SSE): text is collected as it is generated and the read
+        # stops at the first finish_reason instead of buffering the body
+        resp = GROQ_SESSION.post(
+            GROQ_URL,
+            json={**payload, "stream": True},
+            headers=headers,
+            timeout=10,
+            stream=True
+        )
         resp.raise_for_status()
-        data = resp.json()
-        return data["choices"][0]["message"]["content"].strip()
+        explanation = _read_streamed_completion(resp).strip()
+
+        # An empty stream (dropped connection, content filter) is not cached
+        # so the next identical request asks Groq again
+        if explanation:
+            with _explanation_lock:
+                _explanation_cache[prompt] = explanation
+                _explanation_cache.move_to_end(prompt)
+                while len(_explanation_cache) > EXPLANATION_CACHE_SIZE:
+                    _explanation_cache.popitem(last=False)
+        return explanation
 
     except Exception as e:
         print("===== GROQ BAD REQUEST DEBUG =====")
@@ -78,6 +126,44 @@ Provide a short, clinical explanation (2-3 sentences).
         return "LLM explanation not available due to an internal error."
 
 
+#===========================================================================================
+# Collects the content deltas of a streamed chat completion (server-sent events) and stops
+# once the first choice reports a finish_reason
+#===========================================================================================
+
+def _read_streamed_completion(resp) -> str:
+    parts = []
+    with resp:
+        for line in resp.iter_lines():
+            if not line.startswith(b"data: "):
+                continue
+            data = line[6:]
+            if data == b"[DONE]":
+                break
+
+            choice = json.loads(data)["choices"][0]
+            parts.append(choice.get("delta", {}).get("content") or "")
+            if choice.get("finish_reason"):
+                break
+    return "".join(parts)
+
+
+#===========================================================================================
+# Generates explanations for several events at once. The Groq calls are network-bound,
+# so they run concurrently and the batch costs about one round-trip instead of N.
+# Each item holds generate_api_explanation's keyword arguments; results keep item order.
+#===========================================================================================
+
+def generate_api_explanations_batch(items: List[Dict]) -> List[str]:
+    if not items:
+        return []
+    if len(items) == 1:
+        return [generate_api_explanation(**items[0])]
+
+    with ThreadPoolExecutor(max_workers=min(GROQ_MAX_CONCURRENCY, len(items))) as pool:
+        return list(pool.map(lambda item: generate_api_explanation(**item), items))
+
+
 #===========================================================================================
 # internal ML and escalation outputs into the format required to generate an LLM explanation
 #===========================================================================================
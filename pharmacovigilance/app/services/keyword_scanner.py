@@ -0,0 +1,199 @@
+# =================================================================================================
+# DESCRIPTION : One keyword scan shared by the classifier's rule-based override and the escalation
+#               engine's keyword score: both keyword tables go into a single automaton/screen.
+# =================================================================================================
+import re
+from typing import Callable, Dict, Iterable, Set
+
+# Aho-Corasick keyword matching (conditional import)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+# Rule-based Serious override keywords (classifier)
+# All keyword tables are lowercase: matched case-insensitively by the screen
+OVERRIDE_KEYWORDS = [
+    # Regulatory criteria
+    "hospital", "hospitalized", "hospitalised", "admitted", "admission",
+    "icu", "intensive care", "critical care", "ccu",
+    "death", "died", "fatal", "expired", "mortality",
+
+    # Life-threatening / emergency
+    "life threatening", "life-threatening",
+    "cardiac arrest", "respiratory arrest",
+    "shock", "septic shock", "anaphylaxis",
+
+    # Major bleeding
+    "gastrointestinal bleeding", "gi bleeding", "gi bleed",
+    "melena", "black tarry stools",
+    "hematemesis", "vomiting blood",
+    "hemorrhage", "haemorrhage", "bleeding requiring transfusion",
+    "blood transfusion", "transfusion",
+    "hematuria", "blood in urine",
+    "hemoptysis", "coughing up blood",
+    "rectal bleeding",
+
+    # Neurologic / brain
+    "intracranial hemorrhage", "intracranial haemorrhage",
+    "brain bleed", "cerebral hemorrhage",
+    "stroke", "cva", "subarachnoid hemorrhage",
+
+    # Cardiac
+    "myocardial infarction", "heart attack",
+    "ventricular fibrillation", "ventricular tachycardia",
+    "cardiac arrhythmia", "asystole",
+
+    # Organ failure
+    "acute renal failure", "kidney failure",
+    "acute liver failure", "hepatic failure",
+    "respiratory failure", "ventilator", "intubated",
+
+    # Severe allergic / dermatologic
+    "anaphylactic shock", "stevens-johnson syndrome", "sjs",
+    "toxic epidermal necrolysis", "ten",
+
+    # Pregnancy / congenital
+    "congenital anomaly", "birth defect", "teratogenic",
+
+    # Disability / permanent damage
+    "permanent disability", "paralysis", "blindness", "coma",
+
+    # Surgical / emergency intervention
+    "emergency surgery", "urgent surgery",
+    "intubation", "mechanical ventilation",
+
+    # High-risk labs / conditions
+    "severe anemia", "hemoglobin drop",
+    "coagulopathy", "overdose", "toxicity"
+]
+
+# Regulatory seriousness keywords and their severity scores (escalation)
+KEYWORD_SCORES = {
+    "death": 10,
+    "died": 10,
+    "fatal": 10,
+    "life-threatening": 9,
+    "life threatening": 9,
+    "hospitalization": 8,
+    "hospitalisation": 8,
+    "hospitalized": 8,
+    "hospitalised": 8,
+    "inpatient": 7,
+    "disability": 8,
+    "incapacity": 8,
+    "congenital anomaly": 8,
+    "birth defect": 8,
+    "cancer": 7,
+    "overdose": 7,
+    "suicide": 9,
+    "suicidal": 8,
+    "cardiac arrest": 9,
+    "respiratory failure": 9,
+    "coma": 9,
+    "seizure": 7,
+    "anaphylaxis": 8,
+    "anaphylactic": 8,
+    "stroke": 8,
+    "myocardial infarction": 8,
+    "heart attack": 8,
+    "renal failure": 8,
+    "liver failure": 8,
+    "hepatic failure": 8,
+    "sepsis": 8,
+    "shock": 7,
+    "transplant": 7,
+    "surgery required": 7,
+    "surgical intervention": 7,
+    "icu": 8,
+    "intensive care": 8,
+    "ventilator": 8,
+    "intubation": 8,
+    "resuscitation": 9,
+}
+
+NEGATION_TRIGGERS = [
+    "no", "not", "denies", "denied", "without",
+    "never", "absence of", "free of", "ruled out"
+]
+
+def is_negated(text: str, keyword: str, window: int = 5) -> bool:
+    text = text.lower()
+    words = text.split()
+    keyword_tokens = keyword.split()
+
+    for i in range(len(words)):
+        if words[i:i+len(keyword_tokens)] == keyword_tokens:
+            start = max(0, i - window)
+            context = " ".join(words[start:i])
+            if any(neg in context for neg in NEGATION_TRIGGERS):
+                return True
+    return False
+
+
+#=================================================================================
+# Builds a function returning every keyword that occurs (as a substring) in an
+# already-lowercased text. With pyahocorasick this is one pass over the text
+# instead of one substring scan per keyword.
+#=================================================================================
+
+def build_keyword_finder(keywords: Iterable[str]) -> Callable[[str], Set[str]]:
+    keywords = tuple(keywords)
+
+    if AHOCORASICK_AVAILABLE:
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return lambda text: {keyword for _, keyword in automaton.iter(text)}
+
+    return lambda text: {keyword for keyword in keywords if keyword in text}
+
+
+#=================================================================================
+# Compiles the (lowercase) keywords into one case-insensitive alternation regex.
+# Used as a screen on the raw text: when nothing matches, callers skip the
+# text.lower() copy and the keyword finder entirely. The regex alone cannot
+# report keywords that overlap or prefix each other ("hospital" /
+# "hospitalized"), so matching texts still go through the finder.
+#=================================================================================
+
+def build_keyword_screen(keywords: Iterable[str]) -> "re.Pattern[str]":
+    return re.compile(
+        "|".join(sorted(map(re.escape, keywords), key=len, reverse=True)),
+        re.IGNORECASE
+    )
+
+
+_ALL_KEYWORDS = tuple(dict.fromkeys([*OVERRIDE_KEYWORDS, *KEYWORD_SCORES]))
+_OVERRIDE_SET = frozenset(OVERRIDE_KEYWORDS)
+# Dict position of each scored keyword, to report hits in a stable order
+_KEYWORD_ORDER = {keyword: i for i, keyword in enumerate(KEYWORD_SCORES)}
+
+_screen = build_keyword_screen(_ALL_KEYWORDS)
+_find_keywords = build_keyword_finder(_ALL_KEYWORDS)
+
+#=================================================================================
+# Scans the text once for both keyword tables. Each hit is negation-checked
+# once, even when it is in both tables.
+#   override  : a non-negated OVERRIDE_KEYWORDS term is present
+#   triggered : non-negated KEYWORD_SCORES terms, in table order
+#   max_score : highest KEYWORD_SCORES score among them (0 if none)
+#=================================================================================
+
+def scan(text: str) -> Dict:
+    # No keyword anywhere: skip the lowercase copy and the scan
+    if _screen.search(text) is None:
+        return {"override": False, "triggered": [], "max_score": 0}
+
+    text_lower = text.lower()
+    live = {keyword for keyword in _find_keywords(text_lower) if not is_negated(text_lower, keyword)}
+
+    triggered = sorted(live.intersection(KEYWORD_SCORES), key=_KEYWORD_ORDER.__getitem__)
+    return {
+        "override": not _OVERRIDE_SET.isdisjoint(live),
+        "triggered": triggered,
+        "max_score": max((KEYWORD_SCORES[keyword] for keyword in triggered), default=0)
+    }
@@ -3,13 +3,17 @@
 #               (Gemma 2:2B via Ollama) to explain ML classifier decisions in pharmacovigilance
 #==============================================================================================
 
-import requests
 import json
-from typing import Dict, Optional
+import re
+import threading
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, Optional, Tuple
 from langfuse import Langfuse
 
 from dotenv import load_dotenv
-from app.services.classifier import is_negated
+from app.services.keyword_scanner import is_negated
+from app.services._http import OLLAMA_SESSION
 
 import os
 
@@ -24,6 +28,57 @@ assert os.getenv("LANGFUSE_SECRET_KEY"), "LANGFUSE_SECRET_KEY missing"
 # ============================================================================
 langfuse = Langfuse()
 
+# Response fields, compiled once. Each mirrors "text after the first
+# FIELD: marker" (up to end of line or the next section marker).
+_ALIGNMENT_RE = re.compile(r"REASONING_ALIGNMENT:([^\n]*)")
+_REASONING_RE = re.compile(r"REASONING:(.*?)(?=KEY_FACTORS:|\Z)", re.DOTALL)
+_KEY_FACTORS_RE = re.compile(r"KEY_FACTORS:(.*?)(?=REASONING_CERTAINTY:|\Z)", re.DOTALL)
+_CERTAINTY_RE = re.compile(r"REASONING_CERTAINTY:([^\n]*)")
+_BULLET_RE = re.compile(r"^[^\S\n]*[-•*][-•* ]*([^\n]*)", re.MULTILINE)
+
+# Keep the model resident between requests instead of reloading the weights
+OLLAMA_KEEP_ALIVE = "1h"
+
+# Raw LLM responses keyed by (model, streaming mode, prompt): a repeated event
+# skips generation entirely. Empty/failed responses are never cached.
+LLM_RESPONSE_CACHE_SIZE = 4096
+_response_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_response_lock = threading.Lock()
+
+# Fixed instructions, sent as the system prompt so they render first and are
+# byte-identical on every call: Ollama reuses the KV cache for that shared
+# prefix and only prefills the per-event part
+_REASONING_PREAMBLE = """You are assisting with pharmacovigilance interpretability.
+
+Task:
+Explain WHY the adverse event below is considered SERIOUS or NON-SERIOUS based on standard clinical and regulatory reasoning (hospitalization, life-threatening risk, disability, congenital anomaly, or medical intervention required).
+
+Do NOT change the ML decision. Only explain the medical justification.
+
+Output ONLY in this format:
+
+REASONING_ALIGNMENT: SUPPORTS or CHALLENGES
+
+REASONING:
+Explain the medical or clinical justification in 2-3 clear sentences.
+
+KEY_FACTORS:
+- Factor 1
+- Factor 2
+
+REASONING_CERTAINTY: HIGH or MEDIUM or LOW"""
+
+# Per-event part of the prompt, filled with format_map
+_REASONING_TMPL = """Drug: {drugname}
+Adverse Event: {adverse_event}
+
+ML Classification: {ml_prediction}
+ML Confidence: {ml_confidence:.0%}
+ML Rationale: {ml_reason}
+Serious Probability Score: {serious_probability:.2f}
+
+Response:"""
+
 
 class llmReasoningAnalyzer:
     """
@@ -172,7 +227,7 @@ class llmReasoningAnalyzer:
             # ================================================================
             # CALL LLM (EXISTING CODE - UNCHANGED)
             # ================================================================
-            response = self._call_llm(prompt)
+            response, cache_hit = self._call_llm(prompt)
             
             # Parse response
             parsed_result = self._parse_llm_response(response)
@@ -193,7 +248,9 @@ class llmReasoningAnalyzer:
                             "model": self.model_name,
                             "role": "explanation_only",
                             "llm_changed_decision": False,  # CRITICAL: Always False
-                            "raw_response_length": len(response)
+                            "raw_response_length": len(response),
+                            # True when served from _response_cache (no Ollama generation)
+                            "cache_hit": cache_hit
                         }
                     )
                 except Exception as e:
@@ -282,38 +339,20 @@ class llmReasoningAnalyzer:
         - Includes regulatory context (ICH E2A)
         - Uses ML rationale to guide reasoning
         - Allows 2-3 sentences instead of restricting to 1-2
-        """
-        return f"""You are assisting with pharmacovigilance interpretability.
-
-Drug: {drugname}
-Adverse Event: {adverse_event}
-
-ML Classification: {ml_prediction}
-ML Confidence: {ml_confidence:.0%}
-ML Rationale: {ml_reason}
-Serious Probability Score: {serious_probability:.2f}
-
-Task:
-Explain WHY this adverse event is considered SERIOUS or NON-SERIOUS based on standard clinical and regulatory reasoning (hospitalization, life-threatening risk, disability, congenital anomaly, or medical intervention required).
-
-Do NOT change the ML decision. Only explain the medical justification.
-
-Output ONLY in this format:
 
-REASONING_ALIGNMENT: SUPPORTS or CHALLENGES
-
-REASONING:
-Explain the medical or clinical justification in 2-3 clear sentences.
-
-KEY_FACTORS:
-- Factor 1
-- Factor 2
-
-REASONING_CERTAINTY: HIGH or MEDIUM or LOW
-
-Response:""".strip()
-
-    def _call_llm(self, prompt: str) -> str:
+        Returns only the per-event part: the fixed instructions are
+        _REASONING_PREAMBLE, sent as the system prompt by _call_llm.
+        """
+        return _REASONING_TMPL.format_map({
+            "drugname": drugname,
+            "adverse_event": adverse_event,
+            "ml_prediction": ml_prediction,
+            "ml_confidence": ml_confidence,
+            "ml_reason": ml_reason,
+            "serious_probability": serious_probability
+        }).strip()
+
+    def _call_llm(self, prompt: str) -> Tuple[str, bool]:
         """
         Call Ollama LLM with optimized settings for Gemma2:2b speed.
         
@@ -323,11 +362,23 @@ Response:""".strip()
         - Only keeps "---" as stop token
         
         NOTE: NO Langfuse tracking here - that happens in analyze_prediction()
+
+        Returns (response, cache_hit) so the caller can tell a cached
+        response apart from an actual generation in its span.
         """
+        cache_key = (self.model_name, self.use_streaming, prompt)
+        with _response_lock:
+            cached = _response_cache.get(cache_key)
+            if cached is not None:
+                _response_cache.move_to_end(cache_key)
+                return cached, True
+
         payload = {
             "model": self.model_name,
+            "system": _REASONING_PREAMBLE,
             "prompt": prompt,
             "stream": self.use_streaming,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
             "options": {
                 "temperature": 0.1,
                 "top_p": 0.8,
@@ -339,8 +390,17 @@ Response:""".strip()
         }
 
         if self.use_streaming:
-            return self._call_llm_streaming(payload)
-        return self._call_llm_non_streaming(payload)
+            response = self._call_llm_streaming(payload)
+        else:
+            response = self._call_llm_non_streaming(payload)
+
+        if response:
+            with _response_lock:
+                _response_cache[cache_key] = response
+                _response_cache.move_to_end(cache_key)
+                while len(_response_cache) > LLM_RESPONSE_CACHE_SIZE:
+                    _response_cache.popitem(last=False)
+        return response, False
 
     def _call_llm_streaming(self, payload: dict) -> str:
         """
@@ -348,7 +408,7 @@ Response:""".strip()
         """
         response_text = ""
         max_length = 700  
-        with requests.post(
+        with OLLAMA_SESSION.post(
             self.model_url,
             json=payload,
             timeout=self.timeout,
@@ -392,7 +452,7 @@ Response:""".strip()
         """
         Non-streaming fallback.
         """
-        response = requests.post(
+        response = OLLAMA_SESSION.post(
             self.model_url,
             json=payload,
             timeout=self.timeout
@@ -420,36 +480,31 @@ Response:""".strip()
 
         try:
             # Parse REASONING_ALIGNMENT
-            if "REASONING_ALIGNMENT:" in response:
-                line = response.split("REASONING_ALIGNMENT:")[1].split("\n")[0].strip().upper()
+            match = _ALIGNMENT_RE.search(response)
+            if match:
+                line = match.group(1).upper()
                 if "SUPPORTS" in line:
                     result["reasoning_alignment"] = "SUPPORTS"
                 elif "CHALLENGES" in line:
                     result["reasoning_alignment"] = "CHALLENGES"
 
             # Parse REASONING
-            if "REASONING:" in response:
-                section = response.split("REASONING:")[1]
-                if "KEY_FACTORS:" in section:
-                    result["reasoning"] = section.split("KEY_FACTORS:")[0].strip()
-                else:
-                    result["reasoning"] = section.strip()
-
-            # Parse KEY_FACTORS
-            if "KEY_FACTORS:" in response:
-                block = response.split("KEY_FACTORS:")[1]
-                if "REASONING_CERTAINTY:" in block:
-                    block = block.split("REASONING_CERTAINTY:")[0]
+            match = _REASONING_RE.search(response)
+            if match:
+                result["reasoning"] = match.group(1).strip()
 
+            # Parse KEY_FACTORS (first 4 bullets)
+            match = _KEY_FACTORS_RE.search(response)
+            if match:
                 result["key_factors"] = [
-                    line.lstrip("-•* ").strip()
-                    for line in block.splitlines()
-                    if line.strip().startswith(("-", "•", "*"))
-                ][:4]
+                    bullet.group(1).strip()
+                    for bullet in islice(_BULLET_RE.finditer(match.group(1)), 4)
+                ]
 
             # Parse REASONING_CERTAINTY
-            if "REASONING_CERTAINTY:" in response:
-                cert = response.split("REASONING_CERTAINTY:")[1].split("\n")[0].upper()
+            match = _CERTAINTY_RE.search(response)
+            if match:
+                cert = match.group(1).upper()
                 if "HIGH" in cert:
                     result["reasoning_certainty"] = "HIGH"
                 elif "MEDIUM" in cert:
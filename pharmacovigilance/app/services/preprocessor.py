@@ -2,14 +2,41 @@
 # DESCRIPTION : cleans and normalizes adverse event text, removes noise, optionally lemmatizes words, 
 #             and combines drug and event details into a single ML-ready text feature
 #=======================================================================================================
+import math
 import re
 import string
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Lazy NLTK imports to avoid startup overhead
 _stopwords = None
 _lemmatizer = None
 
+# clean_text patterns (compiled once)
+_DIGITS_RE = re.compile(r'\d+')
+_SYMBOLS_RE = re.compile(r'[^\w\s-]')
+_HYPHEN_RUN_RE = re.compile(r'-+')
+_STANDALONE_HYPHEN_RE = re.compile(r'\s-\s')
+
+# Drug-name tokens are marked with a prefix instead of being repeated; the
+# training pipeline scales the TF-IDF weight of marked terms by
+# DRUG_FEATURE_WEIGHT (the boost a duplicated token got under sublinear_tf).
+# _VECTORIZER_TOKEN_RE mirrors TfidfVectorizer's default token_pattern.
+DRUG_TOKEN_PREFIX = "drug_"
+DRUG_FEATURE_WEIGHT = 1.0 + math.log(2)
+_VECTORIZER_TOKEN_RE = re.compile(r'(?u)\b\w\w+\b')
+
+# ASCII fast path for the digit + symbol steps in one C-level pass:
+# digits are deleted, every other character _SYMBOLS_RE matches becomes a space
+_ASCII_CLEAN_TABLE = str.maketrans({
+    ch: (None if ch.isdigit() else ' ')
+    for ch in map(chr, range(128))
+    if ch.isdigit() or _SYMBOLS_RE.match(ch)
+})
+
 #=================================================================================
 # It loads English stopwords using NLTK and falls back to a predefined stopword 
 # list if NLTK is unavailable
@@ -21,10 +48,10 @@ def _get_stopwords():
     if _stopwords is None:
         try:
             from nltk.corpus import stopwords
-            _stopwords = set(stopwords.words('english'))
+            _stopwords = frozenset(stopwords.words('english'))
         except Exception:
             # Fallback to basic stopwords if NLTK not available
-            _stopwords = {'a', 'an', 'the', 'is', 'are', 'was', 'were', 'be', 'been',
+            _stopwords = frozenset({'a', 'an', 'the', 'is', 'are', 'was', 'were', 'be', 'been',
                          'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
                          'would', 'could', 'should', 'may', 'might', 'must', 'shall',
                          'can', 'need', 'dare', 'ought', 'used', 'to', 'of', 'in',
@@ -41,7 +68,7 @@ def _get_stopwords():
                          'himself', 'she', 'her', 'hers', 'herself', 'it', 'its',
                          'itself', 'they', 'them', 'their', 'theirs', 'themselves',
                          'what', 'which', 'who', 'whom', 'this', 'that', 'these',
-                         'those', 'am'}
+                         'those', 'am'})
     return _stopwords
 
 #==========================================================================================
@@ -59,6 +86,12 @@ def _get_lemmatizer():
             _lemmatizer = None
     return _lemmatizer
 
+
+# AE narratives reuse a small vocabulary: memoize word -> lemma
+@lru_cache(maxsize=65536)
+def _lemma(word: str) -> str:
+    return _lemmatizer.lemmatize(word)
+
 #==============================================================================================
 # cleans the input text by converting it to lowercase, removing numbers and unnecessary symbols
 # while keeping medical hyphens, and fixing extra spaces
@@ -85,17 +118,22 @@ def clean_text(text: str) -> str:
     # Lowercase
     text = text.lower()
     
-    # Remove digits
-    text = re.sub(r'\d+', '', text)
-    
-    # Remove punctuation except hyphens in medical terms
-    text = re.sub(r'[^\w\s-]', ' ', text)
-    
-    # Replace multiple hyphens with single
-    text = re.sub(r'-+', '-', text)
+    if text.isascii():
+        # Remove digits and punctuation (except hyphens) in one translate
+        text = text.translate(_ASCII_CLEAN_TABLE)
+    else:
+        # Remove digits
+        text = _DIGITS_RE.sub('', text)
+        
+        # Remove punctuation except hyphens in medical terms
+        text = _SYMBOLS_RE.sub(' ', text)
     
-    # Remove standalone hyphens
-    text = re.sub(r'\s-\s', ' ', text)
+    if '-' in text:
+        # Replace multiple hyphens with single
+        text = _HYPHEN_RUN_RE.sub('-', text)
+        
+        # Remove standalone hyphens
+        text = _STANDALONE_HYPHEN_RE.sub(' ', text)
     
     # Normalize whitespace
     text = ' '.join(text.split())
@@ -120,11 +158,9 @@ def remove_stopwords(text: str) -> str:
     if not text:
         return ""
     
-    stopwords = _get_stopwords()
-    words = text.split()
-    filtered_words = [w for w in words if w not in stopwords and len(w) > 1]
-    
-    return ' '.join(filtered_words)
+    # Loaded set read straight from the global; the loader runs only once
+    stopwords = _stopwords or _get_stopwords()
+    return ' '.join([w for w in text.split() if w not in stopwords and len(w) > 1])
 
 #===========================================================================================
 # converts words to their base form (for example, “swelling” to “swell”) and leaves the text
@@ -148,10 +184,7 @@ def lemmatize_text(text: str) -> str:
     if lemmatizer is None:
         return text  # Return unchanged if lemmatizer not available
     
-    words = text.split()
-    lemmatized_words = [lemmatizer.lemmatize(w) for w in words]
-    
-    return ' '.join(lemmatized_words)
+    return ' '.join(map(_lemma, text.split()))
 
 #==================================================================================================
 # runs the complete text preprocessing pipeline by cleaning the text, removing stopwords if enabled,
@@ -187,16 +220,19 @@ def preprocess_text(text: str,
 
 #==========================================================================================
 # cleans the drug name and adverse event text, then combines them into one text string
-# while repeating the drug name
+# with the drug name tokens marked for weighting
 #==========================================================================================
 
-def combine_features(drugname: str, adverse_event: str) -> str:
+def combine_features(drugname: str, adverse_event: str, mark_drug: bool = True) -> str:
     """
     Combine drug name and adverse event into a single text feature.
     
     Args:
         drugname: Name of the drug
         adverse_event: Description of the adverse event
+        mark_drug: Emit DRUG_TOKEN_PREFIX-marked drug tokens (current
+            artifacts); False gives the legacy layout with the drug name
+            repeated, for vectorizers trained before the marking
         
     Returns:
         Combined preprocessed text
@@ -204,7 +240,72 @@ def combine_features(drugname: str, adverse_event: str) -> str:
     drug_clean = clean_text(drugname) if drugname else ""
     event_clean = preprocess_text(adverse_event) if adverse_event else ""
     
-    # Combine with drug name given slight emphasis
-    combined = f"{drug_clean} {drug_clean} {event_clean}"
+    if not mark_drug:
+        # Legacy layout: drug name given slight emphasis by repetition
+        return f"{drug_clean} {drug_clean} {event_clean}".strip()
+    
+    # Drug name emphasis comes from the weight on the marked tokens
+    combined = f"{mark_drug_tokens(drug_clean)} {event_clean}"
     
     return combined.strip()
+
+
+def mark_drug_tokens(drug_clean: str) -> str:
+    """Prefix each vectorizer token of a cleaned drug name with DRUG_TOKEN_PREFIX."""
+    return " ".join(DRUG_TOKEN_PREFIX + token for token in _VECTORIZER_TOKEN_RE.findall(drug_clean))
+
+
+def vectorizer_tokens(doc) -> list:
+    """
+    Tokenizer for the TF-IDF vectorizer: the same tokens as its default
+    lowercase + token_pattern path. Lists of tokens (pre-tokenized training
+    text) pass through unchanged; n-grams are still built by the vectorizer.
+    
+    Trained vectorizers pickle a reference to this function
+    (app.services.preprocessor.vectorizer_tokens): keep its name and module
+    path stable, or retrain the artifacts when moving it.
+    """
+    if isinstance(doc, list):
+        return doc
+    return _VECTORIZER_TOKEN_RE.findall(doc.lower())
+
+
+#==========================================================================================
+# Column-wise versions of the functions above for bulk ingestion (CSV / DataFrame).
+# Each runs the scalar function once per DISTINCT value and maps the results back onto
+# the column (drug names and short event texts repeat heavily in FAERS extracts), so
+# results are identical to the per-row path at a fraction of the Python calls.
+#==========================================================================================
+
+def _map_unique(texts: "pd.Series", func) -> "pd.Series":
+    uniques = texts.unique()
+    return texts.map(dict(zip(uniques, map(func, uniques))))
+
+
+def clean_series(texts: "pd.Series") -> "pd.Series":
+    """clean_text over a column."""
+    return _map_unique(texts, clean_text)
+
+
+def remove_stopwords_series(texts: "pd.Series") -> "pd.Series":
+    """remove_stopwords over a column of cleaned text."""
+    return _map_unique(texts, remove_stopwords)
+
+
+def preprocess_series(texts: "pd.Series",
+                      remove_stops: bool = True,
+                      apply_lemmatization: bool = False) -> "pd.Series":
+    """preprocess_text over a column."""
+    return _map_unique(
+        texts,
+        lambda text: preprocess_text(text, remove_stops, apply_lemmatization)
+    )
+
+
+def combine_features_series(drugnames: "pd.Series", adverse_events: "pd.Series") -> "pd.Series":
+    """combine_features over two aligned columns."""
+    drug_clean = _map_unique(drugnames, lambda name: mark_drug_tokens(clean_text(name)))
+    event_clean = preprocess_series(adverse_events)
+    
+    # Drug name emphasis comes from the weight on the marked tokens
+    return (drug_clean + " " + event_clean).str.strip()
@@ -3,20 +3,25 @@
 #              reports. Implements sentence-aware semantic chunking, embedding-based deduplication, and 
 #              report-level isolation for retrieval.
 #----------------------------------------------------------------------------------------------------
+import os
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from typing import List, Optional, Tuple, Dict
+from pathlib import Path
+from typing import List, Optional, Tuple, Dict, Union
 import re
+import logging
+import threading
 import unicodedata
 import numpy as np
 
-import chromadb
-from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
 from pypdf import PdfReader
 import nltk
 from sklearn.metrics.pairwise import cosine_similarity
 
+from app.services.vector_service import CHROMA_PERSIST_DIR, get_chroma_client
+
 # Download NLTK data for sentence tokenization (run once)
 try:
     nltk.data.find('tokenizers/punkt')
@@ -24,9 +29,20 @@ except LookupError:
     nltk.download('punkt')
     nltk.download('punkt_tab')
 
+# PDFium text extraction (conditional import; native, much faster than pypdf)
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
+# PDFium is not thread-safe: one document is processed at a time (extraction
+# runs in the request threadpool)
+_pdfium_lock = threading.Lock()
+
 # OCR dependencies (conditional import)
 try:
-    from pdf2image import convert_from_bytes
+    from pdf2image import convert_from_bytes, convert_from_path
     import pytesseract
     OCR_AVAILABLE = True
 except ImportError:
@@ -34,11 +50,14 @@ except ImportError:
     print(" OCR libraries not installed. Install with: pip install pdf2image pytesseract")
 
 
+logger = logging.getLogger(__name__)
+
+
 # =========================
 # Configuration
 # =========================
 
-CHROMA_DIR = "./chroma_db"
+CHROMA_DIR = CHROMA_PERSIST_DIR
 COLLECTION_NAME = "pdf_documents"
 
 # Semantic Chunking Parameters
@@ -46,6 +65,12 @@ MAX_CHUNK_SIZE = 500  # Maximum words per chunk
 MIN_CHUNK_SIZE = 100  # Minimum words per chunk
 OVERLAP_SENTENCES = 2  # Number of sentences to overlap
 
+# Pages OCR'd in parallel (each page is its own tesseract process)
+OCR_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+# Word tokens for fixed-size chunking
+_WORD_RE = re.compile(r'\S+')
+
 # Deduplication Parameters
 SIMILARITY_THRESHOLD = 0.88  # Cosine similarity threshold (0-1)
                              # Higher = stricter deduplication
@@ -55,35 +80,70 @@ SIMILARITY_THRESHOLD = 0.88  # Cosine similarity threshold (0-1)
 # ChromaDB Client
 # =========================
 
-chroma_client = chromadb.Client(
-    Settings(
-        persist_directory=CHROMA_DIR
-    )
-)
+# On-disk client shared with vector_service (one PersistentClient per path),
+# so stored PDF chunks survive restarts
+chroma_client = get_chroma_client()
 
 # =========================
 # Embedding Model
 # =========================
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# Optional int8 ONNX Runtime backend (needs sentence-transformers[onnx]).
+# The model repo ships pre-quantized exports; pick the one matching the CPU
+# (e.g. onnx/model_quint8_avx2.onnx on machines without AVX-512 VNNI).
+# EMBEDDING_INT8 / EMBEDDING_INT8_FILE are read when the model is loaded,
+# not at import, so values from .env apply whatever the import order.
+DEFAULT_EMBEDDING_INT8_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+
+def _load_embedding_model() -> SentenceTransformer:
+    if os.getenv("EMBEDDING_INT8", "0") == "1":
+        int8_file = os.getenv("EMBEDDING_INT8_FILE", DEFAULT_EMBEDDING_INT8_FILE)
+        try:
+            model = SentenceTransformer(
+                EMBEDDING_MODEL_NAME,
+                backend="onnx",
+                model_kwargs={"file_name": int8_file}
+            )
+            logger.info("Embedding model loaded with int8 ONNX backend (%s)", int8_file)
+            return model
+        except Exception as e:
+            logger.warning("int8 ONNX embedding backend unavailable (%s); using PyTorch", e)
+    return SentenceTransformer(EMBEDDING_MODEL_NAME)
+
+
+embedding_model = _load_embedding_model()
 
 
 # ================================================================
 # fetches an existing ChromaDB collection or creates it if missing, 
-# using cosine similarity for vector search
+# using cosine similarity for vector search. The handle is resolved
+# once per process and reused (embeddings are computed here, so no
+# Chroma embedding function is attached). HNSW parameters only take
+# effect when the collection is first created.
 # ================================================================
 
+COLLECTION_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 32,
+    "hnsw:construction_ef": 128,
+    "hnsw:search_ef": 64
+}
+
+_collection = None
+
+
 def get_or_create_collection():
-    
-    try:
-        collection = chroma_client.get_collection(name=COLLECTION_NAME)
-        print(f" Using existing collection: {COLLECTION_NAME}")
-    except Exception:
-        collection = chroma_client.create_collection(
+    global _collection
+    if _collection is None:
+        _collection = chroma_client.get_or_create_collection(
             name=COLLECTION_NAME,
-            metadata={"hnsw:space": "cosine"}
+            metadata=COLLECTION_METADATA,
+            embedding_function=None
         )
-        print(f" Created new collection: {COLLECTION_NAME}")
-    return collection
+        logger.debug("Using collection: %s", COLLECTION_NAME)
+    return _collection
 
 
 # ==============================================================
@@ -124,10 +184,11 @@ def normalize_text(text: str) -> str:
 # to extract text when normal PDF parsing fails
 # ======================================================================
 
-def extract_text_with_ocr(pdf_bytes: bytes) -> str:
+def extract_text_with_ocr(pdf_source: Union[bytes, str, Path]) -> str:
     """
     Extract text using OCR (Tesseract).
     Used for scanned PDFs where pypdf fails.
+    Accepts raw PDF bytes or a path to a PDF on disk.
     """
     if not OCR_AVAILABLE:
         raise ImportError(
@@ -136,72 +197,117 @@ def extract_text_with_ocr(pdf_bytes: bytes) -> str:
         )
     
     try:
-        print("  Converting PDF pages to images...")
-        images = convert_from_bytes(pdf_bytes, dpi=300)
-        text = ""
+        logger.debug("Converting PDF pages to images...")
+        if isinstance(pdf_source, (bytes, bytearray)):
+            images = convert_from_bytes(pdf_source, dpi=300, thread_count=OCR_MAX_WORKERS)
+        else:
+            images = convert_from_path(str(pdf_source), dpi=300, thread_count=OCR_MAX_WORKERS)
         
-        for i, img in enumerate(images, 1):
-            print(f"   OCR processing page {i}/{len(images)}...")
-            page_text = pytesseract.image_to_string(img, lang='eng')
-            text += page_text + "\n\n"
+        # pytesseract runs one tesseract subprocess per page: threads are
+        # enough to keep all cores busy (no image pickling to worker processes)
+        logger.debug("OCR processing %d pages...", len(images))
+        with ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS) as pool:
+            page_texts = pool.map(lambda img: pytesseract.image_to_string(img, lang='eng'), images)
+            text = "".join(page_text + "\n\n" for page_text in page_texts)
         
-        print(f" OCR completed: {len(text)} characters extracted")
+        logger.debug("OCR completed: %d characters extracted", len(text))
         return text
     except Exception as e:
-        print(f" OCR extraction failed: {e}")
+        logger.warning("OCR extraction failed: %s", e)
         return ""
 
 
+# ================================================================================
+# extracts the embedded text layer page by page: PDFium when installed, pypdf
+# otherwise (or when PDFium rejects the file). Pages without text are skipped;
+# pages are separated by blank lines
+# ================================================================================
+
+def _extract_text_layer_pdfium(pdf_source: Union[bytes, str, Path]) -> str:
+    source = bytes(pdf_source) if isinstance(pdf_source, bytearray) else pdf_source
+    if isinstance(source, Path):
+        source = str(source)
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(source)
+        try:
+            logger.debug("Extracting text from %d pages (PDFium)...", len(pdf))
+            parts = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                extracted = textpage.get_text_range()
+                textpage.close()
+                page.close()
+                if extracted:
+                    parts.append(extracted + "\n\n")
+            return "".join(parts)
+        finally:
+            pdf.close()
+
+
+def _extract_text_layer(pdf_source: Union[bytes, str, Path]) -> str:
+    if PDFIUM_AVAILABLE:
+        try:
+            return _extract_text_layer_pdfium(pdf_source)
+        except Exception as e:
+            logger.warning("PDFium extraction failed: %s. Falling back to pypdf.", e)
+
+    if isinstance(pdf_source, (bytes, bytearray)):
+        reader = PdfReader(BytesIO(pdf_source))
+    else:
+        reader = PdfReader(str(pdf_source))
+    
+    logger.debug("Extracting text from %d pages...", len(reader.pages))
+    parts = []
+    for page in reader.pages:
+        extracted = page.extract_text()
+        if extracted:
+            parts.append(extracted + "\n\n")
+    return "".join(parts)
+
+
 # ================================================================================
 # extracts text from a PDF using standard parsing first, falls back to OCR
 # if the extracted text is too short, then cleans and normalizes the final output
 # ================================================================================
 
-def extract_text_from_pdf(pdf_bytes: bytes, ocr_threshold: int = 300) -> str:
+def extract_text_from_pdf(pdf_source: Union[bytes, str, Path], ocr_threshold: int = 300) -> str:
     """
     Extract text from PDF with intelligent OCR fallback.
     
     Strategy:
-    1. Try pypdf extraction (fast, works for text PDFs)
+    1. Try text-layer extraction (PDFium or pypdf; works for text PDFs)
     2. If text length < ocr_threshold, assume scanned → use OCR
     
     Args:
-        pdf_bytes: PDF file as bytes
+        pdf_source: PDF file as bytes, or a path to a PDF on disk
+                    (preferred for uploads - avoids holding the file in memory)
         ocr_threshold: Character count below which OCR is triggered
     
     Returns:
         Extracted and normalized text
     """
     try:
-        reader = PdfReader(BytesIO(pdf_bytes))
-        text = ""
-        
-        print(f" Extracting text from {len(reader.pages)} pages...")
-
         # Try standard extraction
-        for i, page in enumerate(reader.pages, 1):
-            extracted = page.extract_text()
-            if extracted:
-                text += extracted + "\n\n"
+        text = _extract_text_layer(pdf_source)
         
-        print(f" Standard extraction: {len(text)} characters")
+        logger.debug("Standard extraction: %d characters", len(text))
 
         # OCR fallback if text is too short (likely scanned)
         if len(text.strip()) < ocr_threshold:
-            print(f"  Text length ({len(text)} chars) below threshold ({ocr_threshold}). Initiating OCR...")
+            logger.debug("Text length (%d chars) below threshold (%d). Initiating OCR...", len(text), ocr_threshold)
             
             if OCR_AVAILABLE:
                 try:
-                    ocr_text = extract_text_with_ocr(pdf_bytes)
+                    ocr_text = extract_text_with_ocr(pdf_source)
                     if len(ocr_text.strip()) > len(text.strip()):
-                        print(f" OCR yielded better results. Using OCR text.")
+                        logger.debug("OCR yielded better results. Using OCR text.")
                         text = ocr_text
                     else:
-                        print("  OCR did not improve extraction. Using standard text.")
+                        logger.debug("OCR did not improve extraction. Using standard text.")
                 except Exception as e:
-                    print(f" OCR failed: {e}. Using standard extraction.")
+                    logger.warning("OCR failed: %s. Using standard extraction.", e)
             else:
-                print(" OCR not available. Install: pip install pdf2image pytesseract")
+                logger.debug("OCR not available. Install: pip install pdf2image pytesseract")
 
 #================================================
         # Normalize (Clean up messy text)
@@ -209,11 +315,11 @@ def extract_text_from_pdf(pdf_bytes: bytes, ocr_threshold: int = 300) -> str:
 
         normalized_text = normalize_text(text)
         
-        print(f"PDF extraction complete: {len(normalized_text)} characters")
+        logger.debug("PDF extraction complete: %d characters", len(normalized_text))
         return normalized_text
         
     except Exception as e:
-        print(f" PDF extraction error: {e}")
+        logger.error("PDF extraction error: %s", e)
         return ""
 
 
@@ -249,10 +355,10 @@ def semantic_chunk_text(
     sentences = nltk.sent_tokenize(text)
     
     if not sentences:
-        print(" No sentences found in text")
+        logger.debug("No sentences found in text")
         return []
     
-    print(f" Detected {len(sentences)} sentences")
+    logger.debug("Detected %d sentences", len(sentences))
     
     chunks = []
     current_chunk_sentences = []
@@ -297,7 +403,7 @@ def semantic_chunk_text(
         
         # Merge small final chunks
         if chunks and current_word_count < min_chunk_size:
-            print(f" Merging small final chunk ({current_word_count} words) with previous")
+            logger.debug("Merging small final chunk (%d words) with previous", current_word_count)
             chunks[-1]['text'] += " " + chunk_text
             chunks[-1]['end_sentence'] = len(sentences) - 1
             chunks[-1]['word_count'] += current_word_count
@@ -309,12 +415,12 @@ def semantic_chunk_text(
                 'word_count': current_word_count
             })
     
-    print(f" Created {len(chunks)} semantic chunks from {len(sentences)} sentences")
+    logger.debug("Created %d semantic chunks from %d sentences", len(chunks), len(sentences))
     
-    # Print chunk statistics
-    if chunks:
+    # Chunk statistics (only computed when debug logging is on)
+    if chunks and logger.isEnabledFor(logging.DEBUG):
         avg_words = np.mean([c['word_count'] for c in chunks])
-        print(f"    Avg chunk size: {avg_words:.1f} words")
+        logger.debug("Avg chunk size: %.1f words", avg_words)
     
     return chunks
 
@@ -325,7 +431,8 @@ def semantic_chunk_text(
 
 def deduplicate_chunks(
     chunks: List[Dict[str, any]], 
-    similarity_threshold: float = SIMILARITY_THRESHOLD
+    similarity_threshold: float = SIMILARITY_THRESHOLD,
+    embeddings: Optional[np.ndarray] = None
 ) -> Tuple[List[Dict[str, any]], List[int]]:
     """
     Remove near-duplicate chunks using embedding-based cosine similarity.
@@ -345,6 +452,8 @@ def deduplicate_chunks(
         chunks: List of chunk dictionaries
         similarity_threshold: Cosine similarity threshold (0-1)
                              0.85-0.90 recommended for near-duplicate detection
+        embeddings: Precomputed chunk embeddings (row per chunk); encoded
+                    here when omitted
     
     Returns:
         Tuple of (unique_chunks, kept_original_indices)
@@ -352,11 +461,11 @@ def deduplicate_chunks(
     if not chunks:
         return [], []
     
-    chunk_texts = [c['text'] for c in chunks]
-    
-    print(f" Generating embeddings for {len(chunk_texts)} chunks...")
-    embeddings = embedding_model.encode(chunk_texts, show_progress_bar=False)
-    embeddings_array = np.array(embeddings)
+    if embeddings is None:
+        chunk_texts = [c['text'] for c in chunks]
+        logger.debug("Generating embeddings for %d chunks...", len(chunk_texts))
+        embeddings = encode_texts(chunk_texts)
+    embeddings_array = np.asarray(embeddings)
     
     unique_chunks = []
     unique_embeddings = []
@@ -379,7 +488,7 @@ def deduplicate_chunks(
             if max_similarity > similarity_threshold:
                 is_duplicate = True
                 duplicate_count += 1
-                print(f"    Chunk {i} is {max_similarity:.2%} similar to existing chunk - skipping")
+                logger.debug("Chunk %d is %.2f%% similar to existing chunk - skipping", i, max_similarity * 100)
         
         # Keep chunk if not duplicate
         if not is_duplicate:
@@ -388,8 +497,10 @@ def deduplicate_chunks(
             kept_indices.append(i)
     
     dedup_rate = (duplicate_count / len(chunks)) * 100 if chunks else 0
-    print(f" Deduplication complete: Kept {len(unique_chunks)}/{len(chunks)} chunks "
-          f"({duplicate_count} duplicates removed, {dedup_rate:.1f}% reduction)")
+    logger.debug(
+        "Deduplication complete: Kept %d/%d chunks (%d duplicates removed, %.1f%% reduction)",
+        len(unique_chunks), len(chunks), duplicate_count, dedup_rate
+    )
     
     return unique_chunks, kept_indices
 
@@ -398,7 +509,21 @@ def deduplicate_chunks(
 # Embeddings Generation
 # =========================
 
-def generate_embeddings(texts: List[str]) -> List[List[float]]:
+# Texts per forward pass; larger batches keep the transformer GEMMs busy
+EMBED_BATCH_SIZE = 64
+
+
+def encode_texts(texts: List[str], batch_size: int = EMBED_BATCH_SIZE) -> np.ndarray:
+    """Encode texts in one batched call; returns a (len(texts), 384) array."""
+    return embedding_model.encode(
+        texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        show_progress_bar=False
+    )
+
+
+def generate_embeddings(texts: List[str], batch_size: int = EMBED_BATCH_SIZE) -> List[List[float]]:
     """
     Generate semantic embeddings using sentence-transformers.
     
@@ -410,56 +535,38 @@ def generate_embeddings(texts: List[str]) -> List[List[float]]:
     if not texts:
         return []
     
-    embeddings = embedding_model.encode(texts, show_progress_bar=False)
-    return embeddings.tolist()
+    return encode_texts(texts, batch_size).tolist()
+
+
+def embed_queries_batch(queries: List[str]) -> List[List[float]]:
+    """Normalize and embed several retrieval queries in one encode() call."""
+    return generate_embeddings([normalize_text(query) for query in queries])
 
 
 # =====================================
 # Store PDF in ChromaDB 
 # =====================================
 
-def embed_and_store_pdf(
-    pdf_text: str, 
-    report_id: str,
-    use_semantic_chunking: bool = True,
-    apply_deduplication: bool = True,
-    similarity_threshold: float = SIMILARITY_THRESHOLD,
-    verbose: bool = True
-) -> Dict[str, any]:
-    """
-    Complete pipeline: Extract → Normalize → Chunk → Deduplicate → Embed → Store
-    
-    Args:
-        pdf_text: Extracted PDF text
-        report_id: Unique identifier for the adverse event report
-        use_semantic_chunking: Use semantic vs fixed-size chunking
-        apply_deduplication: Remove near-duplicates
-        similarity_threshold: Threshold for deduplication
-        verbose: Print detailed progress
-    
-    Returns:
-        Dictionary with processing statistics
-    """
-    stats = {
-        'report_id': report_id,
-        'original_text_length': len(pdf_text),
-        'total_chunks_created': 0,
-        'chunks_after_dedup': 0,
-        'duplicates_removed': 0,
-        'chunks_stored': 0
-    }
-    
+def _chunk_pdf_text(
+    pdf_text: str,
+    stats: Dict,
+    use_semantic_chunking: bool,
+    verbose: bool,
+    normalized: bool = False
+) -> List[Dict]:
+    """Normalize → Chunk (steps 1-2 of the storage pipeline)."""
     # Step 1: Normalize
     if verbose:
         print(f"\n{'='*60}")
-        print(f" Processing Report: {report_id}")
+        print(f" Processing Report: {stats['report_id']}")
         print(f"{'='*60}")
     
-    normalized_text = normalize_text(pdf_text)
+    # extract_text_from_pdf output is already normalized: skip the second pass
+    normalized_text = pdf_text.strip() if normalized else normalize_text(pdf_text)
     
     if not normalized_text:
         print(" No text after normalization")
-        return stats
+        return []
     
     # Step 2: Semantic Chunking
     if use_semantic_chunking:
@@ -474,45 +581,139 @@ def embed_and_store_pdf(
     else:
         if verbose:
             print("\n Step 1: Fixed-Size Chunking (fallback)")
-        # Simple fixed-size chunking
-        words = normalized_text.split()
+        # Simple fixed-size chunking: word offsets are found once and each
+        # chunk is one slice of the text (no per-chunk list copy + join)
+        spans = [m.span() for m in _WORD_RE.finditer(normalized_text)]
         chunk_size = 500
         overlap = 50
         chunks = []
-        for i in range(0, len(words), chunk_size - overlap):
-            chunk_text = " ".join(words[i:i + chunk_size])
-            if chunk_text.strip():
-                chunks.append({
-                    'text': chunk_text,
-                    'start_sentence': i // chunk_size,
-                    'end_sentence': (i + chunk_size) // chunk_size,
-                    'word_count': len(chunk_text.split())
-                })
+        for i in range(0, len(spans), chunk_size - overlap):
+            last = min(i + chunk_size, len(spans)) - 1
+            chunks.append({
+                'text': normalized_text[spans[i][0]:spans[last][1]],
+                'start_sentence': i // chunk_size,
+                'end_sentence': (i + chunk_size) // chunk_size,
+                'word_count': last - i + 1
+            })
     
     stats['total_chunks_created'] = len(chunks)
     
     if not chunks:
         print(" No chunks created")
-        return stats
-    
+    return chunks
+
+
+def _dedup_and_build_records(
+    chunks: List[Dict],
+    embeddings: np.ndarray,
+    stats: Dict,
+    use_semantic_chunking: bool,
+    apply_deduplication: bool,
+    similarity_threshold: float,
+    verbose: bool
+) -> Dict[str, list]:
+    """
+    Deduplicate → build ChromaDB records (steps 3-4). The chunk embeddings
+    are computed once up front and reused: the kept rows are what gets stored.
+    """
+    report_id = stats['report_id']
+
     # Step 3: Deduplication
     kept_indices = list(range(len(chunks)))
     
     if apply_deduplication and len(chunks) > 1:
         if verbose:
             print(f"\n🔍 Step 2: Deduplication (threshold={similarity_threshold})")
-        chunks, kept_indices = deduplicate_chunks(chunks, similarity_threshold)
+        chunks, kept_indices = deduplicate_chunks(chunks, similarity_threshold, embeddings)
         stats['chunks_after_dedup'] = len(chunks)
         stats['duplicates_removed'] = stats['total_chunks_created'] - len(chunks)
     else:
         stats['chunks_after_dedup'] = len(chunks)
     
-    # Step 4: Generate Embeddings
+    # Step 4: Embeddings of the kept chunks
     if verbose:
         print(f"\n Step 3: Generating Embeddings")
     
-    chunk_texts = [c['text'] for c in chunks]
-    embeddings = generate_embeddings(chunk_texts)
+    return {
+        "ids": [f"{report_id}_chunk_{idx}" for idx in kept_indices],
+        "embeddings": embeddings[kept_indices].tolist(),
+        "documents": [c['text'] for c in chunks],
+        "metadatas": [
+            {
+                "report_id": report_id,
+                "chunk_index": idx,
+                "original_chunk_number": idx,
+                "start_sentence": chunk.get('start_sentence', 0),
+                "end_sentence": chunk.get('end_sentence', 0),
+                "word_count": chunk.get('word_count', 0),
+                "semantic_chunking": use_semantic_chunking,
+                "deduplication_applied": apply_deduplication,
+                "similarity_threshold": similarity_threshold
+            }
+            for idx, chunk in zip(kept_indices, chunks)
+        ]
+    }
+
+
+def _print_storage_summary(stats: Dict) -> None:
+    print(f"\n{'='*60}")
+    print(f" Processing Summary:")
+    print(f"   • Original text: {stats['original_text_length']} characters")
+    print(f"   • Chunks created: {stats['total_chunks_created']}")
+    print(f"   • After deduplication: {stats['chunks_after_dedup']}")
+    print(f"   • Duplicates removed: {stats['duplicates_removed']}")
+    print(f"   • Chunks stored: {stats['chunks_stored']}")
+    print(f"{'='*60}\n")
+
+
+def _new_storage_stats(pdf_text: str, report_id: str) -> Dict:
+    return {
+        'report_id': report_id,
+        'original_text_length': len(pdf_text),
+        'total_chunks_created': 0,
+        'chunks_after_dedup': 0,
+        'duplicates_removed': 0,
+        'chunks_stored': 0
+    }
+
+
+def embed_and_store_pdf(
+    pdf_text: str, 
+    report_id: str,
+    use_semantic_chunking: bool = True,
+    apply_deduplication: bool = True,
+    similarity_threshold: float = SIMILARITY_THRESHOLD,
+    verbose: bool = False,
+    normalized: bool = False
+) -> Dict[str, any]:
+    """
+    Complete pipeline: Extract → Normalize → Chunk → Deduplicate → Embed → Store
+    
+    Args:
+        pdf_text: Extracted PDF text
+        report_id: Unique identifier for the adverse event report
+        use_semantic_chunking: Use semantic vs fixed-size chunking
+        apply_deduplication: Remove near-duplicates
+        similarity_threshold: Threshold for deduplication
+        verbose: Print detailed progress (off by default; opt in for scripts)
+        normalized: pdf_text already went through normalize_text (e.g. it
+                    comes from extract_text_from_pdf), so it is not redone
+    
+    Returns:
+        Dictionary with processing statistics
+    """
+    stats = _new_storage_stats(pdf_text, report_id)
+    
+    chunks = _chunk_pdf_text(pdf_text, stats, use_semantic_chunking, verbose, normalized)
+    if not chunks:
+        return stats
+    
+    # One encode for all chunks: shared by deduplication and storage
+    embeddings = encode_texts([c['text'] for c in chunks])
+    records = _dedup_and_build_records(
+        chunks, embeddings, stats,
+        use_semantic_chunking, apply_deduplication, similarity_threshold, verbose
+    )
     
     # Step 5: Store in ChromaDB
     if verbose:
@@ -520,54 +721,93 @@ def embed_and_store_pdf(
     
     collection = get_or_create_collection()
     
-    # Generate IDs
-    chunk_ids = [f"{report_id}_chunk_{idx}" for idx in kept_indices]
-    
-    # Metadata
-    metadatas = [
-        {
-            "report_id": report_id,
-            "chunk_index": idx,
-            "original_chunk_number": idx,
-            "start_sentence": chunk.get('start_sentence', 0),
-            "end_sentence": chunk.get('end_sentence', 0),
-            "word_count": chunk.get('word_count', 0),
-            "semantic_chunking": use_semantic_chunking,
-            "deduplication_applied": apply_deduplication,
-            "similarity_threshold": similarity_threshold
-        }
-        for idx, chunk in zip(kept_indices, chunks)
-    ]
-    
     # Store
     try:
-        collection.add(
-            embeddings=embeddings,
-            documents=chunk_texts,
-            metadatas=metadatas,
-            ids=chunk_ids
-        )
-        stats['chunks_stored'] = len(chunks)
+        collection.add(**records)
+        stats['chunks_stored'] = len(records["ids"])
         
         if verbose:
-            print(f" Successfully stored {len(chunks)} chunks for report {report_id}")
+            print(f" Successfully stored {stats['chunks_stored']} chunks for report {report_id}")
     except Exception as e:
-        print(f" Storage error: {e}")
+        logger.error("Storage error: %s", e)
         stats['error'] = str(e)
     
     if verbose:
-        print(f"\n{'='*60}")
-        print(f" Processing Summary:")
-        print(f"   • Original text: {stats['original_text_length']} characters")
-        print(f"   • Chunks created: {stats['total_chunks_created']}")
-        print(f"   • After deduplication: {stats['chunks_after_dedup']}")
-        print(f"   • Duplicates removed: {stats['duplicates_removed']}")
-        print(f"   • Chunks stored: {stats['chunks_stored']}")
-        print(f"{'='*60}\n")
+        _print_storage_summary(stats)
     
     return stats
 
 
+# =====================================================================
+# Stores several PDFs at once: chunks of every document go through ONE
+# encode() call, then the vectors are split back per document (offsets)
+# for per-report deduplication, and everything lands in one add()
+# =====================================================================
+
+def embed_and_store_pdfs_bulk(
+    docs: List[Tuple[str, str]],
+    use_semantic_chunking: bool = True,
+    apply_deduplication: bool = True,
+    similarity_threshold: float = SIMILARITY_THRESHOLD,
+    verbose: bool = False,
+    normalized: bool = False
+) -> List[Dict[str, any]]:
+    """
+    Bulk variant of embed_and_store_pdf.
+    
+    Args:
+        docs: (pdf_text, report_id) pairs
+        normalized: every pdf_text is already normalize_text output
+    
+    Returns:
+        One statistics dictionary per document, in input order
+    """
+    all_stats = []
+    all_chunks = []
+    offsets = [0]
+    
+    for pdf_text, report_id in docs:
+        stats = _new_storage_stats(pdf_text, report_id)
+        chunks = _chunk_pdf_text(pdf_text, stats, use_semantic_chunking, verbose, normalized)
+        all_stats.append(stats)
+        all_chunks.append(chunks)
+        offsets.append(offsets[-1] + len(chunks))
+    
+    if offsets[-1] == 0:
+        return all_stats
+    
+    embeddings = encode_texts([c['text'] for chunks in all_chunks for c in chunks])
+    
+    batch = {"ids": [], "embeddings": [], "documents": [], "metadatas": []}
+    for n, (stats, chunks) in enumerate(zip(all_stats, all_chunks)):
+        if not chunks:
+            continue
+        records = _dedup_and_build_records(
+            chunks, embeddings[offsets[n]:offsets[n + 1]], stats,
+            use_semantic_chunking, apply_deduplication, similarity_threshold, verbose
+        )
+        for key, values in records.items():
+            batch[key].extend(values)
+        stats['chunks_stored'] = len(records["ids"])
+    
+    collection = get_or_create_collection()
+    
+    try:
+        collection.add(**batch)
+    except Exception as e:
+        logger.error("Storage error: %s", e)
+        for stats in all_stats:
+            if stats['chunks_stored']:
+                stats['chunks_stored'] = 0
+                stats['error'] = str(e)
+    
+    if verbose:
+        for stats in all_stats:
+            _print_storage_summary(stats)
+    
+    return all_stats
+
+
 # ===================================================================
 # RAG Retrieval with Enhanced Context
 # Find relevant information from a specific report
@@ -577,7 +817,7 @@ def retrieve_context(
     query: str, 
     report_id: str, 
     top_k: int = 5,
-    verbose: bool = True
+    verbose: bool = False
 ) -> Tuple[List[str], List[Dict]]:
     """
     Retrieve most relevant chunks for a specific report.
@@ -591,7 +831,7 @@ def retrieve_context(
         query: Search query (e.g., "What adverse events occurred?")
         report_id: Report to search within
         top_k: Number of chunks to retrieve
-        verbose: Print retrieval details
+        verbose: Print retrieval details (off by default)
     
     Returns:
         Tuple of (documents, metadatas)
@@ -611,15 +851,18 @@ def retrieve_context(
     
     # Query ChromaDB with report_id filter
     try:
+        # Distances are only printed in verbose mode
+        include = ["documents", "metadatas", "distances"] if verbose else ["documents", "metadatas"]
         results = collection.query(
             query_embeddings=[query_embedding],
             n_results=top_k,
-            where={"report_id": report_id}
+            where={"report_id": report_id},
+            include=include
         )
         
         documents = results.get("documents", [[]])[0]
         metadatas = results.get("metadatas", [[]])[0]
-        distances = results.get("distances", [[]])[0]
+        distances = (results.get("distances") or [[]])[0]
         
         if verbose:
             print(f" Retrieved {len(documents)} chunks")
@@ -634,7 +877,7 @@ def retrieve_context(
         return documents, metadatas
         
     except Exception as e:
-        print(f" Retrieval error: {e}")
+        logger.error("Retrieval error: %s", e)
         return [], []
 
 
@@ -685,17 +928,19 @@ def list_all_reports() -> List[str]:
         
         report_ids = list(set(m.get("report_id") for m in metadatas if m.get("report_id")))
         
-        print(f" Found {len(report_ids)} unique reports")
+        logger.debug("Found %d unique reports", len(report_ids))
         return sorted(report_ids)
     except Exception as e:
-        print(f" Error listing reports: {e}")
+        logger.error("Error listing reports: %s", e)
         return []
 
 
 def clear_pdf_collection():
     """Clear all stored embeddings."""
+    global _collection
     try:
         chroma_client.delete_collection(name=COLLECTION_NAME)
+        _collection = None
         print("  Collection cleared successfully")
     except Exception as e:
         print(f"  Failed to clear collection: {e}")
@@ -3,18 +3,101 @@
 #               common drug lists, confirming legitimacy via RxNorm
 #==============================================================================================================
 
-import requests
-from functools import lru_cache
-from typing import Optional
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
 import re
+import httpx
+from app.services._http import RXNAV_SESSION
+from app.services.keyword_scanner import AHOCORASICK_AVAILABLE
+
+if AHOCORASICK_AVAILABLE:
+    import ahocorasick
+
+logger = logging.getLogger(__name__)
 
 RXNORM_BASE = "https://rxnav.nlm.nih.gov/REST"
 OPENFDA_BASE = "https://api.fda.gov/drug/label.json"
 
 TIMEOUT = 5
 
+# Lookups in flight at once in batch_lookup_drugs (each may chain up to four
+# RxNav/openFDA requests). This only bounds concurrency; the request rate is
+# enforced separately by the token buckets below.
+RXNAV_MAX_CONCURRENCY = 10
+
+# Request-rate limits, applied in front of every HTTP request (sync and async
+# paths, all threads). RxNav allows 20 requests/s per IP: 19/s with a burst of
+# 1 keeps any one-second window at or below 20. openFDA allows 240/min without
+# an API key.
+RXNAV_REQUESTS_PER_SECOND = 19
+OPENFDA_REQUESTS_PER_SECOND = 4
+
+# Resolved lookups keyed on the lowercased name, shared by the sync and async
+# paths. Rejected names are cached too (as None), like the lru_cache it replaces.
+# Entries expire after RXNORM_CACHE_TTL seconds so RxNorm updates (and names
+# rejected during an outage) are picked up again.
+RXNORM_CACHE_SIZE = 10000
+RXNORM_CACHE_TTL = 86400
+_rxnorm_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_rxnorm_lock = threading.Lock()
+_MISS = object()
+
+# Cheap shape check run before any HTTP call (see _is_plausible_drug_name)
+MAX_DRUG_NAME_LENGTH = 100
+MAX_DRUG_NAME_WORDS = 6
+_LETTER_RE = re.compile(r"[^\W\d_]")
+
+
+# =========================
+# Token-bucket rate limiter shared by threads and event loops: each request
+# reserves the next free slot under a lock, then sleeps until it (blocking
+# or awaiting, depending on the caller)
+# =========================
+
+class _RateLimiter:
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token (possibly going into debt); return seconds to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def acquire(self) -> None:
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+_RXNAV_LIMITER = _RateLimiter(RXNAV_REQUESTS_PER_SECOND)
+_OPENFDA_LIMITER = _RateLimiter(OPENFDA_REQUESTS_PER_SECOND)
+
+
+def _rxnav_get(url: str, params: Optional[Dict] = None):
+    _RXNAV_LIMITER.acquire()
+    return RXNAV_SESSION.get(url, params=params, timeout=TIMEOUT)
+
 
-@lru_cache(maxsize=1000)
 def lookup_drug_rxnorm(drugname: str):
     """
     Validate + normalize drug using RxNorm.
@@ -22,15 +105,82 @@ def lookup_drug_rxnorm(drugname: str):
       1. Try RxNorm (primary)
       2. If blocked/unavailable → try openFDA (secondary)
       3. If still fails → fallback to input drug (DO NOT BLOCK PIPELINE)
+
+    Results are memoized on the case-insensitive name, so "Aspirin",
+    "aspirin " and "ASPIRIN" share one set of HTTP round-trips.
     """
     drugname = drugname.strip()
+    return _present_lookup(drugname, _lookup_drug_rxnorm_cached(drugname.lower()))
+
+
+def _present_lookup(drugname: str, cached: Optional[Dict]) -> Optional[Dict]:
+    if not cached:
+        return None
+
+    # openFDA validation accepts the input itself as canonical
+    return {
+        "input": drugname,
+        "rxcui": cached["rxcui"],
+        "canonical_name": cached["canonical_name"] if cached["rxcui"] else drugname
+    }
+
+
+def _cache_get(drugname: str):
+    with _rxnorm_lock:
+        entry = _rxnorm_cache.get(drugname)
+        if entry is None:
+            return _MISS
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del _rxnorm_cache[drugname]
+            return _MISS
+        _rxnorm_cache.move_to_end(drugname)
+        return result
+
+
+def _cache_put(drugname: str, result: Optional[Dict]) -> None:
+    with _rxnorm_lock:
+        _rxnorm_cache[drugname] = (time.monotonic() + RXNORM_CACHE_TTL, result)
+        _rxnorm_cache.move_to_end(drugname)
+        while len(_rxnorm_cache) > RXNORM_CACHE_SIZE:
+            _rxnorm_cache.popitem(last=False)
+
+
+def _lookup_drug_rxnorm_cached(drugname: str):
+    cached = _cache_get(drugname)
+    if cached is _MISS:
+        cached = _resolve_drug_rxnorm(drugname)
+        _cache_put(drugname, cached)
+    return cached
+
+
+#=====================================================================================
+# Rejects strings that cannot be drug names (too short/long, no letters at all, free
+# text, known report vocabulary) so garbage from PDFs never costs the RxNorm ->
+# approximateTerm -> openFDA round-trips
+#=====================================================================================
+
+def _is_plausible_drug_name(drugname: str) -> bool:
+    if not 3 <= len(drugname) <= MAX_DRUG_NAME_LENGTH:
+        return False
+    if drugname in INVALID_DRUG_WORDS:
+        return False
+    if len(drugname.split()) > MAX_DRUG_NAME_WORDS:
+        return False
+    return _LETTER_RE.search(drugname) is not None
+
+
+def _resolve_drug_rxnorm(drugname: str):
+    if not _is_plausible_drug_name(drugname):
+        logger.debug("[RxNorm] Skipping lookup for implausible drug name: '%s'", drugname)
+        return None
 
     # ============================
     #  PRIMARY — RxNorm
     # ============================
     try:
         url = f"{RXNORM_BASE}/rxcui.json"
-        resp = requests.get(url, params={"name": drugname}, timeout=TIMEOUT)
+        resp = _rxnav_get(url, {"name": drugname})
         resp.raise_for_status()
         data = resp.json()
 
@@ -39,11 +189,7 @@ def lookup_drug_rxnorm(drugname: str):
         # Approximate lookup
         if not rx_ids:
             approx_url = f"{RXNORM_BASE}/approximateTerm.json"
-            approx_resp = requests.get(
-                approx_url,
-                params={"term": drugname, "maxEntries": 1},
-                timeout=TIMEOUT
-            )
+            approx_resp = _rxnav_get(approx_url, {"term": drugname, "maxEntries": 1})
             approx_resp.raise_for_status()
             approx_data = approx_resp.json()
             candidates = approx_data.get("approximateGroup", {}).get("candidate", [])
@@ -57,7 +203,7 @@ def lookup_drug_rxnorm(drugname: str):
 
         # Canonical name
         name_url = f"{RXNORM_BASE}/rxcui/{rxcui}.json"
-        name_resp = requests.get(name_url, timeout=TIMEOUT)
+        name_resp = _rxnav_get(name_url)
         name_resp.raise_for_status()
         name_data = name_resp.json()
 
@@ -67,7 +213,7 @@ def lookup_drug_rxnorm(drugname: str):
         if not canonical_name:
             raise ValueError("RxNorm returned no canonical name")
 
-        print(f"[RxNorm] Normalized '{drugname}' → '{canonical_name}' ({rxcui})")
+        logger.debug("[RxNorm] Normalized '%s' → '%s' (%s)", drugname, canonical_name, rxcui)
 
         return {
             "input": drugname,
@@ -76,7 +222,7 @@ def lookup_drug_rxnorm(drugname: str):
         }
 
     except Exception as e:
-        print(f"[RxNorm] FAILED for '{drugname}': {e}")
+        logger.warning("[RxNorm] FAILED for '%s': %s", drugname, e)
 
     # ============================
     #  SECONDARY — openFDA (Validation Only)
@@ -86,12 +232,13 @@ def lookup_drug_rxnorm(drugname: str):
             "search": f'openfda.generic_name:"{drugname.lower()}"',
             "limit": 1
         }
-        resp = requests.get(OPENFDA_BASE, params=params, timeout=TIMEOUT)
+        _OPENFDA_LIMITER.acquire()
+        resp = RXNAV_SESSION.get(OPENFDA_BASE, params=params, timeout=TIMEOUT)
         resp.raise_for_status()
         data = resp.json()
 
         if data.get("results"):
-            print(f"[openFDA] Validated drug '{drugname}' via FDA label")
+            logger.debug("[openFDA] Validated drug '%s' via FDA label", drugname)
 
             return {
                 "input": drugname,
@@ -100,15 +247,148 @@ def lookup_drug_rxnorm(drugname: str):
             }
 
     except Exception as e:
-        print(f"[openFDA] FAILED for '{drugname}': {e}")
+        logger.warning("[openFDA] FAILED for '%s': %s", drugname, e)
 
     # ============================
     # 3️⃣ FINAL FALLBACK — REJECT UNVALIDATED (FAIL HARD)
     # ============================
-    print(f"[Fallback] Rejecting unvalidated drug name: '{drugname}'")
+    logger.debug("[Fallback] Rejecting unvalidated drug name: '%s'", drugname)
     return None
 
 
+# =========================
+# Async lookup (same resolution order as the sync path)
+# =========================
+
+async def _get_json(client: httpx.AsyncClient, url: str, params: Optional[Dict] = None,
+                    limiter: _RateLimiter = _RXNAV_LIMITER) -> Dict:
+    await limiter.acquire_async()
+    resp = await client.get(url, params=params)
+    resp.raise_for_status()
+    return resp.json()
+
+
+async def _resolve_drug_rxnorm_async(client: httpx.AsyncClient, drugname: str):
+    """
+    Async counterpart of _resolve_drug_rxnorm: RxNorm first, and openFDA
+    only when RxNorm cannot resolve the name (no openFDA quota is spent on
+    names RxNorm knows).
+    """
+    if not _is_plausible_drug_name(drugname):
+        logger.debug("[RxNorm] Skipping lookup for implausible drug name: '%s'", drugname)
+        return None
+
+    try:
+        rx_data = await _get_json(client, f"{RXNORM_BASE}/rxcui.json", {"name": drugname})
+        rx_ids = rx_data.get("idGroup", {}).get("rxnormId", [])
+
+        # Approximate lookup
+        if not rx_ids:
+            approx_data = await _get_json(
+                client,
+                f"{RXNORM_BASE}/approximateTerm.json",
+                {"term": drugname, "maxEntries": 1}
+            )
+            candidates = approx_data.get("approximateGroup", {}).get("candidate", [])
+
+            if not candidates:
+                raise ValueError("RxNorm: No candidates found")
+
+            rxcui = candidates[0].get("rxcui")
+        else:
+            rxcui = rx_ids[0]
+
+        # Canonical name
+        name_data = await _get_json(client, f"{RXNORM_BASE}/rxcui/{rxcui}.json")
+        canonical_name = name_data.get("idGroup", {}).get("name")
+
+        if not canonical_name:
+            raise ValueError("RxNorm returned no canonical name")
+
+        logger.debug("[RxNorm] Normalized '%s' → '%s' (%s)", drugname, canonical_name, rxcui)
+
+        return {
+            "input": drugname,
+            "rxcui": rxcui,
+            "canonical_name": canonical_name
+        }
+
+    except Exception as e:
+        logger.warning("[RxNorm] FAILED for '%s': %s", drugname, e)
+
+    try:
+        fda_data = await _get_json(client, OPENFDA_BASE, {
+            "search": f'openfda.generic_name:"{drugname.lower()}"',
+            "limit": 1
+        }, limiter=_OPENFDA_LIMITER)
+
+        if fda_data.get("results"):
+            logger.debug("[openFDA] Validated drug '%s' via FDA label", drugname)
+            return {
+                "input": drugname,
+                "rxcui": None,
+                "canonical_name": drugname  # accept input as canonical
+            }
+
+    except Exception as e:
+        logger.warning("[openFDA] FAILED for '%s': %s", drugname, e)
+
+    logger.debug("[Fallback] Rejecting unvalidated drug name: '%s'", drugname)
+    return None
+
+
+async def lookup_drug_rxnorm_async(drugname: str, client: Optional[httpx.AsyncClient] = None):
+    """
+    Async counterpart of lookup_drug_rxnorm (same result, same cache).
+    Pass a client to share its connection pool across many lookups.
+    """
+    drugname = drugname.strip()
+
+    if client is None:
+        async with httpx.AsyncClient(timeout=TIMEOUT) as own_client:
+            cached = await _lookup_cached_async(own_client, drugname.lower())
+    else:
+        cached = await _lookup_cached_async(client, drugname.lower())
+
+    return _present_lookup(drugname, cached)
+
+
+async def _lookup_cached_async(client: httpx.AsyncClient, key: str):
+    cached = _cache_get(key)
+    if cached is _MISS:
+        cached = await _resolve_drug_rxnorm_async(client, key)
+        _cache_put(key, cached)
+    return cached
+
+
+def batch_lookup_drugs(names: List[str]) -> List[Optional[Dict]]:
+    """
+    Validate several drug names concurrently over one connection pool.
+    Case-insensitive duplicates are resolved once, at most
+    RXNAV_MAX_CONCURRENCY lookups run at a time, and every request passes
+    the RxNav/openFDA rate limiters. Results keep the order of
+    names. Blocking: call it from a worker thread, not from inside a
+    running event loop.
+    """
+    stripped = [name.strip() for name in names]
+    keys = list(dict.fromkeys(name.lower() for name in stripped))
+
+    async def _run():
+        semaphore = asyncio.Semaphore(RXNAV_MAX_CONCURRENCY)
+
+        async def _bounded(client, key):
+            async with semaphore:
+                return await _lookup_cached_async(client, key)
+
+        async with httpx.AsyncClient(timeout=TIMEOUT) as client:
+            return await asyncio.gather(*[_bounded(client, key) for key in keys])
+
+    if not names:
+        return []
+    resolved = dict(zip(keys, asyncio.run(_run())))
+    return [_present_lookup(name, resolved[name.lower()]) for name in stripped]
+
+
 # =========================
 # Drug Detection from PDF Text (NEW)
 # =========================
@@ -128,15 +408,180 @@ COMMON_DRUGS = [
     "clopidogrel", "rivaroxaban", "apixaban", "dabigatran"
 ]
 
+# RxNorm results for COMMON_DRUGS, validated once in the background at startup
+# (start_prevalidation) and persisted so later cold starts need no lookups
+COMMON_DRUGS_CACHE_PATH = Path(os.getenv(
+    "RXNORM_COMMON_DRUGS_CACHE",
+    Path(__file__).resolve().parents[2] / "data" / "rxnorm_common_drugs.json"
+))
+_PREVALIDATED: Dict[str, Dict] = {}
+
 # Medical stopwords that should NEVER be detected as drugs (CRITICAL)
-INVALID_DRUG_WORDS = {
+# Lowercase; also covers the report words that look like brand names
+INVALID_DRUG_WORDS = frozenset({
     "reaction", "event", "patient", "report", "serious",
     "adverse", "case", "hospital", "death", "unknown",
     "outcome", "hospitalization", "disability", "congenital",
     "anomaly", "intervention", "required", "recover", "recovered",
     "fatal", "nonfatal", "causality", "assessment", "narrative",
-    "description", "summary", "background", "medical", "history"
-}
+    "description", "summary", "background", "medical", "history",
+    "date", "doctor", "physician"
+})
+
+# Detection patterns (compiled once)
+_WS_RE = re.compile(r'\s+')
+
+# STRICT explicit labels, tried in order
+_LABEL_PATTERNS = [
+    re.compile(pattern) for pattern in (
+        r'suspected\s+drug[\s:]+([a-z][a-z0-9\-]+)',
+        r'drug\s+name[\s:]+([a-z][a-z0-9\-]+)',
+        r'medication[\s:]+([a-z][a-z0-9\-]+)',
+        r'product[\s:]+([a-z][a-z0-9\-]+)',
+    )
+]
+
+# Every common drug in one word-bounded alternation (fallback without pyahocorasick)
+_COMMON_DRUGS_RE = re.compile(r'\b(' + '|'.join(re.escape(drug) for drug in COMMON_DRUGS) + r')\b')
+
+# Capitalized words (potential brand names), matched on original case
+# (5+ letters; INVALID_DRUG_WORDS are excluded by the lookahead, so the
+# regex never emits them)
+_BRAND_RE = re.compile(
+    r'\b(?!(?:' + '|'.join(sorted(word.capitalize() for word in INVALID_DRUG_WORDS)) + r')\b)'
+    r'([A-Z][a-z]{4,})\b'
+)
+
+_FILENAME_SPLIT_RE = re.compile(r'[_\-\s]+')
+
+# Character trie of COMMON_DRUGS (nested dicts; _TRIE_END marks a complete name)
+_TRIE_END = ""
+_COMMON_DRUGS_TRIE: Dict = {}
+for _drug in COMMON_DRUGS:
+    _node = _COMMON_DRUGS_TRIE
+    for _char in _drug:
+        _node = _node.setdefault(_char, {})
+    _node[_TRIE_END] = _drug
+
+
+def _longest_drug_prefix(token: str) -> Optional[str]:
+    """
+    Longest COMMON_DRUGS name that starts the token and is not followed by
+    another letter ("aspirin100mg" -> "aspirin", "insulinoma" -> None).
+    O(len(token)) regardless of how many drugs are listed.
+    """
+    node = _COMMON_DRUGS_TRIE
+    best = None
+    for i, char in enumerate(token):
+        node = node.get(char)
+        if node is None:
+            break
+        drug = node.get(_TRIE_END)
+        if drug and (i + 1 == len(token) or not token[i + 1].isalpha()):
+            best = drug
+    return best
+
+
+#=================================================================================
+# Returns the COMMON_DRUGS that occur as whole words in the (lowercased) text.
+# With pyahocorasick all drug names are matched in one pass over the text and
+# each hit is kept only if the characters around it are not word characters.
+#=================================================================================
+
+if AHOCORASICK_AVAILABLE:
+    _COMMON_DRUGS_AC = ahocorasick.Automaton()
+    for _drug in COMMON_DRUGS:
+        _COMMON_DRUGS_AC.add_word(_drug, _drug)
+    _COMMON_DRUGS_AC.make_automaton()
+
+    def _find_common_drugs(text: str) -> set:
+        found = set()
+        for end, drug in _COMMON_DRUGS_AC.iter(text):
+            start = end - len(drug) + 1
+            if start > 0 and (text[start - 1].isalnum() or text[start - 1] == "_"):
+                continue
+            if end + 1 < len(text) and (text[end + 1].isalnum() or text[end + 1] == "_"):
+                continue
+            found.add(drug)
+        return found
+else:
+    def _find_common_drugs(text: str) -> set:
+        return set(_COMMON_DRUGS_RE.findall(text))
+
+
+#=================================================================================
+# Validates candidates with RxNorm and returns the first valid one in candidate
+# order. Unique candidates go out in windows of RXNAV_MAX_CONCURRENCY parallel
+# lookups; later windows are skipped once a window yields a valid drug.
+#=================================================================================
+
+def _first_valid_candidate(candidates: List[str], kind: str) -> Optional[str]:
+    candidates = list(dict.fromkeys(candidates))
+
+    for start in range(0, len(candidates), RXNAV_MAX_CONCURRENCY):
+        window = candidates[start:start + RXNAV_MAX_CONCURRENCY]
+        for candidate, rx_check in zip(window, batch_lookup_drugs(window)):
+            if rx_check and rx_check.get("canonical_name"):
+                logger.debug("[Drug Detection] Found VALID %s: '%s'", kind, candidate)
+                return candidate
+            logger.debug("[Drug Detection] Rejected invalid %s: '%s'", kind, candidate)
+
+    return None
+
+
+#=================================================================================
+# Pre-validated common drugs: loaded from COMMON_DRUGS_CACHE_PATH at import
+# (no network), completed by prevalidate_common_drugs on a startup thread.
+# Entries also seed the lookup cache, so lookup_drug_rxnorm hits for them.
+#=================================================================================
+
+def _load_prevalidated() -> None:
+    try:
+        with open(COMMON_DRUGS_CACHE_PATH, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return
+
+    for drug in COMMON_DRUGS:
+        result = stored.get(drug)
+        if result and result.get("canonical_name"):
+            _PREVALIDATED[drug] = result
+            _cache_put(drug, result)
+
+
+def prevalidate_common_drugs() -> int:
+    """Validate any COMMON_DRUGS not yet known-good and persist the set."""
+    missing = [drug for drug in COMMON_DRUGS if drug not in _PREVALIDATED]
+    if missing:
+        for drug, result in zip(missing, batch_lookup_drugs(missing)):
+            if result and result.get("canonical_name"):
+                _PREVALIDATED[drug] = result
+
+        try:
+            COMMON_DRUGS_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(COMMON_DRUGS_CACHE_PATH, "w", encoding="utf-8") as f:
+                json.dump(_PREVALIDATED, f, indent=2)
+        except OSError as e:
+            logger.warning("[RxNorm] Could not persist pre-validated drugs: %s", e)
+
+    logger.info("[RxNorm] %d/%d common drugs pre-validated", len(_PREVALIDATED), len(COMMON_DRUGS))
+    return len(_PREVALIDATED)
+
+
+def start_prevalidation() -> threading.Thread:
+    """Run prevalidate_common_drugs on a daemon thread (startup is not blocked)."""
+    def _run():
+        try:
+            prevalidate_common_drugs()
+        except Exception as e:
+            logger.warning("[RxNorm] Common drug pre-validation failed: %s", e)
+
+    thread = threading.Thread(target=_run, name="rxnorm-prevalidate", daemon=True)
+    thread.start()
+    return thread
+
+
+_load_prevalidated()
 
 
 def normalize_for_drug_detection(text: str) -> str:
@@ -144,11 +589,32 @@ def normalize_for_drug_detection(text: str) -> str:
     Normalize text specifically for drug name detection.
     """
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = _WS_RE.sub(' ', text)
     # Convert to lowercase for matching
     return text.lower().strip()
 
 
+# Characters of the search window and the raw slice normalized first to fill it
+DRUG_SEARCH_WINDOW = 3000
+_DRUG_SEARCH_SLICE = 4000
+
+
+def _normalized_head(text: str, limit: int = DRUG_SEARCH_WINDOW) -> str:
+    """
+    normalize_for_drug_detection(text)[:limit] without normalizing the whole
+    document: a leading slice is normalized and only grown (doubled) when
+    whitespace collapse left it shorter than the window.
+    """
+    size = _DRUG_SEARCH_SLICE
+    while size < len(text):
+        head = _WS_RE.sub(' ', text[:size]).lower().lstrip()
+        # Longer than the window: its first `limit` chars match the full normalization
+        if len(head) > limit:
+            return head[:limit]
+        size *= 2
+    return normalize_for_drug_detection(text)[:limit]
+
+
 def detect_drug_from_text(text: str) -> Optional[str]:
     """
     Auto-detect drug name from PDF text.
@@ -163,88 +629,65 @@ def detect_drug_from_text(text: str) -> Optional[str]:
     4. Validate with RxNorm
     5. Return first valid match
     """
-    # Normalize text
-    normalized = normalize_for_drug_detection(text)
-    
-    
-    search_text = normalized[:3000]
+    # Normalize only the head of the text that the search window needs
+    search_text = _normalized_head(text)
     
     # ============================
     #  Look for STRICT explicit labels (FIXED)
     # ============================
-    patterns = [
-        r'suspected\s+drug[\s:]+([a-z][a-z0-9\-]+)',
-        r'drug\s+name[\s:]+([a-z][a-z0-9\-]+)',
-        r'medication[\s:]+([a-z][a-z0-9\-]+)',
-        r'product[\s:]+([a-z][a-z0-9\-]+)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, search_text)
+    label_candidates = []
+    for pattern in _LABEL_PATTERNS:
+        match = pattern.search(search_text)
         if match:
             drug_candidate = match.group(1).strip()
             
-            # CRITICAL: Check against stopwords
+            # Validate it's a real drug with minimum length
+            if len(drug_candidate) <= 3:
+                continue
+            
+            # CRITICAL: Check against stopwords (before any RxNorm call)
             if drug_candidate in INVALID_DRUG_WORDS:
-                print(f"[Drug Detection] Rejected stopword: '{drug_candidate}'")
+                logger.debug("[Drug Detection] Rejected stopword: '%s'", drug_candidate)
                 continue
             
-            # Validate it's a real drug with minimum length
-            if len(drug_candidate) > 3:
-                #  CRITICAL: Validate with RxNorm BEFORE returning
-                rx_check = lookup_drug_rxnorm(drug_candidate)
-                
-                if rx_check and rx_check.get("canonical_name"):
-                    print(f"[Drug Detection] Found VALID drug via pattern: '{drug_candidate}'")
-                    return drug_candidate
-                else:
-                    print(f"[Drug Detection] Rejected invalid drug via pattern: '{drug_candidate}'")
-                    continue
+            label_candidates.append(drug_candidate)
+    
+    #  CRITICAL: Validate with RxNorm BEFORE returning
+    drug = _first_valid_candidate(label_candidates, "drug via pattern")
+    if drug:
+        return drug
     
     # ============================
     #  Look for common drug names (WITH VALIDATION)
     # ============================
-    for drug in COMMON_DRUGS:
-        # Word boundary search to avoid partial matches
-        pattern = r'\b' + re.escape(drug) + r'\b'
-        if re.search(pattern, search_text):
-            #  CRITICAL: Validate with RxNorm even for common drugs
-            rx_check = lookup_drug_rxnorm(drug)
-            
-            if rx_check and rx_check.get("canonical_name"):
-                print(f"[Drug Detection] Found VALID common drug: '{drug}'")
-                return drug
-            else:
-                print(f"[Drug Detection] Rejected invalid common drug: '{drug}'")
-                continue
+    # Word boundary search to avoid partial matches (one pass over the
+    # window; candidates keep COMMON_DRUGS priority order)
+    found = _find_common_drugs(search_text)
+    present = [drug for drug in COMMON_DRUGS if drug in found]
+    # Known-good common drug: no lookup needed
+    if present and present[0] in _PREVALIDATED:
+        logger.debug("[Drug Detection] Found pre-validated common drug: '%s'", present[0])
+        return present[0]
+
+    #  CRITICAL: Validate with RxNorm even for common drugs
+    drug = _first_valid_candidate(present, "common drug")
+    if drug:
+        return drug
     
     # ============================
     #  Look for capitalized words (potential brand names) WITH VALIDATION
     # ============================
     # This is more aggressive - use with caution
     # Looks for capitalized words that might be brand names
-    brand_pattern = r'\b([A-Z][a-z]{3,})\b'
-    matches = re.findall(brand_pattern, text[:3000])  # Use original case
+    # Short and common words are already excluded by the regex
+    brand_candidates = _BRAND_RE.findall(text[:DRUG_SEARCH_WINDOW])  # Use original case
     
-    if matches:
-        # Filter out common words
-        common_words = {'Patient', 'Report', 'Date', 'Event', 'Adverse', 
-                       'Serious', 'Death', 'Hospital', 'Doctor', 'Physician',
-                       'Medical', 'History', 'Outcome', 'Narrative'}
-        
-        for match in matches:
-            if match not in common_words and len(match) > 4:
-                # CRITICAL: Validate with RxNorm
-                rx_check = lookup_drug_rxnorm(match)
-                
-                if rx_check and rx_check.get("canonical_name"):
-                    print(f"[Drug Detection] Found VALID brand name: '{match}'")
-                    return match
-                else:
-                    print(f"[Drug Detection] Rejected invalid brand name: '{match}'")
-                    continue
+    # CRITICAL: Validate with RxNorm (duplicates are validated once)
+    drug = _first_valid_candidate(brand_candidates, "brand name")
+    if drug:
+        return drug
     
-    print("[Drug Detection] No drug name detected in PDF")
+    logger.debug("[Drug Detection] No drug name detected in PDF")
     return None
 
 
@@ -257,12 +700,13 @@ def extract_drug_from_filename(filename: str) -> Optional[str]:
     name = filename.lower().replace('.pdf', '')
     
     # Split by common separators
-    parts = re.split(r'[_\-\s]+', name)
+    parts = _FILENAME_SPLIT_RE.split(name)
     
-    # Check each part against common drugs
+    # Check each part against common drugs (also finds "aspirin" in "aspirin100mg")
     for part in parts:
-        if part in COMMON_DRUGS:
-            print(f"[Drug Detection] Found in filename: '{part}'")
-            return part
+        drug = _longest_drug_prefix(part)
+        if drug:
+            logger.debug("[Drug Detection] Found in filename: '%s'", drug)
+            return drug
     
     return None
\ No newline at end of file
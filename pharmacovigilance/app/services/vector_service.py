@@ -11,10 +11,16 @@ WORKFLOW:
 4. Query → retrieve similar cases via semantic search
 """
 
+import atexit
 import os
 import json
+import logging
+import time
+import hashlib
+import threading
+import queue
+from collections import OrderedDict
 from typing import List, Dict
-from datetime import datetime
 
 # ChromaDB for vector storage
 import chromadb
@@ -23,6 +29,10 @@ from chromadb.config import Settings
 # Sentence Transformers for embeddings
 from sentence_transformers import SentenceTransformer
 
+from app.services._time import iso_utc_now
+
+logger = logging.getLogger(__name__)
+
 # ============================
 # CONFIG
 # ============================
@@ -31,6 +41,29 @@ MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
 CHROMA_PERSIST_DIR = os.getenv("CHROMA_PERSIST_DIR", "./chroma_db")
 COLLECTION_NAME = "adverse_events"
 
+# Mirror of the ESCALATE records, so the default (escalated-only) similarity
+# search is a plain ANN query instead of an over-fetched, post-filtered one
+ESCALATED_COLLECTION_NAME = "adverse_events_escalated"
+
+# Embeddings keyed by a digest of the canonical text: re-indexed events and
+# repeated queries skip the transformer forward pass
+EMBEDDING_CACHE_SIZE = 4096
+
+# Texts per forward pass when encoding a batch
+EMBED_BATCH_SIZE = 32
+
+# Fingerprint (document + metadata) of recently indexed report_ids, so exact
+# replays skip Chroma entirely
+INDEXED_CACHE_SIZE = 8192
+
+# Audit-path indexing runs write-behind on a background thread (set
+# VECTOR_INDEX_ASYNC=0 to index synchronously, e.g. in tests; read per call
+# so .env and test overrides apply whenever they are set). The queue is
+# bounded so a stalled Chroma applies back-pressure instead of growing memory.
+INDEX_QUEUE_SIZE = 10000
+INDEX_BATCH_SIZE = 256
+
+
 # ============================
 # SINGLETONS (LAZY INIT)
 # ============================
@@ -38,6 +71,14 @@ COLLECTION_NAME = "adverse_events"
 _embedding_model = None
 _chroma_client = None
 _collection = None
+_escalated_collection = None
+_embedding_cache: "OrderedDict[bytes, tuple]" = OrderedDict()
+_embedding_lock = threading.Lock()
+_indexed_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_indexed_lock = threading.Lock()
+_index_queue: "queue.Queue[Dict]" = queue.Queue(maxsize=INDEX_QUEUE_SIZE)
+_index_thread = None
+_index_thread_lock = threading.Lock()
 
 
 # ============================
@@ -47,16 +88,16 @@ _collection = None
 def get_embedding_model() -> SentenceTransformer:
     global _embedding_model
     if _embedding_model is None:
-        print(f"[Vector] Loading embedding model: {MODEL_NAME}")
+        logger.info("Loading embedding model: %s", MODEL_NAME)
         _embedding_model = SentenceTransformer(MODEL_NAME)
-        print("[Vector] Embedding model loaded")
+        logger.info("Embedding model loaded")
     return _embedding_model
 
 
 def get_chroma_client():
     global _chroma_client
     if _chroma_client is None:
-        print(f"[Vector] Initializing ChromaDB at: {CHROMA_PERSIST_DIR}")
+        logger.info("Initializing ChromaDB at: %s", CHROMA_PERSIST_DIR)
         _chroma_client = chromadb.PersistentClient(
             path=CHROMA_PERSIST_DIR,
             settings=Settings(
@@ -64,7 +105,7 @@ def get_chroma_client():
                 allow_reset=True
             )
         )
-        print("[Vector] ChromaDB client initialized")
+        logger.info("ChromaDB client initialized")
     return _chroma_client
 
 
@@ -74,16 +115,79 @@ def get_collection():
         client = get_chroma_client()
         try:
             _collection = client.get_collection(name=COLLECTION_NAME)
-            print(f"[Vector] Connected to existing collection: {COLLECTION_NAME}")
+            logger.info("Connected to existing collection: %s", COLLECTION_NAME)
         except Exception:
             _collection = client.create_collection(
                 name=COLLECTION_NAME,
                 metadata={"description": "Pharmacovigilance adverse event reports"}
             )
-            print(f"[Vector] Created new collection: {COLLECTION_NAME}")
+            logger.info("Created new collection: %s", COLLECTION_NAME)
     return _collection
 
 
+def get_escalated_collection():
+    global _escalated_collection
+    if _escalated_collection is None:
+        client = get_chroma_client()
+        try:
+            _escalated_collection = client.get_collection(name=ESCALATED_COLLECTION_NAME)
+            logger.info("Connected to existing collection: %s", ESCALATED_COLLECTION_NAME)
+        except Exception:
+            collection = client.create_collection(
+                name=ESCALATED_COLLECTION_NAME,
+                metadata={"description": "Escalated pharmacovigilance adverse event reports"}
+            )
+            _seed_escalated_collection(collection)
+            _escalated_collection = collection
+            logger.info("Created new collection: %s", ESCALATED_COLLECTION_NAME)
+    return _escalated_collection
+
+
+def _seed_escalated_collection(collection) -> None:
+    """Copies ESCALATE records already in the main collection (one-time migration)."""
+    existing = get_collection().get(
+        where={"escalation_decision": "ESCALATE"},
+        include=["embeddings", "documents", "metadatas"]
+    )
+    if existing["ids"]:
+        collection.upsert(
+            ids=existing["ids"],
+            embeddings=existing["embeddings"],
+            documents=existing["documents"],
+            metadatas=existing["metadatas"]
+        )
+        logger.info("Seeded %s with %d records", ESCALATED_COLLECTION_NAME, len(existing["ids"]))
+
+
+# ============================
+# SYMPTOM METADATA
+# ============================
+
+# Symptoms are stored as one SYMPTOM_SEPARATOR-joined string (Chroma metadata
+# must be scalar), so reading them back is a split instead of a JSON parse.
+# Records indexed before this format hold a JSON list ("[...]"); those are
+# still decoded with json.loads and are rewritten whenever they're re-indexed
+# (or all at once by re-running the backfill).
+SYMPTOM_SEPARATOR = "|"
+
+
+def _encode_symptoms(symptoms: List[str]) -> str:
+    return SYMPTOM_SEPARATOR.join(
+        s.replace(SYMPTOM_SEPARATOR, " ") for s in (symptoms or [])
+    )
+
+
+def _decode_symptoms(stored: str) -> List[str]:
+    if not stored or stored == "[]":
+        return []
+    if stored[0] == "[":
+        try:
+            return json.loads(stored)
+        except ValueError:
+            pass
+    return stored.split(SYMPTOM_SEPARATOR)
+
+
 # ============================
 # EMBEDDING TEXT
 # ============================
@@ -104,10 +208,65 @@ Risk: {risk_level}
 Decision: {escalation_decision}"""
 
 
+#===========================================================================
+# Query-time text: the stored layout without the Risk/Decision lines, which
+# carry no similarity signal for a query (they were UNKNOWN/QUERY fillers).
+# The same (drug, event, symptoms) therefore always maps to one cached vector.
+#===========================================================================
+
+def build_query_embedding_text(
+    drugname: str,
+    adverse_event: str,
+    symptoms: List[str] = None
+) -> str:
+    symptoms_text = ", ".join(symptoms) if symptoms else "None extracted"
+
+    return f"""Drug: {drugname}
+Event: {adverse_event}
+Symptoms: {symptoms_text}"""
+
+
+def _text_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+#===========================================================================
+# Embeds texts through the cache: hits are served from memory and all
+# misses (deduplicated) go through a single encode() call.
+#===========================================================================
+
+def embed_texts(texts: List[str]) -> List[List[float]]:
+    keys = [_text_key(text) for text in texts]
+    vectors = {}
+
+    with _embedding_lock:
+        for key in keys:
+            cached = _embedding_cache.get(key)
+            if cached is not None:
+                _embedding_cache.move_to_end(key)
+                vectors[key] = cached
+
+    missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+    if missing:
+        encoded = get_embedding_model().encode(
+            list(missing.values()),
+            batch_size=EMBED_BATCH_SIZE,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        with _embedding_lock:
+            for key, embedding in zip(missing, encoded):
+                vectors[key] = _embedding_cache[key] = tuple(embedding.tolist())
+                _embedding_cache.move_to_end(key)
+            while len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+                _embedding_cache.popitem(last=False)
+
+    return [list(vectors[key]) for key in keys]
+
+
 def create_embedding(text: str) -> List[float]:
-    model = get_embedding_model()
-    embedding = model.encode(text, convert_to_numpy=True)
-    return embedding.tolist()
+    return embed_texts([text])[0]
 
 
 # ============================
@@ -139,34 +298,218 @@ def index_audit_event(
             symptoms=symptoms or []
         )
 
-        embedding = create_embedding(embedding_text)
-
         metadata = {
             "report_id": report_id,
             "drugname": drugname,
             "risk_level": risk_level,
             "escalation_decision": escalation_decision,
             "ml_probability": ml_probability,
-            "timestamp": timestamp or datetime.utcnow().isoformat(),
-            "symptoms": json.dumps(symptoms or [])
+            "timestamp": timestamp or iso_utc_now(),
+            "symptoms": _encode_symptoms(symptoms)
         }
 
-        collection = get_collection()
+        _write_records([report_id], [embedding_text], [metadata])
+
+        logger.debug("Indexed event: %s (%s)", report_id, drugname)
+        return True
+
+    except Exception as e:
+        logger.error("Failed to index %s: %s", report_id, e)
+        return False
+
+
+#===========================================================================
+# Index many audit events at once: one batched encode() call and one
+# upsert() instead of a model call and a Chroma write per event.
+# Each event is a dict with the same keys as index_audit_event's arguments.
+#===========================================================================
+
+def index_audit_events(events: List[Dict]) -> int:
+    """
+    Index or update a batch of audit events in the vector database.
+
+    MUST be called AFTER SQL commit.
+    Returns the number of events indexed.
+    """
+    if not events:
+        return 0
+
+    try:
+        ids, documents, metadatas = [], [], []
+
+        for event in events:
+            symptoms = event.get("symptoms") or []
+
+            documents.append(build_canonical_embedding_text(
+                drugname=event["drugname"],
+                adverse_event=event["adverse_event"],
+                risk_level=event["risk_level"],
+                escalation_decision=event["escalation_decision"],
+                symptoms=symptoms
+            ))
+            ids.append(event["report_id"])
+            metadatas.append({
+                "report_id": event["report_id"],
+                "drugname": event["drugname"],
+                "risk_level": event["risk_level"],
+                "escalation_decision": event["escalation_decision"],
+                "ml_probability": event.get("ml_probability", 0.0),
+                "timestamp": event.get("timestamp") or iso_utc_now(),
+                "symptoms": _encode_symptoms(symptoms)
+            })
+
+        _write_records(ids, documents, metadatas)
+
+        logger.debug("Indexed %d events", len(ids))
+        return len(ids)
+
+    except Exception as e:
+        logger.error("Failed to index batch of %d events: %s", len(events), e)
+        return 0
+
+
+#===========================================================================
+# Writes records to the collection, doing only the work a replay needs:
+#   - same document and metadata as last indexed here -> nothing
+#   - document already stored in Chroma -> metadata-only update (no encode)
+#   - otherwise -> encode and UPSERT
+# ESCALATE records are mirrored into the escalated collection; records whose
+# decision changed away from ESCALATE are removed from it.
+#===========================================================================
+
+def _record_fingerprint(document: str, metadata: Dict) -> bytes:
+    return _text_key(document + "\0" + json.dumps(metadata, sort_keys=True))
+
+
+def _stored_documents(collection, ids: List[str]) -> Dict[str, str]:
+    try:
+        existing = collection.get(ids=ids, include=["documents"])
+        return dict(zip(existing["ids"], existing["documents"] or []))
+    except Exception:
+        # Cold/empty collection: treat everything as new
+        return {}
+
+
+def _write_records(ids: List[str], documents: List[str], metadatas: List[Dict]) -> None:
+    fingerprints = [_record_fingerprint(d, m) for d, m in zip(documents, metadatas)]
+
+    with _indexed_lock:
+        pending = [
+            i for i, report_id in enumerate(ids)
+            if _indexed_cache.get(report_id) != fingerprints[i]
+        ]
+    if not pending:
+        return
+
+    collection = get_collection()
+    stored = _stored_documents(collection, [ids[i] for i in pending])
+
+    unchanged = [i for i in pending if stored.get(ids[i]) == documents[i]]
+    changed = [i for i in pending if stored.get(ids[i]) != documents[i]]
+
+    escalated_collection = get_escalated_collection()
+
+    def _escalated(indices):
+        return [i for i in indices if metadatas[i]["escalation_decision"] == "ESCALATE"]
+
+    if unchanged:
+        collection.update(
+            ids=[ids[i] for i in unchanged],
+            metadatas=[metadatas[i] for i in unchanged]
+        )
+        # Same document, so same decision: mirror the metadata refresh
+        mirrored = _escalated(unchanged)
+        if mirrored:
+            escalated_collection.update(
+                ids=[ids[i] for i in mirrored],
+                metadatas=[metadatas[i] for i in mirrored]
+            )
+
+    if changed:
+        embeddings = dict(zip(changed, embed_texts([documents[i] for i in changed])))
 
         # CRITICAL: use UPSERT (not add)
         collection.upsert(
-            ids=[report_id],
-            embeddings=[embedding],
-            documents=[embedding_text],
-            metadatas=[metadata]
+            ids=[ids[i] for i in changed],
+            embeddings=[embeddings[i] for i in changed],
+            documents=[documents[i] for i in changed],
+            metadatas=[metadatas[i] for i in changed]
         )
 
-        print(f"[Vector] Indexed event: {report_id} ({drugname})")
-        return True
+        mirrored = _escalated(changed)
+        if mirrored:
+            escalated_collection.upsert(
+                ids=[ids[i] for i in mirrored],
+                embeddings=[embeddings[i] for i in mirrored],
+                documents=[documents[i] for i in mirrored],
+                metadatas=[metadatas[i] for i in mirrored]
+            )
 
-    except Exception as e:
-        print(f"[Vector][ERROR] Failed to index {report_id}: {e}")
-        return False
+        # Previously stored but no longer ESCALATE
+        mirrored_set = set(mirrored)
+        demoted = [ids[i] for i in changed if i not in mirrored_set and ids[i] in stored]
+        if demoted:
+            escalated_collection.delete(ids=demoted)
+
+    with _indexed_lock:
+        for i in pending:
+            _indexed_cache[ids[i]] = fingerprints[i]
+            _indexed_cache.move_to_end(ids[i])
+        while len(_indexed_cache) > INDEXED_CACHE_SIZE:
+            _indexed_cache.popitem(last=False)
+
+
+#===========================================================================
+# Write-behind indexing: events queued from the audit path are drained by
+# one background thread, and whatever has piled up goes through
+# index_audit_events as a single batch (one encode, one upsert).
+#===========================================================================
+
+def _index_loop() -> None:
+    while True:
+        # Blocks until work arrives, so a lone event is indexed immediately
+        batch = [_index_queue.get()]
+        while len(batch) < INDEX_BATCH_SIZE:
+            try:
+                batch.append(_index_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        index_audit_events(batch)
+
+        for _ in batch:
+            _index_queue.task_done()
+
+
+def enqueue_index_events(events: List[Dict]) -> None:
+    """
+    Queue audit events (index_audit_events dicts) for background indexing.
+    Indexes them synchronously when VECTOR_INDEX_ASYNC is off.
+    """
+    global _index_thread
+    if os.getenv("VECTOR_INDEX_ASYNC", "1") == "0":
+        index_audit_events(events)
+        return
+
+    if _index_thread is None:
+        with _index_thread_lock:
+            if _index_thread is None:
+                _index_thread = threading.Thread(
+                    target=_index_loop, name="vector-indexer", daemon=True
+                )
+                _index_thread.start()
+
+    for event in events:
+        _index_queue.put(event)
+
+
+def flush_index() -> None:
+    """Block until every queued event has been indexed."""
+    if _index_thread is not None:
+        _index_queue.join()
+
+
+atexit.register(flush_index)
 
 
 # ============================
@@ -185,76 +528,134 @@ def search_similar_events(
     """
     Semantic similarity search using vector DB.
     REPLACES SQL keyword-based similarity.
+
+    Results are already in the similar-event response shape
+    (SimilarEventResult fields), so callers can use them as-is.
+    query_risk_level is accepted for compatibility but no longer embedded
+    (see build_query_embedding_text).
     """
     try:
-        query_text = build_canonical_embedding_text(
+        query_text = build_query_embedding_text(
             drugname=query_drugname,
             adverse_event=query_event,
-            risk_level=query_risk_level or "UNKNOWN",
-            escalation_decision="QUERY",
             symptoms=query_symptoms
         )
 
         query_embedding = create_embedding(query_text)
 
-        where_filter = {}
-        if escalated_only:
-            where_filter["escalation_decision"] = "ESCALATE"
+        results = _query_similar([query_embedding], top_k, escalated_only)
 
-        collection = get_collection()
-
-        results = collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k + 10,  # get extra for filtering
-            where=where_filter if where_filter else None
+        similar_events = _format_similar_events(
+            results, 0, query_symptoms, current_report_id, top_k
         )
 
-        similar_events = []
+        logger.debug("Found %d similar events for %s", len(similar_events), query_drugname)
+        return similar_events
+
+    except Exception as e:
+        logger.error("Vector search failed: %s", e)
+        return []
+
+
+#===========================================================================
+# Several similarity searches at once: one batched encode() for all query
+# texts and one Chroma query() with every query vector. Each query is a dict
+# with drugname, adverse_event, symptoms and an optional report_id.
+# Returns one result list per query, in order.
+#===========================================================================
+
+def search_similar_events_batch(
+    queries: List[Dict],
+    top_k: int = 5,
+    escalated_only: bool = True
+) -> List[List[Dict]]:
+    if not queries:
+        return []
+
+    try:
+        query_texts = [
+            build_query_embedding_text(
+                drugname=query["drugname"],
+                adverse_event=query["adverse_event"],
+                symptoms=query.get("symptoms")
+            )
+            for query in queries
+        ]
+
+        results = _query_similar(embed_texts(query_texts), top_k, escalated_only)
+
+        batch = [
+            _format_similar_events(
+                results, i, query.get("symptoms"), query.get("report_id"), top_k
+            )
+            for i, query in enumerate(queries)
+        ]
+
+        logger.debug("Ran %d similarity searches", len(queries))
+        return batch
 
-        if results and results.get("ids") and results["ids"][0]:
-            for i, report_id in enumerate(results["ids"][0]):
-                if current_report_id and report_id == current_report_id:
-                    continue
+    except Exception as e:
+        logger.error("Batch vector search failed: %s", e)
+        return [[] for _ in queries]
 
-                metadata = results["metadatas"][0][i]
-                distance = results["distances"][0][i]
-                document = results["documents"][0][i]
 
-                try:
-                    symptoms = json.loads(metadata.get("symptoms", "[]"))
-                except Exception:
-                    symptoms = []
+def _query_similar(query_embeddings: List[List[float]], top_k: int, escalated_only: bool) -> Dict:
+    """
+    Escalated-only searches go to the escalated collection, so no where
+    filter is needed; one extra hit covers excluding the current report.
+    """
+    collection = get_escalated_collection() if escalated_only else get_collection()
+    return collection.query(
+        query_embeddings=query_embeddings,
+        n_results=top_k + 1
+    )
+
+
+def _format_similar_events(
+    results: Dict,
+    index: int,
+    query_symptoms: List[str],
+    current_report_id: str,
+    top_k: int
+) -> List[Dict]:
+    """Shapes the index-th query's hits as similar-event results."""
+    similar_events = []
+    query_symptom_set = {q.lower() for q in (query_symptoms or [])}
 
+    if results and results.get("ids") and results["ids"][index]:
+        for i, report_id in enumerate(results["ids"][index]):
+            if current_report_id and report_id == current_report_id:
+                continue
+
+            metadata = results["metadatas"][index][i]
+            document = results["documents"][index][i]
+
+            # Stored symptoms are only decoded when there is something to match
+            matched_symptoms = []
+            if query_symptom_set:
                 matched_symptoms = [
-                    s for s in symptoms
-                    if s.lower() in [q.lower() for q in (query_symptoms or [])]
+                    s for s in _decode_symptoms(metadata.get("symptoms", ""))
+                    if s.lower() in query_symptom_set
                 ]
 
-                similar_events.append({
-                    "report_id": report_id,
-                    "drugname": metadata.get("drugname", ""),
-                    "risk_level": metadata.get("risk_level", "UNKNOWN"),
-                    "timestamp": metadata.get("timestamp", ""),
-                    "ml_probability": metadata.get("ml_probability", 0.0),
-                    "all_symptoms": symptoms,
-                    "matched_symptoms": matched_symptoms,
+            similar_events.append({
+                "report_id": report_id,
+                "drugname": metadata.get("drugname", ""),
 
-                    # Honest metrics
-                    "vector_distance": distance,
+                # Canonical embedding text, for UI / explainability
+                "adverse_event": document or "",
 
-                    # For UI / explainability
-                    "canonical_text": document
-                })
+                "timestamp": metadata.get("timestamp", ""),
+                "risk_level": metadata.get("risk_level", "UNKNOWN"),
+                "ml_probability": metadata.get("ml_probability", 0.0),
+                "final_score": None,  # not stored in the vector index
+                "matched_symptoms": matched_symptoms
+            })
 
-                if len(similar_events) >= top_k:
-                    break
-
-        print(f"[Vector] Found {len(similar_events)} similar events for {query_drugname}")
-        return similar_events
+            if len(similar_events) >= top_k:
+                break
 
-    except Exception as e:
-        print(f"[Vector][ERROR] Vector search failed: {e}")
-        return []
+    return similar_events
 
 
 # ============================
@@ -266,6 +667,7 @@ def get_collection_stats() -> Dict:
         collection = get_collection()
         return {
             "total_indexed": collection.count(),
+            "escalated_indexed": get_escalated_collection().count(),
             "collection_name": COLLECTION_NAME,
             "model": MODEL_NAME,
             "embedding_dimensions": 384
@@ -284,15 +686,23 @@ def reset_collection() -> bool:
     try:
         client = get_chroma_client()
         client.delete_collection(name=COLLECTION_NAME)
+        try:
+            client.delete_collection(name=ESCALATED_COLLECTION_NAME)
+        except Exception:
+            pass
 
-        global _collection
+        global _collection, _escalated_collection
         _collection = None
+        _escalated_collection = None
+        with _indexed_lock:
+            _indexed_cache.clear()
 
         get_collection()
+        get_escalated_collection()
 
-        print(f"[Vector] Collection {COLLECTION_NAME} reset")
+        logger.info("Collection %s reset", COLLECTION_NAME)
         return True
 
     except Exception as e:
-        print(f"[Vector][ERROR] Failed to reset collection: {e}")
+        logger.error("Failed to reset collection: %s", e)
         return False
@@ -6,7 +6,7 @@ import os
 import sys
 from pathlib import Path
 from datetime import datetime
-import json
+import orjson
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -17,20 +17,43 @@ sys.path.insert(0, str(PROJECT_ROOT))
 import pandas as pd
 import numpy as np
 import joblib
-from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
+from sklearn import config_context
+from sklearn.base import clone
+from sklearn.utils.parallel import Parallel, delayed
+from sklearn.model_selection import StratifiedKFold
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import normalize
 from sklearn.metrics import (
     classification_report, confusion_matrix, 
-    recall_score, precision_score, f1_score,
+    recall_score,
     roc_auc_score, roc_curve, precision_recall_curve
 )
+# PyArrow CSV/Parquet reader (conditional import; much faster than the C engine)
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# lz4 for fast artifact compression (conditional import; zlib otherwise)
+try:
+    import lz4  # noqa: F401
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-from app.services.preprocessor import combine_features
+from app.services.preprocessor import (
+    DRUG_FEATURE_WEIGHT,
+    DRUG_TOKEN_PREFIX,
+    combine_features_series,
+    vectorizer_tokens
+)
 
 # ============================================================================
 # LANGFUSE INITIALIZATION
@@ -54,6 +77,10 @@ except Exception as e:
 # ============================================================================
 
 DATA_PATH = PROJECT_ROOT / "data" / "processed" / "faers_q3_ps_drug_adverse_events_serious_labeled_v2.csv"
+# Columnar copy of DATA_PATH, written on the first PyArrow load and reused
+# while it is newer than the CSV
+PARQUET_PATH = DATA_PATH.with_suffix(".parquet")
+DATA_COLUMNS = ['drugname', 'adverse_event', 'seriousness']
 MODEL_DIR = PROJECT_ROOT / "ml"
 EXPERIMENT_DIR = MODEL_DIR / "experiments"
 PLOTS_DIR = MODEL_DIR / "plots"
@@ -65,6 +92,16 @@ VAL_SIZE = 0.1
 RANDOM_STATE = 42
 N_JOBS = -1
 
+# Training labels are int8 (1 = Serious); names are for printing/plots only
+SERIOUS_LABEL = 1
+CLASS_NAMES = ['Non-Serious', 'Serious']
+
+# Compression for per-experiment model/vectorizer copies
+ARTIFACT_COMPRESS = ('lz4', 3) if LZ4_AVAILABLE else ('zlib', 3)
+
+# Per-experiment plot resolution (diagnostic plots; still readable at 150)
+PLOT_DPI = 150
+
 # Target metrics 
 TARGET_RECALL = 0.85  # CRITICAL for patient safety
 MIN_PRECISION = 0.70  # Avoid overwhelming false positives
@@ -120,8 +157,8 @@ MODEL_CONFIGS = [
         },
         'classifier': {
             'class_weight': {
-                'Serious': 0.7,
-                'Non-Serious': 0.3
+                1: 0.7,  # Serious
+                0: 0.3   # Non-Serious
             },
             'max_iter': 1000,
             'solver': 'saga',
@@ -133,11 +170,32 @@ MODEL_CONFIGS = [
     }
 ]
 
+# Configs are independent: train them concurrently (threads; the solvers
+# release the GIL). Set TRAIN_CONFIG_JOBS=1 for serial, readable logs.
+CONFIG_JOBS = int(os.getenv("TRAIN_CONFIG_JOBS", min(len(MODEL_CONFIGS), os.cpu_count() or 1)))
+
+# The preferred config is trained first; the others only run if it misses
+# the recall target (they could not be selected otherwise). Pass
+# --full-sweep to train every config regardless.
+FULL_SWEEP = '--full-sweep' in sys.argv
+
 
 # ============================================================================
 # EXPERIMENT TRACKING
 # ============================================================================
 
+def write_json(path: Path, data: dict, indent: bool = False):
+    """
+    Write JSON with orjson: numpy scalars/arrays (thresholds, metrics) are
+    serialized natively, and int dict keys (class_weight) are allowed.
+    """
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(data, option=option))
+
+
 class ExperimentTracker:
     """Track and save experiment results."""
     
@@ -169,8 +227,8 @@ class ExperimentTracker:
         }
         
         results_path = self.experiment_path / "results.json"
-        with open(results_path, 'w') as f:
-            json.dump(results, f, indent=2)
+        # Compact JSON: experiment files are read by tooling, not by hand
+        write_json(results_path, results)
         
         print(f"    Saved: {self.experiment_path.name}")
 
@@ -200,38 +258,117 @@ def load_data(sample_size: int = None) -> pd.DataFrame:
         'seriousness': 'category'
     }
     
+    if PYARROW_AVAILABLE:
+        df = _read_columnar(dtypes)
+        print(f"   Loaded: {len(df):,} rows")
+        if not sample_size:
+            return df
+        
+        # Whole table is in memory (category columns): split by class directly
+        print(f"\n   Total rows in dataset: {len(df):,}")
+        return _stratified_sample(
+            df[df['seriousness'] == 'Serious'],
+            df[df['seriousness'] == 'Non-Serious'],
+            len(df),
+            sample_size
+        )
+    
     if not sample_size:
         print(f"   Loading full dataset...")
-        df = pd.read_csv(DATA_PATH, dtype=dtypes)
+        df = pd.read_csv(DATA_PATH, dtype=dtypes, usecols=DATA_COLUMNS)
         print(f"   Loaded: {len(df):,} rows")
         return df
     
-    # Read entire dataset in chunks and separate by class
+    return _stream_stratified_sample(dtypes, sample_size)
+
+
+def _stream_stratified_sample(dtypes: dict, sample_size: int) -> pd.DataFrame:
+    """
+    Two-pass stratified sample with memory bounded by the sample, not the
+    dataset: pass 1 counts each class (seriousness column only), then the
+    row positions to keep are drawn up front (uniform, without replacement)
+    and pass 2 keeps only those rows from each chunk.
+    """
     print(f"   Reading dataset in chunks (stratified sampling)...")
-    chunks = pd.read_csv(DATA_PATH, dtype=dtypes, chunksize=200_000)
     
-    serious_chunks = []
-    non_serious_chunks = []
+    # Pass 1: class counts
+    class_totals = {'Serious': 0, 'Non-Serious': 0}
     total_rows = 0
-    
-    for i, chunk in enumerate(chunks, 1):
-        serious_chunks.append(chunk[chunk['seriousness'] == 'Serious'])
-        non_serious_chunks.append(chunk[chunk['seriousness'] == 'Non-Serious'])
+    for i, chunk in enumerate(pd.read_csv(DATA_PATH, usecols=['seriousness'], chunksize=1_000_000), 1):
+        counts = chunk['seriousness'].value_counts()
+        for label in class_totals:
+            class_totals[label] += int(counts.get(label, 0))
         total_rows += len(chunk)
-        print(f"      Chunk {i}: {len(chunk):,} rows (total: {total_rows:,})", end='\r')
+        print(f"      Counting chunk {i} (total: {total_rows:,})", end='\r')
     
     print(f"\n   Total rows in dataset: {total_rows:,}")
     
-    # Combine all chunks by class
-    df_serious = pd.concat(serious_chunks, ignore_index=True)
-    df_non_serious = pd.concat(non_serious_chunks, ignore_index=True)
+    n_serious, n_non_serious = _sample_sizes(
+        class_totals['Serious'], class_totals['Non-Serious'], total_rows, sample_size
+    )
+    
+    # Sorted positions (within each class) of the rows to keep
+    rng = np.random.default_rng(RANDOM_STATE)
+    picks = {
+        'Serious': np.sort(rng.choice(class_totals['Serious'], n_serious, replace=False)),
+        'Non-Serious': np.sort(rng.choice(class_totals['Non-Serious'], n_non_serious, replace=False))
+    }
+    
+    # Pass 2: keep only the picked rows
+    offsets = {label: 0 for label in picks}
+    kept = []
+    chunks = pd.read_csv(DATA_PATH, dtype=dtypes, usecols=DATA_COLUMNS, chunksize=200_000)
+    for i, chunk in enumerate(chunks, 1):
+        for label, positions in picks.items():
+            rows = chunk[chunk['seriousness'] == label]
+            start = offsets[label]
+            lo, hi = np.searchsorted(positions, [start, start + len(rows)])
+            if hi > lo:
+                kept.append(rows.iloc[positions[lo:hi] - start])
+            offsets[label] += len(rows)
+        print(f"      Sampling chunk {i}", end='\r')
+    print()
+    
+    # Combine and shuffle
+    df = pd.concat(kept, ignore_index=True)
+    df = df.sample(frac=1, random_state=RANDOM_STATE).reset_index(drop=True)
     
+    print(f"   ✅ Sampled: {len(df):,} rows (representative across entire dataset)")
+    
+    return df
+
+
+def _read_columnar(dtypes: dict) -> pd.DataFrame:
+    """
+    Read the dataset through PyArrow: from the Parquet copy when it is
+    current, otherwise from the CSV (Arrow engine), writing the Parquet
+    copy for next time.
+    """
+    if PARQUET_PATH.exists() and PARQUET_PATH.stat().st_mtime >= DATA_PATH.stat().st_mtime:
+        print(f"   Reading columnar copy {PARQUET_PATH.name}...")
+        return pd.read_parquet(PARQUET_PATH, columns=DATA_COLUMNS)
+    
+    print(f"   Parsing CSV with the PyArrow engine...")
+    df = pd.read_csv(DATA_PATH, dtype=dtypes, usecols=DATA_COLUMNS, engine="pyarrow")
+    
+    try:
+        df.to_parquet(PARQUET_PATH, index=False)
+        print(f"   Wrote columnar copy: {PARQUET_PATH.name}")
+    except Exception as e:
+        print(f"   ⚠️  Could not write {PARQUET_PATH.name}: {e}")
+    
+    return df
+
+
+def _sample_sizes(serious_total: int, non_serious_total: int,
+                  total_rows: int, sample_size: int) -> tuple:
+    """Per-class sample sizes that keep the dataset's class ratio."""
     print(f"   Class counts:")
-    print(f"     • Serious: {len(df_serious):,} ({100*len(df_serious)/total_rows:.1f}%)")
-    print(f"     • Non-Serious: {len(df_non_serious):,} ({100*len(df_non_serious)/total_rows:.1f}%)")
+    print(f"     • Serious: {serious_total:,} ({100*serious_total/total_rows:.1f}%)")
+    print(f"     • Non-Serious: {non_serious_total:,} ({100*non_serious_total/total_rows:.1f}%)")
     
     # Calculate stratified sample sizes
-    serious_ratio = len(df_serious) / total_rows
+    serious_ratio = serious_total / total_rows
     n_serious = int(sample_size * serious_ratio)
     n_non_serious = sample_size - n_serious
     
@@ -239,6 +376,16 @@ def load_data(sample_size: int = None) -> pd.DataFrame:
     print(f"     • Serious: {n_serious:,}")
     print(f"     • Non-Serious: {n_non_serious:,}")
     
+    return n_serious, n_non_serious
+
+
+def _stratified_sample(df_serious: pd.DataFrame, df_non_serious: pd.DataFrame,
+                       total_rows: int, sample_size: int) -> pd.DataFrame:
+    """Sample sample_size rows keeping the dataset's class ratio, then shuffle."""
+    n_serious, n_non_serious = _sample_sizes(
+        len(df_serious), len(df_non_serious), total_rows, sample_size
+    )
+    
     # Random sampling from each class (truly representative)
     df_serious_sample = df_serious.sample(n=n_serious, random_state=RANDOM_STATE)
     df_non_serious_sample = df_non_serious.sample(n=n_non_serious, random_state=RANDOM_STATE)
@@ -265,12 +412,9 @@ def prepare_features(df: pd.DataFrame) -> tuple:
     df['adverse_event'] = df['adverse_event'].fillna('UNKNOWN')
     
     # Combine drug name and adverse event
-    df['text'] = df.apply(
-        lambda row: combine_features(
-            str(row['drugname']),
-            str(row['adverse_event'])
-        ),
-        axis=1
+    df['text'] = combine_features_series(
+        df['drugname'].astype(str),
+        df['adverse_event'].astype(str)
     )
     
     # Remove very short texts
@@ -289,6 +433,25 @@ def prepare_features(df: pd.DataFrame) -> tuple:
     return X, y
 
 
+def stratified_three_way_split(y: np.ndarray, val_size: float, test_size: float) -> tuple:
+    """
+    Stratified train/val/test row indices in one pass: each class's indices
+    are shuffled once and cut at the test and validation sizes.
+    """
+    rng = np.random.default_rng(RANDOM_STATE)
+    splits = ([], [], [])
+    for label in np.unique(y):
+        idx = rng.permutation(np.flatnonzero(y == label))
+        n_test = int(round(len(idx) * test_size))
+        n_val = int(round(len(idx) * val_size))
+        splits[0].append(idx[n_test + n_val:])
+        splits[1].append(idx[n_test:n_test + n_val])
+        splits[2].append(idx[:n_test])
+    
+    # Interleave the classes again within each split
+    return tuple(rng.permutation(np.concatenate(parts)) for parts in splits)
+
+
 # ============================================================================
 # VISUALIZATION
 # ============================================================================
@@ -305,7 +468,8 @@ def plot_confusion_matrix(cm, classes, experiment_path, title='Confusion Matrix'
     plt.tight_layout()
     
     plot_path = experiment_path / f"{title.lower().replace(' ', '_')}.png"
-    plt.savefig(plot_path, dpi=300, bbox_inches='tight')
+    # Layout is already fixed by tight_layout(): no second bbox pass on save
+    plt.savefig(plot_path, dpi=PLOT_DPI)
     plt.close()
 
 
@@ -337,7 +501,8 @@ def plot_roc_curve(y_true, y_prob, experiment_path):
     plt.tight_layout()
     
     plot_path = experiment_path / "roc_curve.png"
-    plt.savefig(plot_path, dpi=300, bbox_inches='tight')
+    # Layout is already fixed by tight_layout(): no second bbox pass on save
+    plt.savefig(plot_path, dpi=PLOT_DPI)
     plt.close()
     
     return auc
@@ -359,7 +524,8 @@ def plot_precision_recall_curve(y_true, y_prob, experiment_path, target_recall=0
     plt.tight_layout()
     
     plot_path = experiment_path / "precision_recall_curve.png"
-    plt.savefig(plot_path, dpi=300, bbox_inches='tight')
+    # Layout is already fixed by tight_layout(): no second bbox pass on save
+    plt.savefig(plot_path, dpi=PLOT_DPI)
     plt.close()
 
 
@@ -379,26 +545,28 @@ def find_optimal_threshold(y_true, y_prob, target_recall=0.85):
     """
     precision, recall, thresholds = precision_recall_curve(y_true, y_prob)
     
-    # Find thresholds meeting target recall
-    valid_indices = recall >= target_recall
+    # recall is non-increasing along the curve, so the thresholds meeting the
+    # target form a prefix: one binary search instead of boolean masks
+    n_valid = int(np.searchsorted(-recall, -target_recall, side='right'))
     
-    if not valid_indices.any():
+    if n_valid == 0:
         print(f"   ⚠️  Cannot achieve target recall of {target_recall}")
         print(f"   Using threshold that maximizes recall...")
-        best_idx = np.argmax(recall)
-        return thresholds[best_idx] if best_idx < len(thresholds) else 0.5
+        return thresholds[0] if len(thresholds) else 0.5
     
     # Among valid thresholds, find best precision
-    valid_precision = precision[valid_indices]
-    valid_recall = recall[valid_indices]
-    valid_thresholds = thresholds[valid_indices[:-1]]
+    # (the final curve point has no threshold)
+    n_valid = min(n_valid, len(thresholds))
+    valid_precision = precision[:n_valid]
+    valid_recall = recall[:n_valid]
+    valid_thresholds = thresholds[:n_valid]
     
     if len(valid_thresholds) == 0:
         return 0.5
     
     # Choose threshold with best F1 among valid options
-    valid_f1 = 2 * (valid_precision[:-1] * valid_recall[:-1]) / \
-               (valid_precision[:-1] + valid_recall[:-1] + 1e-10)
+    valid_f1 = 2 * (valid_precision * valid_recall) / \
+               (valid_precision + valid_recall + 1e-10)
     best_idx = np.argmax(valid_f1)
     
     optimal_threshold = valid_thresholds[best_idx]
@@ -414,8 +582,142 @@ def find_optimal_threshold(y_true, y_prob, target_recall=0.85):
 # MODEL TRAINING & EVALUATION 
 # ============================================================================
 
+def weight_drug_features(vectorizer: TfidfVectorizer) -> list:
+    """
+    Scale the IDF of drug-name terms (every token carries DRUG_TOKEN_PREFIX)
+    by DRUG_FEATURE_WEIGHT. The weight is stored in the fitted vectorizer, so
+    inference picks it up without any extra step. Returns the weighted columns.
+    """
+    idf = vectorizer.idf_.copy()
+    weighted = [
+        index for term, index in vectorizer.vocabulary_.items()
+        if all(token.startswith(DRUG_TOKEN_PREFIX) for token in term.split())
+    ]
+    idf[weighted] *= DRUG_FEATURE_WEIGHT
+    vectorizer.idf_ = idf
+    return weighted
+
+
+def _reweight_columns(X, columns: list, weight: float, norm):
+    """
+    Apply an IDF change to a matrix produced before it: scale the given
+    columns in place, then redo the row normalization. Rows are normalized
+    after the IDF product, so this equals transforming with the new IDF.
+    """
+    scale = np.ones(X.shape[1], dtype=X.dtype)
+    scale[columns] = weight
+    X.data *= scale[X.indices]
+    return normalize(X, norm=norm, copy=False) if norm else X
+
+
+def pretokenize(*splits) -> tuple:
+    """
+    Tokenize every split once, up front, so no config re-runs the regex
+    tokenizer. Repeated documents share a single token list.
+    """
+    tokens = {}
+    for docs in splits:
+        for doc in docs:
+            if doc not in tokens:
+                tokens[doc] = vectorizer_tokens(doc)
+    return tuple([tokens[doc] for doc in docs] for docs in splits)
+
+
+def cast_artifacts_float32(model, vectorizer: TfidfVectorizer):
+    """
+    Store coef_, intercept_ and idf_ as float32, so the service memory-maps
+    them as saved instead of copying a float32 cast onto every worker heap.
+    """
+    vectorizer.idf_ = vectorizer.idf_.astype(np.float32)
+    model.coef_ = model.coef_.astype(np.float32)
+    model.intercept_ = model.intercept_.astype(np.float32)
+
+
+def vectorize_splits(vectorizer_params: dict, X_train, X_val, X_test, cache: dict = None) -> tuple:
+    """
+    Fit TF-IDF on the training split and transform all three splits.
+    With a cache dict, configs sharing the same vectorizer parameters reuse
+    one fit: (vectorizer, X_train_vec, X_val_vec, X_test_vec, n_weighted).
+    """
+    key = tuple(sorted(vectorizer_params.items()))
+    if cache is not None and key in cache:
+        print("   Reusing TF-IDF matrices from an identical vectorizer config")
+        return cache[key]
+    
+    # float32 matrices halve the bytes moved per sparse mat-vec; the saga
+    # configs train on them as-is (lbfgs upcasts internally)
+    # Inputs are token lists from pretokenize(); the tokenizer passes them
+    # through at training time and tokenizes raw text at inference
+    vectorizer = TfidfVectorizer(**{
+        'dtype': np.float32,
+        'lowercase': False,
+        'tokenizer': vectorizer_tokens,
+        'token_pattern': None,
+        **vectorizer_params
+    })
+    # Tokenize the training split once: fit_transform, then fold the drug
+    # weighting into the returned matrix instead of a second transform pass
+    X_train_vec = vectorizer.fit_transform(X_train)
+    weighted = weight_drug_features(vectorizer)
+    X_train_vec = _reweight_columns(X_train_vec, weighted, DRUG_FEATURE_WEIGHT, vectorizer.norm)
+    
+    # Validation and test share the fitted state: one transform, then split
+    # the CSR rows
+    X_eval_vec = vectorizer.transform(list(X_val) + list(X_test))
+    
+    result = (
+        vectorizer,
+        X_train_vec,
+        X_eval_vec[:len(X_val)],
+        X_eval_vec[len(X_val):],
+        len(weighted)
+    )
+    if cache is not None:
+        cache[key] = result
+    return result
+
+
+def to_binary_labels(y) -> np.ndarray:
+    """Serious -> 1, Non-Serious -> 0 as a contiguous int8 array."""
+    return (np.asarray(y) == CLASS_NAMES[SERIOUS_LABEL]).astype(np.int8)
+
+
+def serious_metrics(cm) -> tuple:
+    """(recall, precision, f1) of the Serious class from a 2x2 confusion matrix (0 when undefined)."""
+    tn, fp, fn, tp = cm.ravel()
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return recall, precision, f1
+
+
+def _fit_score(model, X_fit, y_fit, X_score, y_score) -> float:
+    """Fit a fresh clone of the model on one fold and return Serious-class recall."""
+    fold_model = clone(model).fit(X_fit, y_fit)
+    return recall_score(y_score, fold_model.predict(X_score), pos_label=SERIOUS_LABEL)
+
+
+def cross_validate_recall(model, X_train_vec, y_train, n_splits: int = 5) -> np.ndarray:
+    """
+    Stratified k-fold recall on the already-vectorized training matrix.
+    Folds run in threads (the LR solvers release the GIL), so the CSR matrix
+    is row-sliced in-process instead of being pickled to worker processes.
+    """
+    labels = np.asarray(y_train)
+    skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=RANDOM_STATE)
+    scores = Parallel(n_jobs=N_JOBS, prefer='threads')(
+        delayed(_fit_score)(model, X_train_vec[tr], labels[tr], X_train_vec[va], labels[va])
+        for tr, va in skf.split(X_train_vec, labels)
+    )
+    return np.asarray(scores)
+
+
+# TF-IDF output is finite by construction: skip sklearn's per-call
+# finiteness scan of the CSR matrices (fit, CV folds, predict_proba). The
+# setting is thread-local; sklearn's Parallel carries it into the CV threads.
+@config_context(assume_finite=True)
 def train_and_evaluate_model(X_train, y_train, X_val, y_val, X_test, y_test, 
-                             config, tracker):
+                             config, tracker, vector_cache: dict = None):
     """
     Train and evaluate a single model configuration.
     
@@ -432,13 +734,12 @@ def train_and_evaluate_model(X_train, y_train, X_val, y_val, X_test, y_test,
     
     # Vectorization
     print("\n Vectorizing text with TF-IDF...")
-    vectorizer = TfidfVectorizer(**config['vectorizer'])
-    
-    X_train_vec = vectorizer.fit_transform(X_train)
-    X_val_vec = vectorizer.transform(X_val)
-    X_test_vec = vectorizer.transform(X_test)
+    vectorizer, X_train_vec, X_val_vec, X_test_vec, n_weighted = vectorize_splits(
+        config['vectorizer'], X_train, X_val, X_test, vector_cache
+    )
     
     print(f"   Vocabulary size: {len(vectorizer.vocabulary_):,}")
+    print(f"   Drug-name terms weighted: {n_weighted:,}")
     print(f"   Feature matrix: {X_train_vec.shape}")
     
     # Train model
@@ -453,32 +754,33 @@ def train_and_evaluate_model(X_train, y_train, X_val, y_val, X_test, y_test,
     model.fit(X_train_vec, y_train)
     training_time = time.time() - start_time
     
+    # Evaluate and save exactly what the service predicts with
+    cast_artifacts_float32(model, vectorizer)
+    
     print(f"    Training complete in {training_time:.1f} seconds")
     
     # CRITICAL FIX: Safe class index lookup
     print(f"\n Determining class indices...")
     try:
-        serious_idx = list(model.classes_).index('Serious')
+        serious_idx = list(model.classes_).index(SERIOUS_LABEL)
         print(f"   'Serious' class at index: {serious_idx}")
-        print(f"   Classes: {list(model.classes_)}")
+        print(f"   Classes: {[CLASS_NAMES[c] for c in model.classes_]}")
     except ValueError:
         raise ValueError("'Serious' class not found in model.classes_!")
     
-    # Cross-validation
-    print(f"\n Cross-validation (5-fold)...")
-    cv_scores = cross_val_score(
-        model, X_train_vec, y_train,
-        cv=StratifiedKFold(n_splits=5, shuffle=True, random_state=RANDOM_STATE),
-        scoring='recall',
-        n_jobs=N_JOBS
+    # Validation recall at the default threshold stands in for per-config
+    # CV (5 extra fits that never fed selection); the deployed model gets
+    # its CV run in main()
+    y_val_prob = model.predict_proba(X_val_vec)[:, serious_idx]  # FIXED
+    val_recall_default, _, _ = serious_metrics(
+        confusion_matrix(y_val, (y_val_prob >= 0.5).astype(np.int8), labels=[0, 1])
     )
-    print(f"   CV Recall: {cv_scores.mean():.4f} ± {cv_scores.std():.4f}")
+    print(f"\n Validation recall (default 0.5): {val_recall_default:.4f}")
     
     # Threshold optimization on validation set (SAFE indexing)
     print(f"\n Finding optimal threshold on validation set...")
-    y_val_prob = model.predict_proba(X_val_vec)[:, serious_idx]  # FIXED
     optimal_threshold = find_optimal_threshold(
-        (y_val == 'Serious').astype(int),
+        y_val,
         y_val_prob,
         target_recall=TARGET_RECALL
     )
@@ -488,25 +790,23 @@ def train_and_evaluate_model(X_train, y_train, X_val, y_val, X_test, y_test,
     print(" TEST SET EVALUATION")
     print(f"{'='*70}")
     
-    y_test_prob = model.predict_proba(X_test_vec)[:, serious_idx]  # FIXED
-    y_test_pred_default = model.predict(X_test_vec)
-    
-    # Predictions with tuned threshold
-    y_test_pred_tuned = (y_test_prob >= optimal_threshold).astype(int)
-    y_test_pred_tuned = np.where(y_test_pred_tuned == 1, 'Serious', 'Non-Serious')
+    # One predict_proba pass serves both the tuned and the default predictions
+    y_test_proba = model.predict_proba(X_test_vec)
+    y_test_prob = y_test_proba[:, serious_idx]  # FIXED
+    y_test_pred_default = model.classes_[y_test_proba.argmax(axis=1)]
     
-    y_test_binary = (y_test == 'Serious').astype(int)
+    # Predictions with tuned threshold (int8, 1 = Serious)
+    y_test_pred_tuned = (y_test_prob >= optimal_threshold).astype(np.int8)
     
-    # Metrics comparison
-    recall_default = recall_score(y_test, y_test_pred_default, pos_label='Serious')
-    precision_default = precision_score(y_test, y_test_pred_default, pos_label='Serious')
-    f1_default = f1_score(y_test, y_test_pred_default, pos_label='Serious')
+    # Metrics comparison: one confusion matrix per prediction set, every
+    # Serious-class metric derived from its counts
+    cm_default = confusion_matrix(y_test, y_test_pred_default, labels=[0, 1])
+    cm = confusion_matrix(y_test, y_test_pred_tuned, labels=[0, 1])
     
-    recall_tuned = recall_score(y_test, y_test_pred_tuned, pos_label='Serious')
-    precision_tuned = precision_score(y_test, y_test_pred_tuned, pos_label='Serious')
-    f1_tuned = f1_score(y_test, y_test_pred_tuned, pos_label='Serious')
+    recall_default, precision_default, f1_default = serious_metrics(cm_default)
+    recall_tuned, precision_tuned, f1_tuned = serious_metrics(cm)
     
-    auc_score = roc_auc_score(y_test_binary, y_test_prob)
+    auc_score = roc_auc_score(y_test, y_test_prob)
     
     # Print results
     print(f"\nSerious Class Metrics:")
@@ -524,7 +824,6 @@ def train_and_evaluate_model(X_train, y_train, X_val, y_val, X_test, y_test,
         print(f"\n  Below target: Recall = {recall_tuned:.4f} (target: {TARGET_RECALL})")
     
     # Confusion matrix analysis
-    cm = confusion_matrix(y_test, y_test_pred_tuned)
     tn, fp, fn, tp = cm.ravel()
     
     print(f"\nConfusion Matrix Breakdown:")
@@ -537,13 +836,14 @@ def train_and_evaluate_model(X_train, y_train, X_val, y_val, X_test, y_test,
     
     # Detailed report
     print(f"\nDetailed Classification Report:")
-    print(classification_report(y_test, y_test_pred_tuned))
+    print(classification_report(
+        y_test, y_test_pred_tuned, labels=[0, 1], target_names=CLASS_NAMES
+    ))
     
     # Log metrics
     metrics = {
         'training_time_seconds': float(training_time),
-        'cv_recall_mean': float(cv_scores.mean()),
-        'cv_recall_std': float(cv_scores.std()),
+        'val_recall_default': float(val_recall_default),
         'optimal_threshold': float(optimal_threshold),
         'serious_class_index': int(serious_idx),
         'test_recall_default': float(recall_default),
@@ -596,8 +896,7 @@ def train_and_evaluate_model(X_train, y_train, X_val, y_val, X_test, y_test,
             training_span.end(
                 output={
                     "training_time_seconds": training_time,
-                    "cv_recall_mean": float(cv_scores.mean()),
-                    "cv_recall_std": float(cv_scores.std())
+                    "val_recall_default": float(val_recall_default)
                 },
                 metadata={"latency_seconds": training_time}
             )
@@ -657,8 +956,10 @@ def train_and_evaluate_model(X_train, y_train, X_val, y_val, X_test, y_test,
 def save_artifacts(model, vectorizer, threshold, config, metrics, experiment_path):
     """Save model, vectorizer, and metadata."""
     
-    joblib.dump(model, experiment_path / "model.pkl")
-    joblib.dump(vectorizer, experiment_path / "vectorizer.pkl")
+    # Experiment copies are archival: compressed (the deployed copies in
+    # MODEL_DIR stay uncompressed so the service can memory-map them)
+    joblib.dump(model, experiment_path / "model.pkl", compress=ARTIFACT_COMPRESS)
+    joblib.dump(vectorizer, experiment_path / "vectorizer.pkl", compress=ARTIFACT_COMPRESS)
     
     # Save comprehensive metadata
     metadata = {
@@ -674,18 +975,53 @@ def save_artifacts(model, vectorizer, threshold, config, metrics, experiment_pat
         'notes': [
             'Model selection based on recall (patient safety), not ROC-AUC',
             'Threshold tuned on validation set only (no test set leakage)',
-            'Class index verified at runtime (no assumptions)'
+            'Class index verified at runtime (no assumptions)',
+            'Per-config CV skipped; 5-fold CV recall is reported for the deployed model only'
         ]
     }
     
-    with open(experiment_path / "metadata.json", 'w') as f:
-        json.dump(metadata, f, indent=2)
+    write_json(experiment_path / "metadata.json", metadata)
 
 
 # ============================================================================
 # MAIN PIPELINE
 # ============================================================================
 
+def run_config(i, config, X_train, y_train, X_val, y_val, X_test, y_test,
+               vector_cache) -> tuple:
+    """Train one configuration: (config, tracker, model, vectorizer, threshold, metrics, y_pred, y_prob)."""
+    print(f"\n\n{'#'*70}")
+    print(f"# CONFIGURATION {i}/{len(MODEL_CONFIGS)}")
+    print(f"{'#'*70}")
+    
+    # Configs already run side by side: one solver thread each avoids
+    # oversubscribing the cores
+    if CONFIG_JOBS > 1 and 'n_jobs' in config['classifier']:
+        config = {**config, 'classifier': {**config['classifier'], 'n_jobs': 1}}
+    
+    tracker = ExperimentTracker(config['name'])
+    tracker.log_config(config)
+    
+    # Train and evaluate
+    model, vectorizer, threshold, metrics, y_pred, y_prob = train_and_evaluate_model(
+        X_train, y_train, X_val, y_val, X_test, y_test,
+        config, tracker, vector_cache
+    )
+    return config, tracker, model, vectorizer, threshold, metrics, y_pred, y_prob
+
+
+def train_configs(configs, X_train, y_train, X_val, y_val, X_test, y_test,
+                  vector_cache) -> list:
+    """Run run_config for each config (in threads when CONFIG_JOBS > 1), in the given order."""
+    return Parallel(n_jobs=max(1, min(CONFIG_JOBS, len(configs))), prefer='threads')(
+        delayed(run_config)(
+            MODEL_CONFIGS.index(config) + 1, config,
+            X_train, y_train, X_val, y_val, X_test, y_test, vector_cache
+        )
+        for config in configs
+    )
+
+
 def main():
     """Main training pipeline."""
     
@@ -708,56 +1044,59 @@ def main():
     # Prepare features
     X, y = prepare_features(df)
     
+    # int8 labels from here on: every split, fit and metric compares ints
+    y = to_binary_labels(y)
+    
     # Three-way split: train / validation / test
     print(f"\n Splitting data...")
-    X_temp, X_test, y_temp, y_test = train_test_split(
-        X, y, test_size=TEST_SIZE, stratify=y, random_state=RANDOM_STATE
-    )
-    X_train, X_val, y_train, y_val = train_test_split(
-        X_temp, y_temp, 
-        test_size=VAL_SIZE/(1-TEST_SIZE), 
-        stratify=y_temp, 
-        random_state=RANDOM_STATE
-    )
+    idx_train, idx_val, idx_test = stratified_three_way_split(y, VAL_SIZE, TEST_SIZE)
+    X_train, X_val, X_test = X[idx_train], X[idx_val], X[idx_test]
+    y_train, y_val, y_test = y[idx_train], y[idx_val], y[idx_test]
     
     print(f"   Training:   {len(X_train):,} samples ({len(X_train)/len(X)*100:.1f}%)")
     print(f"   Validation: {len(X_val):,} samples ({len(X_val)/len(X)*100:.1f}%)")
     print(f"   Test:       {len(X_test):,} samples ({len(X_test)/len(X)*100:.1f}%)")
     
+    # Shared by every config's vectorizer
+    X_train, X_val, X_test = pretokenize(X_train, X_val, X_test)
+    
     # Train configurations
     best_model = None
     best_score = 0
     best_config_name = None
+    best_plot_data = None
     results_summary = []
     
     # IMPORTANT: Prefer 'balanced' over 'high_recall' for production safety
     preferred_config = 'balanced'
     
-    for i, config in enumerate(MODEL_CONFIGS, 1):
-        print(f"\n\n{'#'*70}")
-        print(f"# CONFIGURATION {i}/{len(MODEL_CONFIGS)}")
-        print(f"{'#'*70}")
-        
-        tracker = ExperimentTracker(config['name'])
-        tracker.log_config(config)
-        
-        # Train and evaluate
-        model, vectorizer, threshold, metrics, y_pred, y_prob = train_and_evaluate_model(
-            X_train, y_train, X_val, y_val, X_test, y_test,
-            config, tracker
-        )
-        
-        # Generate visualizations
-        print(f"\n Generating visualizations...")
-        cm = confusion_matrix(y_test, y_pred)
-        plot_confusion_matrix(cm, model.classes_, tracker.experiment_path)
-        plot_roc_curve((y_test == 'Serious').astype(int), y_prob, tracker.experiment_path)
-        plot_precision_recall_curve(
-            (y_test == 'Serious').astype(int), 
-            y_prob, 
-            tracker.experiment_path, 
-            TARGET_RECALL
-        )
+    # TF-IDF fits shared by configs with identical vectorizer parameters
+    vector_cache = {}
+    
+    # Train configs (in parallel when CONFIG_JOBS > 1). Plotting and saving
+    # stay on this thread, since pyplot is not thread-safe.
+    split_data = (X_train, y_train, X_val, y_val, X_test, y_test, vector_cache)
+    preferred = [c for c in MODEL_CONFIGS if c['name'] == preferred_config]
+    if FULL_SWEEP or not preferred:
+        trained = train_configs(MODEL_CONFIGS, *split_data)
+    else:
+        # A preferred config that meets the target is always selected, so
+        # the rest only need training when it does not
+        trained = train_configs(preferred, *split_data)
+        if trained[0][5]['test_recall_tuned'] >= TARGET_RECALL:
+            print(f"\n '{preferred_config}' meets target recall: skipping remaining configs "
+                  f"(use --full-sweep to train all)")
+        else:
+            others = [c for c in MODEL_CONFIGS if c['name'] != preferred_config]
+            trained += train_configs(others, *split_data)
+        # Selection below walks the configs in MODEL_CONFIGS order
+        config_order = [c['name'] for c in MODEL_CONFIGS]
+        trained.sort(key=lambda result: config_order.index(result[0]['name']))
+    
+    for config, tracker, model, vectorizer, threshold, metrics, y_pred, y_prob in trained:
+        # Curve data for every config; only the deployed one is rendered
+        np.savez(tracker.experiment_path / "test_predictions.npz",
+                 y_true=y_test, y_prob=y_prob, y_pred=y_pred)
         
         save_artifacts(model, vectorizer, threshold, config, metrics, tracker.experiment_path)
         tracker.log_metrics(metrics)
@@ -773,12 +1112,14 @@ def main():
             best_score = metrics['test_f1_tuned']
             best_model = (model, vectorizer, threshold, config)
             best_config_name = config['name']
+            best_plot_data = (tracker.experiment_path, y_pred, y_prob)
         elif best_model is None and meets_target:
             # Fallback: any config that meets target
             if metrics['test_f1_tuned'] > best_score:
                 best_score = metrics['test_f1_tuned']
                 best_model = (model, vectorizer, threshold, config)
                 best_config_name = config['name']
+                best_plot_data = (tracker.experiment_path, y_pred, y_prob)
         
         results_summary.append({
             'config': config['name'],
@@ -799,19 +1140,43 @@ def main():
         
         model, vectorizer, threshold, config = best_model
         
-        joblib.dump(model, MODEL_DIR / "model.pkl")
-        joblib.dump(vectorizer, MODEL_DIR / "vectorizer.pkl")
+        # Generate visualizations (best model only; the other configs keep
+        # test_predictions.npz for offline rendering)
+        print(f"\n Generating visualizations...")
+        plot_path, y_pred, y_prob = best_plot_data
+        cm = confusion_matrix(y_test, y_pred, labels=[0, 1])
+        plot_confusion_matrix(cm, CLASS_NAMES, plot_path)
+        plot_roc_curve(y_test, y_prob, plot_path)
+        plot_precision_recall_curve(
+            y_test, 
+            y_prob, 
+            plot_path, 
+            TARGET_RECALL
+        )
+        
+        # 5-fold CV for the deployed config only (its TF-IDF matrix is
+        # still in vector_cache)
+        print(f"\n Cross-validation (5-fold)...")
+        X_train_vec = vectorize_splits(config['vectorizer'], X_train, X_val, X_test, vector_cache)[1]
+        with config_context(assume_finite=True):
+            cv_scores = cross_validate_recall(model, X_train_vec, y_train, n_splits=5)
+        print(f"   CV Recall: {cv_scores.mean():.4f} ± {cv_scores.std():.4f}")
+        
+        # Uncompressed so the service can memory-map the arrays on load
+        joblib.dump(model, MODEL_DIR / "model.pkl", compress=0)
+        joblib.dump(vectorizer, MODEL_DIR / "vectorizer.pkl", compress=0)
         
-        with open(MODEL_DIR / "model_metadata.json", 'w') as f:
-            json.dump({
-                'threshold': threshold,
-                'config_name': best_config_name,
-                'sample_size': SAMPLE_SIZE,
-                'timestamp': datetime.now().isoformat(),
-                'target_recall_achieved': True,
-                'data_version': 'v2',
-                'selection_criteria': 'recall-first (patient safety), balanced preferred'
-            }, f, indent=2)
+        write_json(MODEL_DIR / "model_metadata.json", {
+            'threshold': threshold,
+            'config_name': best_config_name,
+            'cv_recall_mean': float(cv_scores.mean()),
+            'cv_recall_std': float(cv_scores.std()),
+            'sample_size': SAMPLE_SIZE,
+            'timestamp': datetime.now().isoformat(),
+            'target_recall_achieved': True,
+            'data_version': 'v2',
+            'selection_criteria': 'recall-first (patient safety), balanced preferred'
+        }, indent=True)
         
         print(f"\n Model deployed to: {MODEL_DIR}/")
         print(f"   • model.pkl")
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Tests import the app the same way the service does (app.services...)
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
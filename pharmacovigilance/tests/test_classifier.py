@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from app.services import classifier
+
+
+class _FakeVectorizer:
+    """One feature: 1.0 when the text mentions 'rash', else 0.0."""
+
+    def transform(self, texts):
+        return np.array([[1.0 if "rash" in text else 0.0] for text in texts])
+
+
+class _FakeModel:
+    classes_ = np.array(["Non-Serious", "Serious"])
+
+    def predict_proba(self, X):
+        serious = 0.1 + 0.8 * X[:, 0]
+        return np.column_stack([1 - serious, serious])
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    monkeypatch.setattr(classifier, "_model", _FakeModel())
+    monkeypatch.setattr(classifier, "_vectorizer", _FakeVectorizer())
+    monkeypatch.setattr(classifier, "_serious_idx", 1)
+    monkeypatch.setattr(classifier, "_sigmoid_scoring", False)
+
+
+def test_predict_batch_mixes_overrides_and_ml(fake_model):
+    texts = [
+        "aspirin patient died",
+        "ibuprofen no coma",
+        "amoxicillin rash",
+        "paracetamol headache",
+    ]
+    results = classifier.predict_batch(texts)
+
+    assert [r["prediction"] for r in results] == ["Serious", "Non-Serious", "Serious", "Non-Serious"]
+    assert results[0]["reason"].startswith("Rule-based override")
+    assert results[1]["reason"].startswith("Negation-aware override")
+    assert results[2]["reason"] == "ML classifier"
+    assert results[2]["serious_probability"] == pytest.approx(0.9)
+
+
+def test_predict_batch_matches_predict_single(fake_model):
+    texts = ["aspirin patient died", "amoxicillin rash", "paracetamol headache"]
+    batch = classifier.predict_batch(texts)
+    for text, result in zip(texts, batch):
+        assert classifier.predict_single(text)["prediction"] == result["prediction"]
+
+
+def test_float32_scores_match_float64(monkeypatch):
+    import copy
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    texts = [
+        "drug_aspirin gastrointestinal bleeding", "drug_aspirin mild headache",
+        "drug_warfarin intracranial hemorrhage", "drug_ibuprofen stomach upset",
+        "drug_insulin severe hypoglycemia seizure", "drug_cetirizine drowsiness",
+        "drug_metformin lactic acidosis", "drug_loratadine dry mouth",
+    ]
+    labels = ["Serious", "Non-Serious"] * 4
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True).fit(texts)
+    model = LogisticRegression(C=10.0, max_iter=1000).fit(vectorizer.transform(texts), labels)
+
+    monkeypatch.setattr(classifier, "_serious_idx", list(model.classes_).index("Serious"))
+    monkeypatch.setattr(classifier, "_sigmoid_scoring", True)
+
+    queries = texts + ["drug_aspirin bleeding and headache", "unseen words only"]
+
+    monkeypatch.setattr(classifier, "_model", model)
+    monkeypatch.setattr(classifier, "_vectorizer", vectorizer)
+    probs64, conf64 = classifier._predict_serious_proba(queries)
+
+    model32, vectorizer32 = copy.deepcopy(model), copy.deepcopy(vectorizer)
+    classifier._downcast_to_float32(model32, vectorizer32)
+    assert model32.coef_.dtype == np.float32
+    monkeypatch.setattr(classifier, "_model", model32)
+    monkeypatch.setattr(classifier, "_vectorizer", vectorizer32)
+    probs32, conf32 = classifier._predict_serious_proba(queries)
+
+    np.testing.assert_allclose(probs32, probs64, atol=1e-4)
+    np.testing.assert_allclose(conf32, conf64, atol=1e-4)
@@ -0,0 +1,22 @@
+import ast
+
+from conftest import PROJECT_ROOT
+
+
+def test_load_dotenv_runs_before_service_imports():
+    # vector_service / retrieve_service read CHROMA_PERSIST_DIR and friends at
+    # import time, so .env has to be loaded before any app.* import in main.py
+    tree = ast.parse((PROJECT_ROOT / "app" / "main.py").read_text(encoding="utf-8"))
+
+    dotenv_line = next(
+        node.lineno for node in tree.body
+        if isinstance(node, ast.Expr)
+        and isinstance(node.value, ast.Call)
+        and getattr(node.value.func, "id", None) == "load_dotenv"
+    )
+    first_app_import = min(
+        node.lineno for node in tree.body
+        if isinstance(node, ast.ImportFrom) and (node.module or "").startswith("app.")
+    )
+
+    assert dotenv_line < first_app_import
@@ -0,0 +1,15 @@
+from app.services.preprocessor import combine_features, vectorizer_tokens
+
+
+def test_combine_features_marks_drug_tokens():
+    assert combine_features("Insulin Glargine", "") == "drug_insulin drug_glargine"
+
+
+def test_combine_features_legacy_layout_repeats_drug_name():
+    assert combine_features("Aspirin", "", mark_drug=False) == "aspirin aspirin"
+
+
+def test_vectorizer_tokens_passes_token_lists_through():
+    tokens = ["drug_aspirin", "rash"]
+    assert vectorizer_tokens(tokens) is tokens
+    assert vectorizer_tokens("Drug_Aspirin rash, a") == ["drug_aspirin", "rash"]
@@ -0,0 +1,88 @@
+import threading
+import time
+
+from app.services import rxnorm_service
+
+
+def test_rate_limiter_caps_requests_per_second_across_threads():
+    limiter = rxnorm_service._RateLimiter(rate=19)
+    start = time.monotonic()
+    stamps = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(10):
+            limiter.acquire()
+            with lock:
+                stamps.append(time.monotonic() - start)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stamps.sort()
+    busiest_second = max(sum(1 for s in stamps if t <= s < t + 1.0) for t in stamps)
+    assert len(stamps) == 40
+    assert busiest_second <= 20
+
+
+def _mock_client(rxnorm_ids, fda_results):
+    """AsyncClient over httpx.MockTransport; records the paths requested."""
+    import httpx
+
+    requested = []
+
+    def handler(request):
+        requested.append(request.url.path)
+        if request.url.host == "api.fda.gov":
+            return httpx.Response(200, json={"results": fda_results} if fda_results else {})
+        if request.url.path.endswith("/rxcui.json"):
+            return httpx.Response(200, json={"idGroup": {"rxnormId": rxnorm_ids}})
+        if request.url.path.endswith("/approximateTerm.json"):
+            return httpx.Response(200, json={"approximateGroup": {}})
+        if request.url.path.endswith("/rxcui/1191.json"):
+            return httpx.Response(200, json={"idGroup": {"name": "aspirin"}})
+        return httpx.Response(404)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), requested
+
+
+def test_async_lookup_resolves_via_rxnorm_without_calling_openfda():
+    import asyncio
+
+    async def run():
+        client, requested = _mock_client(["1191"], [{"id": "label"}])
+        async with client:
+            result = await rxnorm_service._resolve_drug_rxnorm_async(client, "aspirin")
+        return result, requested
+
+    result, requested = asyncio.run(run())
+    assert result == {"input": "aspirin", "rxcui": "1191", "canonical_name": "aspirin"}
+    assert not any("label.json" in path for path in requested)
+
+
+def test_async_lookup_falls_back_to_openfda_on_rxnorm_miss():
+    import asyncio
+
+    async def run():
+        client, requested = _mock_client([], [{"id": "label"}])
+        async with client:
+            result = await rxnorm_service._resolve_drug_rxnorm_async(client, "newdrugumab")
+        return result, requested
+
+    result, requested = asyncio.run(run())
+    assert result == {"input": "newdrugumab", "rxcui": None, "canonical_name": "newdrugumab"}
+    assert requested[-1].endswith("/drug/label.json")
+
+
+def test_async_lookup_rejects_name_unknown_to_both():
+    import asyncio
+
+    async def run():
+        client, _ = _mock_client([], [])
+        async with client:
+            return await rxnorm_service._resolve_drug_rxnorm_async(client, "notadrugname")
+
+    assert asyncio.run(run()) is None